@@ -0,0 +1,26 @@
+"""Regenerate `expense_monthly_rollups` from the `expenses` table.
+
+Usage: ``python -m app.commands.rebuild_rollups`` (or ``make db-rebuild-rollups``).
+"""
+
+import asyncio
+
+from app.core.logging import get_logger, setup_logging
+from app.database.prisma_client import PrismaClient
+from app.services.rollup_service import RollupService
+
+logger = get_logger(__name__)
+
+
+async def main() -> None:
+    await PrismaClient.connect()
+    try:
+        rows = await RollupService.rebuild()
+        logger.info("Rebuilt %d expense rollup rows", rows)
+    finally:
+        await PrismaClient.disconnect()
+
+
+if __name__ == "__main__":
+    setup_logging()
+    asyncio.run(main())
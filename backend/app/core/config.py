@@ -22,8 +22,94 @@ class Settings(BaseSettings):
     database_url: str = ""
     direct_url: str = ""
 
-    # OpenAI
+    # DB pool per worker. db_pool_size > 0 fixes it; otherwise
+    # db_connection_budget (the database's total allowance for this app) is
+    # split across web_concurrency workers (WEB_CONCURRENCY, as in start.sh).
+    web_concurrency: int = 1
+    db_pool_size: int = 0
+    db_connection_budget: int = 5
+    db_pool_timeout_seconds: float = 10.0
+    # Caches of database results are per worker and only invalidated by that
+    # worker's writes; with several workers their TTLs are clamped to this.
+    multi_worker_cache_ttl_seconds: float = 5.0
+
+    # Optional read replica for list/detail/dashboard reads. A client's reads
+    # stay on the primary for db_read_sticky_seconds after it writes.
+    database_read_url: str = ""
+    db_read_sticky_seconds: float = 5.0
+
+    # Bulk expense import (POST /api/expenses/import)
+    expense_import_batch_size: int = 1000
+
+    # Dashboard response cache (invalidated by expense writes)
+    dashboard_cache_size: int = 256
+    dashboard_cache_ttl_seconds: float = 60.0
+
+    # Dashboard: optional in-process columnar snapshot of expenses
+    dashboard_snapshot_enabled: bool = False
+    dashboard_snapshot_refresh_seconds: float = 5.0
+    dashboard_snapshot_reload_seconds: float = 3600.0
+
+    # Stock quotes (Yahoo upstream). stock_universe_file overrides the bundled
+    # app/data/nse_stocks.csv symbol list.
+    stock_universe_file: str = ""
+    stock_quote_chunk_size: int = 50
+    stock_quote_concurrency: int = 4
+    # Whole-board latency budget; a chunk still pending after
+    # stock_quote_hedge_seconds gets a second, racing request (0 disables).
+    stock_quote_budget_seconds: float = 3.0
+    stock_quote_hedge_seconds: float = 1.0
+    stock_breaker_failure_threshold: int = 3
+    stock_breaker_reset_seconds: float = 30.0
+    stock_http_timeout_seconds: float = 10.0
+    stock_http_max_connections: int = 10
+    stock_quote_ttl_seconds: float = 15.0
+    stock_quote_stale_seconds: float = 60.0
+    stock_stream_refresh_seconds: float = 5.0
+    stock_stream_heartbeat_seconds: float = 15.0
+    stock_history_capacity: int = 1024
+
+    # Market simulator: the offline fallback, or the whole feed when
+    # stock_feed="synthetic". stock_sim_symbols > 0 swaps the registry for that
+    # many generated symbols (load testing without the network).
+    stock_feed: str = "yahoo"
+    stock_sim_symbols: int = 0
+    stock_sim_seed: int = 7
+    stock_sim_tick_seconds: float = 5.0
+    stock_sim_drift: float = 0.08
+    stock_sim_volatility: float = 0.25
+    stock_sim_sector_correlation: float = 0.6
+
+    # OpenAI. openai_base_url points the advisor at any OpenAI-compatible server.
     openai_api_key: str = ""
+    openai_base_url: str = ""
+    openai_model: str = "gpt-4o-mini"
+    openai_timeout_seconds: float = 60.0
+    openai_connect_timeout_seconds: float = 5.0
+    openai_max_retries: int = 2
+    openai_max_connections: int = 20
+
+    # Advisor response cache: answers replayed for identical prompts
+    advisor_cache_max_bytes: int = 8 * 1024 * 1024
+    advisor_cache_ttl_seconds: float = 120.0
+    advisor_replay_delay_seconds: float = 0.0
+    # SSE frames batch token deltas for up to this long / this many characters
+    advisor_frame_window_seconds: float = 0.03
+    advisor_frame_max_chars: int = 256
+    # Estimated-token cap on the stock list embedded in the advisor prompt,
+    # and on how many requested symbols it lists
+    advisor_context_max_tokens: int = 3000
+    advisor_context_max_symbols: int = 50
+    # ... on the user's message (clipped), and on the whole prompt: the stock
+    # list gets whatever the instructions and message leave of this
+    advisor_message_max_tokens: int = 500
+    advisor_prompt_max_tokens: int = 4000
+
+    # Advisor streams: concurrent upstream streams, then a bounded wait queue.
+    # Totals for the app, split across web_concurrency workers.
+    advisor_max_streams: int = 8
+    advisor_max_queued: int = 16
+    advisor_queue_timeout_seconds: float = 10.0
 
     # CORS
     cors_origins: str = "http://localhost:3000"
@@ -33,6 +119,17 @@ class Settings(BaseSettings):
     def cors_origins_list(self) -> list[str]:
         return [o.strip() for o in self.cors_origins.split(",") if o.strip()]
 
+    def local_cache_ttl(self, ttl: float) -> float:
+        """``ttl`` for a per-worker cache of database results; clamped when other
+        workers' writes cannot invalidate it."""
+        if self.web_concurrency > 1:
+            return min(ttl, self.multi_worker_cache_ttl_seconds)
+        return ttl
+
+    def per_worker(self, total: int) -> int:
+        """This worker's share of an app-wide limit."""
+        return max(1, total // max(1, self.web_concurrency))
+
 
 @lru_cache(maxsize=1)
 def get_settings() -> Settings:
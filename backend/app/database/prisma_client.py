@@ -1,31 +1,171 @@
+import asyncio
 import logging
+import time
+from contextvars import ContextVar, Token
 from functools import lru_cache
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
 
 from prisma import Prisma
 
+from app.config import get_settings
+
 logger = logging.getLogger(__name__)
 
+_CONNECT_ATTEMPTS = 3
+
+# Set per request (ReadYourWritesMiddleware) when the caller wrote recently.
+_pin_primary: ContextVar[bool] = ContextVar("pin_primary", default=False)
+# Set per request by ReadYourWritesMiddleware; note_write() flips it. A list
+# rather than a bool so tasks spawned with a copy of the context still reach it.
+_request_writes: ContextVar[list[bool] | None] = ContextVar("request_writes", default=None)
+
+
+def pool_size(url: str | None = None) -> int:
+    """Connections for this worker: connection_limit from ``url`` (DATABASE_URL
+    by default), else DB_POOL_SIZE, else the budget split across workers."""
+    settings = get_settings()
+    query = dict(parse_qsl(urlsplit(settings.database_url if url is None else url).query))
+    if query.get("connection_limit", "").isdigit():
+        return int(query["connection_limit"])
+    if settings.db_pool_size > 0:
+        return settings.db_pool_size
+    return settings.per_worker(settings.db_connection_budget)
+
+
+def _with_pool_params(url: str, size: int, timeout: float) -> str:
+    """Append the query engine's connection_limit/pool_timeout to a Postgres URL
+    unless it sets them; the URL's own query string is kept byte for byte."""
+    parts = urlsplit(url)
+    present = {key for key, _ in parse_qsl(parts.query, keep_blank_values=True)}
+    missing = {
+        key: value
+        for key, value in (("connection_limit", size), ("pool_timeout", int(timeout)))
+        if key not in present
+    }
+    if not missing:
+        return url
+    query = "&".join(q for q in (parts.query, urlencode(missing)) if q)
+    return urlunsplit(parts._replace(query=query))
+
+
+def _metric(metrics, kind: str, key: str):
+    for metric in getattr(metrics, kind):
+        if metric.key == key:
+            return metric.value
+    return None
+
 
 class PrismaClient:
     _instance: Prisma | None = None
+    # Optional read-only client on DATABASE_READ_URL (connected by connect()).
+    _read_instance: Prisma | None = None
+    _last_write = 0.0
+
+    @classmethod
+    def get_read_client(cls, shared: bool = False) -> Prisma:
+        """Client for queries that tolerate replica lag.
+
+        Falls back to the primary when no replica is configured, when the
+        current request is pinned to it (the client wrote recently), or, for
+        ``shared`` results that end up in a cache other clients read, when
+        anyone wrote within the stickiness window.
+        """
+        if cls._read_instance is None or _pin_primary.get():
+            return cls.get_client()
+        if shared and time.monotonic() - cls._last_write < get_settings().db_read_sticky_seconds:
+            return cls.get_client()
+        return cls._read_instance
+
+    @classmethod
+    def has_replica(cls) -> bool:
+        return cls._read_instance is not None
+
+    @classmethod
+    def pin_reads_to_primary(cls) -> Token:
+        """Route this context's reads to the primary; reset with the returned token."""
+        return _pin_primary.set(True)
+
+    @classmethod
+    def unpin_reads(cls, token: Token) -> None:
+        _pin_primary.reset(token)
+
+    @classmethod
+    def track_writes(cls) -> tuple[Token, list[bool]]:
+        """Record note_write() calls made in this context.
+
+        Returns the token for untrack_writes() and a list that holds True once
+        a write was noted.
+        """
+        wrote = [False]
+        return _request_writes.set(wrote), wrote
+
+    @classmethod
+    def untrack_writes(cls, token: Token) -> None:
+        _request_writes.reset(token)
+
+    @classmethod
+    def note_write(cls) -> None:
+        cls._last_write = time.monotonic()
+        wrote = _request_writes.get()
+        if wrote is not None:
+            wrote[0] = True
 
     @classmethod
     def get_client(cls) -> Prisma:
         if cls._instance is None:
             logger.debug("Creating new Prisma client instance (singleton)")
-            cls._instance = Prisma()
+            settings = get_settings()
+            if settings.database_url:
+                url = _with_pool_params(
+                    settings.database_url, pool_size(), settings.db_pool_timeout_seconds
+                )
+                cls._instance = Prisma(datasource={"url": url})
+            else:
+                cls._instance = Prisma()
         return cls._instance
 
     @classmethod
     async def connect(cls) -> None:
-        client = cls.get_client()
-        if not client.is_connected():
-            logger.debug("Connecting to database...")
-            await client.connect()
-            logger.debug("Database connection successful")
+        await cls._connect(cls.get_client(), pool_size())
+        read_url = get_settings().database_read_url
+        if read_url and cls._read_instance is None:
+            settings = get_settings()
+            size = pool_size(read_url)
+            replica = Prisma(
+                datasource={
+                    "url": _with_pool_params(read_url, size, settings.db_pool_timeout_seconds)
+                }
+            )
+            await cls._connect(replica, size)
+            cls._read_instance = replica
+            logger.debug("Read replica connected")
+
+    @classmethod
+    async def _connect(cls, client: Prisma, size: int) -> None:
+        if client.is_connected():
+            return
+        for attempt in range(1, _CONNECT_ATTEMPTS + 1):
+            try:
+                logger.debug("Connecting to database (pool size %d)...", size)
+                await client.connect()
+                # The engine connects lazily; make sure the pool can hand out a connection.
+                await client.query_raw("SELECT 1")
+                logger.debug("Database connection successful")
+                return
+            except Exception:
+                if client.is_connected():
+                    await client.disconnect()
+                if attempt == _CONNECT_ATTEMPTS:
+                    raise
+                logger.warning("Database connect attempt %d failed; retrying", attempt)
+                await asyncio.sleep(attempt)
 
     @classmethod
     async def disconnect(cls) -> None:
+        if cls._read_instance is not None:
+            if cls._read_instance.is_connected():
+                await cls._read_instance.disconnect()
+            cls._read_instance = None
         if cls._instance is not None:
             if cls._instance.is_connected():
                 logger.debug("Disconnecting from database...")
@@ -33,7 +173,45 @@ class PrismaClient:
             cls._instance = None
             logger.debug("Database disconnected")
 
+    @classmethod
+    async def pool_stats(cls, client: Prisma | None = None) -> dict:
+        """Pool occupancy and wait time from the query engine's metrics."""
+        client = client or cls.get_client()
+        metrics = await client.get_metrics()
+        replica = client is cls._read_instance
+        size = pool_size(get_settings().database_read_url if replica else None)
+        busy = _metric(metrics, "gauges", "prisma_pool_connections_busy") or 0
+        wait = _metric(metrics, "histograms", "prisma_client_queries_wait_histogram_ms")
+        return {
+            "size": size,
+            "open": _metric(metrics, "gauges", "prisma_pool_connections_open"),
+            "busy": busy,
+            "idle": _metric(metrics, "gauges", "prisma_pool_connections_idle"),
+            "waiting": _metric(metrics, "gauges", "prisma_client_queries_wait"),
+            "saturation": round(busy / size, 3),
+            "meanWaitMs": round(wait.sum / wait.count, 3) if wait and wait.count else 0.0,
+        }
+
+    @classmethod
+    async def health(cls) -> dict:
+        client = cls.get_client()
+        if not client.is_connected():
+            return {"status": "disconnected"}
+        started = time.perf_counter()
+        try:
+            await client.query_raw("SELECT 1")
+        except Exception as e:
+            return {"status": "unhealthy", "error": str(e)}
+        result = {
+            "status": "healthy",
+            "latencyMs": round((time.perf_counter() - started) * 1000, 2),
+            "pool": await cls.pool_stats(),
+        }
+        if cls._read_instance is not None:
+            result["replicaPool"] = await cls.pool_stats(cls._read_instance)
+        return result
+
 
 @lru_cache(maxsize=1)
 def get_db() -> Prisma:
-    return PrismaClient.get_client()
\ No newline at end of file
+    return PrismaClient.get_client()
@@ -1,3 +1,4 @@
+import asyncio
 import os
 from pathlib import Path
 from contextlib import asynccontextmanager
@@ -21,13 +22,19 @@ if "PRISMA_BINARY_CACHE_DIR" not in os.environ:
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
 from app.config import get_settings
 from app.core.logging import get_logger, setup_logging
 from app.database.prisma_client import PrismaClient
-from app.middlewares.request_logging import RequestLoggingMiddleware
-from app.middlewares.trace_id import TraceIDMiddleware
+from app.middlewares.read_your_writes import ReadYourWritesMiddleware
+from app.middlewares.request_context import RequestContextMiddleware
 from app.routers import advisor, dashboard, expenses, stocks
+from app.services.expense_snapshot import get_expense_snapshot
+from app.services.quote_stream import get_quote_broadcaster
+from app.services.rollup_service import RollupService
+from app.utils.openai_client import close_openai_client, open_openai_client
+from app.utils.stocks import close_http_client, open_http_client
 
 # -------------------------------------------------------------------
 # Setup
@@ -35,10 +42,6 @@ from app.routers import advisor, dashboard, expenses, stocks
 
 settings = get_settings()
 
-if settings.database_url and "connection_limit" not in settings.database_url:
-    sep = "&" if "?" in settings.database_url else "?"
-    os.environ["DATABASE_URL"] = settings.database_url + sep + "connection_limit=1"
-
 setup_logging()
 logger = get_logger(__name__)
 
@@ -58,9 +61,27 @@ async def lifespan(app: FastAPI):
         logger.exception("Failed to connect to database")
         raise e
 
+    try:
+        await RollupService.install()
+    except Exception:
+        logger.exception("Failed to install expense rollup triggers; dashboard totals may drift")
+
+    open_http_client()
+    if open_openai_client() is None:
+        logger.warning("OPENAI_API_KEY is not set; the stock advisor is disabled")
+    background = [asyncio.create_task(get_quote_broadcaster().run())]
+    if settings.dashboard_snapshot_enabled:
+        background.append(asyncio.create_task(get_expense_snapshot().run()))
+        logger.info("Dashboard expense snapshot enabled")
+
     yield
 
     logger.info("Shutting down Pensive API...")
+    for task in background:
+        task.cancel()
+    await asyncio.gather(*background, return_exceptions=True)
+    await close_http_client()
+    await close_openai_client()
     try:
         await PrismaClient.disconnect()
         logger.info("Database connection closed")
@@ -82,8 +103,8 @@ app = FastAPI(
 # Middlewares
 # -------------------------------------------------------------------
 
-app.add_middleware(TraceIDMiddleware)
-app.add_middleware(RequestLoggingMiddleware)
+app.add_middleware(ReadYourWritesMiddleware)
+app.add_middleware(RequestContextMiddleware)
 
 app.add_middleware(
     CORSMiddleware,
@@ -91,6 +112,11 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Advisor prompt metadata and the read-your-writes window, readable by
+    # the cross-origin frontend
+    expose_headers=[
+        "X-Prompt-Tokens", "X-Context-Omitted", "X-Stock-Snapshot", "X-Read-Your-Writes",
+    ],
 )
 
 # -------------------------------------------------------------------
@@ -108,4 +134,16 @@ app.include_router(advisor.router)
 
 @app.get("/health", tags=["Health"])
 async def health():
-    return {"status": "healthy"}
\ No newline at end of file
+    return {"status": "healthy"}
+
+
+@app.get("/health/db", tags=["Health"])
+async def health_db():
+    """Database round-trip plus this worker's pool size, occupancy and wait time.
+
+    503 unless healthy, so load balancers take the worker out of rotation.
+    """
+    result = await PrismaClient.health()
+    if result["status"] != "healthy":
+        return JSONResponse(result, status_code=503)
+    return result
\ No newline at end of file
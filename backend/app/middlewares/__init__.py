@@ -1,4 +1,13 @@
-from app.middlewares.request_logging import RequestLoggingMiddleware
-from app.middlewares.trace_id import TraceIDMiddleware
+from app.middlewares.read_your_writes import ReadYourWritesMiddleware
+from app.middlewares.request_context import (
+    TRACE_ID_HEADER,
+    RequestContextMiddleware,
+    get_trace_id,
+)
 
-__all__ = ["TraceIDMiddleware", "RequestLoggingMiddleware"]
+__all__ = [
+    "RequestContextMiddleware",
+    "ReadYourWritesMiddleware",
+    "TRACE_ID_HEADER",
+    "get_trace_id",
+]
@@ -0,0 +1,61 @@
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import get_settings
+from app.database.prisma_client import PrismaClient
+
+STICKY_COOKIE = "pensive_rw"
+STICKY_HEADER = "x-read-your-writes"
+
+_MUTATING = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+
+
+class ReadYourWritesMiddleware:
+    """Keeps a client's reads on the primary for a short window after it writes.
+
+    Only requests that wrote expenses (``PrismaClient.note_write()``) count.
+    Their response carries ``X-Read-Your-Writes: <seconds>``, which the
+    frontend echoes on its requests for that long (cross-origin JS does not
+    send cookies without ``withCredentials``), plus a short-lived cookie for
+    same-site clients that do. Both travel with the client, so every worker
+    honours them. Does nothing unless a read replica is configured.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self.window = get_settings().db_read_sticky_seconds
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not PrismaClient.has_replica():
+            await self.app(scope, receive, send)
+            return
+        headers = Headers(scope=scope)
+        sticky = STICKY_HEADER in headers or f"{STICKY_COOKIE}=" in headers.get("cookie", "")
+        token = PrismaClient.pin_reads_to_primary() if sticky else None
+        if scope["method"] not in _MUTATING:
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                if token is not None:
+                    PrismaClient.unpin_reads(token)
+            return
+
+        writes_token, wrote = PrismaClient.track_writes()
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400 and wrote[0]:
+                seconds = max(1, int(self.window))
+                headers = MutableHeaders(scope=message)
+                headers.append(STICKY_HEADER, str(seconds))
+                headers.append(
+                    "set-cookie",
+                    f"{STICKY_COOKIE}=1; Max-Age={seconds}; Path=/; HttpOnly; SameSite=Lax",
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            PrismaClient.untrack_writes(writes_token)
+            if token is not None:
+                PrismaClient.unpin_reads(token)
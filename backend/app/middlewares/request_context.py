@@ -0,0 +1,74 @@
+import logging
+import time
+import uuid
+from contextvars import ContextVar
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+TRACE_ID_HEADER = "x-trace-id"
+_TRACE_ID_HEADER_BYTES = TRACE_ID_HEADER.encode("latin-1")
+
+trace_id_var: ContextVar[str | None] = ContextVar("trace_id", default=None)
+
+
+def get_trace_id() -> str | None:
+    """Trace id of the request being handled in the current context."""
+    return trace_id_var.get()
+
+
+class RequestContextMiddleware:
+    """Trace id and request logging in one raw ASGI layer.
+
+    Takes the incoming x-trace-id (or generates one), exposes it through
+    ``get_trace_id()`` and ``request.state.trace_id``, and adds it to the
+    response headers at ``http.response.start``. Response bodies, streaming
+    ones included, pass through untouched. One DEBUG line per request logs
+    its status and duration (500 if the app raised before responding);
+    nothing is timed or built for it unless DEBUG is enabled.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        trace_id = None
+        for name, value in scope["headers"]:
+            if name == _TRACE_ID_HEADER_BYTES:
+                trace_id = value.decode("latin-1")
+                break
+        if not trace_id:
+            trace_id = str(uuid.uuid4())
+        scope.setdefault("state", {})["trace_id"] = trace_id
+        token = trace_id_var.set(trace_id)
+
+        debug = logger.isEnabledFor(logging.DEBUG)
+        started = time.perf_counter() if debug else 0.0
+        status = 500
+        header = (_TRACE_ID_HEADER_BYTES, trace_id.encode("latin-1"))
+
+        async def send_with_trace_id(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message["headers"] = [*message.get("headers", ()), header]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_trace_id)
+        finally:
+            if debug:
+                logger.debug(
+                    "Request %s %s -> %d in %.1f ms",
+                    scope["method"],
+                    scope["path"],
+                    status,
+                    (time.perf_counter() - started) * 1000,
+                    extra={"trace_id": trace_id},
+                )
+            trace_id_var.reset(token)
@@ -29,7 +29,11 @@ class ExpenseUpdate(BaseModel):
 
 
 class AdvisorRequest(BaseModel):
-    stocks: list[dict]
+    # Prefer snapshotId/symbols: the server builds the context from its own
+    # quote board. A posted stocks list is still accepted.
+    stocks: Optional[list[dict]] = None
+    snapshotId: Optional[str] = None
+    symbols: Optional[list[str]] = None
     budget: Optional[str] = None
     riskLevel: Optional[str] = None
     messages: Optional[list[dict]] = None
@@ -1,23 +1,145 @@
-from fastapi import APIRouter, HTTPException
+import asyncio
+from typing import AsyncIterator
+
+from fastapi import APIRouter, HTTPException, Request
 from fastapi.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
 
+from app.config import get_settings
 from app.models.schemas import AdvisorRequest
 from app.services.advisor_service import AdvisorService
+from app.utils.limiter import ConcurrencyLimiter, QueueFullError, QueueTimeoutError
 
 router = APIRouter(prefix="/api/stocks/advisor", tags=["advisor"])
 
+_settings = get_settings()
+
+# Caps concurrent advisor streams so a burst cannot crowd the event loop.
+# Each worker enforces its share of the app-wide limits.
+_limiter = ConcurrencyLimiter(
+    limit=_settings.per_worker(_settings.advisor_max_streams),
+    max_waiting=_settings.per_worker(_settings.advisor_max_queued),
+    timeout=_settings.advisor_queue_timeout_seconds,
+)
+
+
+class _Slot:
+    """One limiter slot; released at most once."""
+
+    def __init__(self) -> None:
+        self.held = True
+
+    def release(self, cancelled: bool) -> None:
+        if self.held:
+            self.held = False
+            _limiter.release(cancelled=cancelled)
+
+
+class _SlotStreamingResponse(StreamingResponse):
+    """Streams the advice and releases its slot however the response ends.
+
+    The body generator's own ``finally`` does not run if it is never started
+    (client gone or response cancelled before the first chunk), so the slot
+    and the upstream stream are also let go here.
+    """
+
+    def __init__(
+        self, slot: _Slot, chunks: AsyncIterator[str], request: Request, **kwargs
+    ) -> None:
+        super().__init__(_stream(request, chunks, slot), **kwargs)
+        self.slot = slot
+        self.chunks = chunks
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self.slot.release(cancelled=True)
+            await self.chunks.aclose()
+
+
+async def _wait_for_disconnect(request: Request) -> None:
+    while (await request.receive())["type"] != "http.disconnect":
+        pass
+
+
+async def _stream(
+    request: Request, chunks: AsyncIterator[str], slot: _Slot
+) -> AsyncIterator[str]:
+    """Relay ``chunks`` while holding a limiter slot.
+
+    The next chunk is raced against client disconnect, so a closed tab
+    cancels the upstream stream at once instead of on the next write.
+    """
+    disconnected = asyncio.create_task(_wait_for_disconnect(request))
+    pending: asyncio.Future | None = None
+    cancelled = True
+    try:
+        while True:
+            pending = asyncio.ensure_future(anext(chunks))
+            done, _ = await asyncio.wait(
+                {pending, disconnected}, return_when=asyncio.FIRST_COMPLETED
+            )
+            if pending not in done:
+                return
+            try:
+                chunk = pending.result()
+            except StopAsyncIteration:
+                cancelled = False
+                return
+            yield chunk
+    finally:
+        # Release before awaiting: if the response itself is being cancelled,
+        # the awaits below may be interrupted.
+        slot.release(cancelled=cancelled)
+        disconnected.cancel()
+        if pending is not None and not pending.done():
+            # Unwind the generator mid-await before closing it.
+            pending.cancel()
+            await asyncio.gather(pending, return_exceptions=True)
+        await chunks.aclose()
+
 
 @router.post("")
-async def advisor_stream(body: AdvisorRequest):
+async def advisor_stream(body: AdvisorRequest, request: Request):
+    # Take a slot before any prompt work, so a rejected request costs nothing.
     try:
-        async def stream():
-            async for chunk in AdvisorService.stream_advice(body):
-                yield chunk
-
-        return StreamingResponse(
-            stream(),
-            media_type="text/event-stream",
-            headers={"Cache-Control": "no-cache", "Connection": "keep-alive"},
+        await _limiter.acquire()
+    except QueueFullError:
+        raise HTTPException(
+            status_code=429,
+            detail="Too many advisor requests. Try again shortly.",
+            headers={"Retry-After": "5"},
+        )
+    except QueueTimeoutError:
+        raise HTTPException(
+            status_code=503,
+            detail="Advisor is busy. Try again shortly.",
+            headers={"Retry-After": "5"},
         )
+    try:
+        chunks, prompt = await AdvisorService.stream_advice(body)
     except ValueError as e:
+        _limiter.release(cancelled=True)
         raise HTTPException(status_code=503, detail=str(e))
+    except BaseException:
+        _limiter.release(cancelled=True)
+        raise
+    return _SlotStreamingResponse(
+        _Slot(),
+        chunks,
+        request,
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Stock-Snapshot": prompt["snapshotId"] or "",
+            "X-Prompt-Tokens": str(prompt["promptTokens"]),
+            "X-Context-Omitted": str(prompt["omittedStocks"]),
+        },
+    )
+
+
+@router.get("/metrics")
+async def advisor_metrics():
+    return {**AdvisorService.metrics(), "streams": _limiter.stats()}
@@ -3,6 +3,7 @@ from datetime import datetime
 from fastapi import APIRouter, HTTPException, Query
 
 from app.services.dashboard_service import DashboardService
+from app.utils.serializers import FastJSONResponse
 
 router = APIRouter(prefix="/api/dashboard", tags=["dashboard"])
 
@@ -43,7 +44,9 @@ async def get_dashboard(
                 status_code=400,
                 detail="date_from must be on or before date_to.",
             )
-        return await DashboardService.get_aggregates(date_from=date_from, date_to=date_to)
+        return FastJSONResponse(
+            await DashboardService.get_aggregates(date_from=date_from, date_to=date_to)
+        )
     if month is not None and year is None:
         raise HTTPException(
             status_code=400,
@@ -51,6 +54,6 @@ async def get_dashboard(
         )
     if year is not None:
         if month is not None:
-            return await DashboardService.get_aggregates(year=year, month=month)
-        return await DashboardService.get_aggregates(year=year)
-    return await DashboardService.get_aggregates()
+            return FastJSONResponse(await DashboardService.get_aggregates(year=year, month=month))
+        return FastJSONResponse(await DashboardService.get_aggregates(year=year))
+    return FastJSONResponse(await DashboardService.get_aggregates())
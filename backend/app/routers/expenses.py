@@ -1,7 +1,13 @@
-from fastapi import APIRouter, HTTPException, Query
+import zlib
 
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+
+from app.config import get_settings
 from app.models.schemas import ExpenseCreate, ExpenseUpdate
 from app.services.expense_service import ExpenseService
+from app.utils.ingest import iter_csv, iter_ndjson
+from app.utils.serializers import FastJSONResponse
 
 router = APIRouter(prefix="/api/expenses", tags=["expenses"])
 
@@ -15,22 +21,119 @@ async def list_expenses(
     search: str | None = None,
     sortBy: str = "date",
     sortOrder: str = "desc",
+    pagination: str = Query("offset", pattern="^(offset|cursor)$"),
+    cursor: str | None = Query(None, description="Opaque cursor from nextCursor/prevCursor"),
+    includeTotal: bool = Query(False, description="Cursor mode: include a cached total"),
+    fields: str | None = Query(
+        None,
+        description="Comma-separated Expense fields to return; all when omitted or *",
+    ),
 ):
-    return await ExpenseService.list(
-        page=page,
-        limit=limit,
-        category=category,
-        status=status,
-        search=search,
-        sort_by=sortBy,
-        sort_order=sortOrder,
-    )
+    try:
+        if pagination == "cursor" or cursor:
+            result = await ExpenseService.list_by_cursor(
+                cursor=cursor,
+                limit=limit,
+                category=category,
+                status=status,
+                search=search,
+                sort_by=sortBy,
+                sort_order=sortOrder,
+                include_total=includeTotal,
+                fields=fields,
+            )
+        else:
+            result = await ExpenseService.list(
+                page=page,
+                limit=limit,
+                category=category,
+                status=status,
+                search=search,
+                sort_by=sortBy,
+                sort_order=sortOrder,
+                fields=fields,
+            )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return FastJSONResponse(result)
 
 
 @router.post("", status_code=201)
 async def create_expense(body: ExpenseCreate):
     expense = await ExpenseService.create(body)
-    return {"data": expense}
+    return FastJSONResponse({"data": expense}, status_code=201)
+
+
+@router.post("/import")
+async def import_expenses(
+    request: Request,
+    format: str | None = Query(
+        None,
+        pattern="^(csv|ndjson)$",
+        description="Body format; defaults from Content-Type (text/csv or application/x-ndjson)",
+    ),
+    batchSize: int | None = Query(None, ge=1, le=10000),
+):
+    if format is None:
+        content_type = request.headers.get("content-type", "")
+        if "csv" in content_type:
+            format = "csv"
+        elif "ndjson" in content_type or "jsonl" in content_type:
+            format = "ndjson"
+        else:
+            raise HTTPException(
+                status_code=400,
+                detail="Unknown import format. Pass format=csv|ndjson or a matching Content-Type.",
+            )
+    parse = iter_csv if format == "csv" else iter_ndjson
+    result = await ExpenseService.bulk_import(
+        parse(request.stream()),
+        batch_size=batchSize or get_settings().expense_import_batch_size,
+    )
+    return {"data": result}
+
+
+_EXPORT_MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+
+async def _gzip(chunks):
+    compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)
+    async for chunk in chunks:
+        data = compressor.compress(chunk.encode())
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+@router.get("/export")
+async def export_expenses(
+    request: Request,
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    category: str | None = None,
+    status: str | None = None,
+    search: str | None = None,
+    sortBy: str = "date",
+    sortOrder: str = "desc",
+):
+    try:
+        body = await ExpenseService.export(
+            format=format,
+            category=category,
+            status=status,
+            search=search,
+            sort_by=sortBy,
+            sort_order=sortOrder,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    headers = {
+        "Content-Disposition": f'attachment; filename="expenses.{format}"',
+        "Vary": "Accept-Encoding",
+    }
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        body = _gzip(body)
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(body, media_type=_EXPORT_MEDIA_TYPES[format], headers=headers)
 
 
 @router.get("/{id}")
@@ -38,7 +141,7 @@ async def get_expense(id: str):
     expense = await ExpenseService.get_by_id(id)
     if expense is None:
         raise HTTPException(status_code=404, detail="Expense not found")
-    return {"data": expense}
+    return FastJSONResponse({"data": expense})
 
 
 @router.put("/{id}")
@@ -55,7 +158,7 @@ async def _update(id: str, body: ExpenseUpdate):
     expense = await ExpenseService.update(id, body)
     if expense is None:
         raise HTTPException(status_code=404, detail="Expense not found")
-    return {"data": expense}
+    return FastJSONResponse({"data": expense})
 
 
 @router.delete("/{id}")
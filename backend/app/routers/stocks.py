@@ -1,10 +1,63 @@
-from fastapi import APIRouter
+import json
 
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from app.config import get_settings
+from app.services.quote_history import get_quote_history
+from app.services.quote_stream import get_quote_broadcaster
 from app.services.stock_service import StockService
 
 router = APIRouter(prefix="/api/stocks", tags=["stocks"])
 
 
 @router.get("")
-async def get_stocks():
-    return await StockService.get_stocks()
+async def get_stocks(
+    symbols: str | None = Query(None, description="Comma-separated NSE symbols"),
+    sector: str | None = None,
+    page: int = Query(1, ge=1),
+    limit: int | None = Query(None, ge=1, le=500, description="Page size; omit for all rows"),
+):
+    wanted = None
+    if symbols is not None:
+        wanted = [s.strip().upper() for s in symbols.split(",") if s.strip()]
+    return await StockService.get_stocks(symbols=wanted, sector=sector, page=page, limit=limit)
+
+
+@router.get("/stream")
+async def stream_stocks():
+    """Server-sent events: full board on connect, then only changed symbols."""
+    heartbeat = get_settings().stock_stream_heartbeat_seconds
+    broadcaster = get_quote_broadcaster()
+
+    async def events():
+        subscriber = broadcaster.subscribe()
+        try:
+            while True:
+                changes = await subscriber.next(timeout=heartbeat)
+                if not changes:
+                    yield ": keep-alive\n\n"
+                    continue
+                payload = json.dumps({"data": changes, "source": broadcaster.source})
+                yield f"event: quotes\ndata: {payload}\n\n"
+        finally:
+            broadcaster.unsubscribe(subscriber)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "Connection": "keep-alive"},
+    )
+
+
+@router.get("/{symbol}/history")
+async def get_stock_history(
+    symbol: str,
+    limit: int | None = Query(None, ge=1),
+):
+    """Recorded prices (oldest first) with the latest SMA/EMA/RSI/volatility."""
+    history = get_quote_history()
+    symbol = symbol.upper()
+    if symbol not in history:
+        raise HTTPException(status_code=404, detail="Stock not found")
+    return {"data": history.series(symbol, limit)}
@@ -2,5 +2,6 @@ from app.services.expense_service import ExpenseService
 from app.services.dashboard_service import DashboardService
 from app.services.stock_service import StockService
 from app.services.advisor_service import AdvisorService
+from app.services.rollup_service import RollupService
 
-__all__ = ["ExpenseService", "DashboardService", "StockService", "AdvisorService"]
+__all__ = ["ExpenseService", "DashboardService", "StockService", "AdvisorService", "RollupService"]
@@ -0,0 +1,188 @@
+"""Advisor answers cached by prompt, replayed as SSE, shared while in flight.
+
+A response is recorded as its list of text deltas. Identical requests that
+arrive while the upstream is still streaming attach to the same recording
+and read it from the start (tee); once it completes it is stored in an LRU
+bounded by total bytes, and later hits replay the deltas without calling
+OpenAI at all.
+"""
+
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import AsyncIterator, Callable
+
+from app.config import get_settings
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.split())
+
+
+class _Flight:
+    """One upstream stream, recorded as it arrives and readable by many."""
+
+    def __init__(self) -> None:
+        self.deltas: list[str] = []
+        self.done = False
+        self.error: BaseException | None = None
+        self.readers = 0
+        self.task: asyncio.Task | None = None
+        self._wakeup = asyncio.Event()
+
+    def _notify(self) -> None:
+        self._wakeup.set()
+        self._wakeup = asyncio.Event()
+
+    def append(self, delta: str) -> None:
+        self.deltas.append(delta)
+        self._notify()
+
+    def finish(self, error: BaseException | None = None) -> None:
+        self.done = True
+        self.error = error
+        self._notify()
+
+    async def follow(self) -> AsyncIterator[str]:
+        i = 0
+        while True:
+            while i < len(self.deltas):
+                yield self.deltas[i]
+                i += 1
+            if self.done:
+                if self.error is not None:
+                    raise self.error
+                return
+            await self._wakeup.wait()
+
+
+class AdvisorResponseCache:
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        # key -> (expires_at, nbytes, deltas)
+        self._entries: OrderedDict[str, tuple[float, int, tuple[str, ...]]] = OrderedDict()
+        self._inflight: dict[str, _Flight] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(system: str, user: str) -> str:
+        """Hash of the whitespace-normalized system prompt and user content."""
+        digest = hashlib.sha256()
+        digest.update(_normalize(system).encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(_normalize(user).encode("utf-8"))
+        return digest.hexdigest()
+
+    def _lookup(self, key: str) -> tuple[str, ...] | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, nbytes, deltas = entry
+        if time.monotonic() >= expires_at:
+            del self._entries[key]
+            self.nbytes -= nbytes
+            return None
+        self._entries.move_to_end(key)
+        return deltas
+
+    def _store(self, key: str, deltas: list[str], ttl: float) -> None:
+        nbytes = sum(len(d.encode("utf-8")) for d in deltas)
+        if ttl <= 0 or nbytes > self.max_bytes:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.nbytes -= old[1]
+        self._entries[key] = (time.monotonic() + ttl, nbytes, tuple(deltas))
+        self.nbytes += nbytes
+        while self.nbytes > self.max_bytes:
+            _, (_, evicted, _) = self._entries.popitem(last=False)
+            self.nbytes -= evicted
+            self.evictions += 1
+
+    async def stream(
+        self,
+        key: str,
+        upstream: Callable[[], AsyncIterator[str]],
+        ttl: float,
+        replay_delay: float = 0.0,
+    ) -> AsyncIterator[str]:
+        """Yield the deltas for ``key``: replayed, teed from an in-flight
+        upstream stream, or from a new ``upstream()`` call stored for ``ttl``.
+
+        The upstream runs in its own task and is cancelled only once every
+        reader has gone away.
+        """
+        cached = self._lookup(key)
+        if cached is not None:
+            self.hits += 1
+            for delta in cached:
+                yield delta
+                if replay_delay > 0:
+                    await asyncio.sleep(replay_delay)
+            return
+        flight = self._inflight.get(key)
+        if flight is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            flight = _Flight()
+            self._inflight[key] = flight
+            flight.task = asyncio.create_task(self._produce(key, flight, upstream, ttl))
+        flight.readers += 1
+        try:
+            async for delta in flight.follow():
+                yield delta
+        finally:
+            flight.readers -= 1
+            if flight.readers == 0 and not flight.done:
+                # Detach first so a request arriving now starts a fresh stream.
+                self._detach(key, flight)
+                flight.task.cancel()
+
+    def _detach(self, key: str, flight: _Flight) -> None:
+        if self._inflight.get(key) is flight:
+            del self._inflight[key]
+
+    async def _produce(
+        self,
+        key: str,
+        flight: _Flight,
+        upstream: Callable[[], AsyncIterator[str]],
+        ttl: float,
+    ) -> None:
+        try:
+            async for delta in upstream():
+                flight.append(delta)
+        except asyncio.CancelledError as exc:
+            flight.finish(exc)
+            raise
+        except Exception as exc:
+            flight.finish(exc)
+        else:
+            flight.finish()
+            self._store(key, flight.deltas, ttl)
+        finally:
+            self._detach(key, flight)
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "bytes": self.nbytes,
+            "maxBytes": self.max_bytes,
+            "inflight": len(self._inflight),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+        }
+
+
+@lru_cache(maxsize=1)
+def get_advisor_cache() -> AdvisorResponseCache:
+    return AdvisorResponseCache(max_bytes=get_settings().advisor_cache_max_bytes)
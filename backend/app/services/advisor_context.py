@@ -0,0 +1,73 @@
+"""Stock context for advisor prompts, rendered once per quote snapshot.
+
+Each snapshot's rows are formatted into prompt lines a single time; requests
+then only join the lines they need, stopping at a token budget.
+"""
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token for English/GPT tokenizers)."""
+    return (len(text) + 3) // 4
+
+
+def clip_tokens(text: str, max_tokens: int) -> str:
+    """``text`` cut to at most ``max_tokens`` by the `estimate_tokens` measure."""
+    return text[: max_tokens * 4]
+
+
+def _line(row: dict) -> str:
+    return (
+        f'{row.get("symbol")} ({row.get("name")}): Rs.{row.get("price")}, '
+        f'Change: {row.get("change")}%, P/E: {row.get("pe")}, Sector: {row.get("sector")}'
+    )
+
+
+class StockContext:
+    def __init__(self, snapshot_id: str | None, rows: list[dict]) -> None:
+        self.snapshot_id = snapshot_id
+        self._lines = {row.get("symbol"): _line(row) for row in rows}
+        # +1 for the joining newline.
+        self._tokens = {symbol: estimate_tokens(line) + 1 for symbol, line in self._lines.items()}
+        self._full: tuple[str, int, int] | None = None
+        self._full_budget = 0
+
+    def render(
+        self, symbols: list[str] | None, max_tokens: int, max_symbols: int | None = None
+    ) -> tuple[str, int, int]:
+        """(context, tokens, omitted) for ``symbols`` (all when None), in
+        order, dropping whatever does not fit in ``max_tokens``.
+
+        Unknown and repeated symbols are skipped; requested symbols past
+        ``max_symbols`` count as omitted.
+        """
+        if symbols is None and self._full is not None and self._full_budget == max_tokens:
+            return self._full
+        if symbols is None:
+            picked = list(self._lines)
+            allowed = picked
+        else:
+            picked = list(dict.fromkeys(s for s in symbols if s in self._lines))
+            allowed = picked if max_symbols is None else picked[:max_symbols]
+        lines = []
+        used = 0
+        for symbol in allowed:
+            cost = self._tokens[symbol]
+            if used + cost > max_tokens:
+                break
+            lines.append(self._lines[symbol])
+            used += cost
+        result = ("\n".join(lines), used, len(picked) - len(lines))
+        if symbols is None:
+            self._full, self._full_budget = result, max_tokens
+        return result
+
+
+_current: StockContext | None = None
+
+
+def get_stock_context(board: dict) -> StockContext:
+    """Context for a StockService board, rebuilt only when its snapshot changes."""
+    global _current
+    if _current is None or _current.snapshot_id != board["snapshotId"]:
+        _current = StockContext(board["snapshotId"], board["data"])
+    return _current
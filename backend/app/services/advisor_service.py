@@ -1,9 +1,84 @@
+import asyncio
 import json
-
-from openai import AsyncOpenAI
+import time
+from typing import AsyncIterator
 
 from app.config import get_settings
+from app.core.logging import get_logger
 from app.models.schemas import AdvisorRequest
+from app.services.advisor_cache import AdvisorResponseCache, get_advisor_cache
+from app.services.advisor_context import (
+    StockContext,
+    clip_tokens,
+    estimate_tokens,
+    get_stock_context,
+)
+from app.services.stock_service import StockService
+from app.utils.metrics import LatencyStats
+from app.utils.openai_client import open_openai_client
+
+logger = get_logger(__name__)
+
+_END_OF_STREAM = object()
+
+# Budget and risk level are short labels; anything longer is clipped.
+_FIELD_MAX_TOKENS = 16
+
+_SYSTEM_PROMPT = """You are an expert Indian stock market investment advisor. You provide analysis based on fundamental and technical indicators.
+
+Current Indian Stock Market Data:
+{stock_context}
+
+User's Investment Budget: Rs.{budget}
+Risk Tolerance: {risk}
+
+Guidelines:
+- Always recommend diversification across sectors
+- Consider P/E ratios, market cap, and recent performance
+- Provide specific allocation percentages
+- Mention risks and disclaimers
+- Use Indian Rupee (Rs.) for all amounts
+- Be specific about which stocks to buy and why
+- Always add a disclaimer that this is for educational purposes only
+
+Output format (strict):
+- Respond ONLY in valid Markdown. Your entire response will be rendered as Markdown.
+- Use Markdown headers (##, ###) for sections, bullet points for lists.
+- For the investment summary, use a Markdown table with columns such as: Stock Name, P/E Ratio, Allocation, Amount to Invest (Rs.).
+- Use pipe (|) and hyphens for table borders. Example:
+  | Stock Name | P/E Ratio | Allocation | Amount to Invest |
+  | :--------- | :-------: | :--------: | ----------------: |
+  | HDFC Bank  | 19.2      | 25%        | Rs.25000         |
+- Do not use raw HTML. Use only standard Markdown so the output does not break."""
+
+
+class _PromptStats:
+    def __init__(self) -> None:
+        self.requests = 0
+        self.total_tokens = 0
+        self.max_tokens = 0
+        self.truncated = 0
+
+    def record(self, prompt: dict) -> None:
+        self.requests += 1
+        self.total_tokens += prompt["promptTokens"]
+        self.max_tokens = max(self.max_tokens, prompt["promptTokens"])
+        if prompt["omittedStocks"]:
+            self.truncated += 1
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "meanTokens": round(self.total_tokens / self.requests) if self.requests else 0,
+            "maxTokens": self.max_tokens,
+            "truncated": self.truncated,
+        }
+
+
+_prompts = _PromptStats()
+
+# Request start to first streamed token, upstream connection setup included.
+_ttft = LatencyStats()
 
 
 def _user_content(body: AdvisorRequest) -> str:
@@ -30,59 +105,156 @@ def _user_content(body: AdvisorRequest) -> str:
 
 class AdvisorService:
     @classmethod
-    async def stream_advice(cls, body: AdvisorRequest):
+    def metrics(cls) -> dict:
+        return {
+            "timeToFirstToken": _ttft.stats(),
+            "responseCache": get_advisor_cache().stats(),
+            "prompts": _prompts.stats(),
+        }
+
+    @classmethod
+    async def stream_advice(cls, body: AdvisorRequest) -> tuple[AsyncIterator[str], dict]:
+        """Validate and build the prompt now; return the SSE frame stream and
+        what went into the prompt (snapshot id, token estimate, omitted stocks).
+
+        Raises ValueError up front (not mid-stream) when OpenAI is not configured.
+        """
         settings = get_settings()
-        api_key = settings.openai_api_key
-        if not api_key or not api_key.strip():
+        client = open_openai_client()
+        if client is None:
             raise ValueError(
                 "OpenAI API key is not configured. Set OPENAI_API_KEY in your environment."
             )
-        stocks = body.stocks or []
-        budget = body.budget or "Not specified"
-        risk = body.riskLevel or "Moderate"
-        stock_context = "\n".join(
-            f'{s.get("symbol")} ({s.get("name")}): Rs.{s.get("price")}, Change: {s.get("change")}%, '
-            f'P/E: {s.get("pe")}, Sector: {s.get("sector")}'
-            for s in stocks
+        if body.stocks and not (body.snapshotId or body.symbols):
+            context = StockContext(None, body.stocks)
+        else:
+            # snapshotId names the board the client saw; only the current one
+            # is kept, so it is used either way and reported back.
+            context = get_stock_context(await StockService.get_board())
+        symbols = [s.upper() for s in body.symbols] if body.symbols else None
+        fields = {
+            "budget": clip_tokens(body.budget or "Not specified", _FIELD_MAX_TOKENS),
+            "risk": clip_tokens(body.riskLevel or "Moderate", _FIELD_MAX_TOKENS),
+        }
+        user_content = clip_tokens(_user_content(body), settings.advisor_message_max_tokens)
+        # The stock list gets what the instructions and message leave of the
+        # prompt budget, up to its own cap.
+        room = (
+            settings.advisor_prompt_max_tokens
+            - estimate_tokens(_SYSTEM_PROMPT.format(stock_context="", **fields))
+            - estimate_tokens(user_content)
+        )
+        stock_context, context_tokens, omitted = context.render(
+            symbols,
+            max(0, min(settings.advisor_context_max_tokens, room)),
+            max_symbols=settings.advisor_context_max_symbols,
+        )
+        system = _SYSTEM_PROMPT.format(
+            stock_context=stock_context or "No stock data available", **fields
+        )
+        prompt = {
+            "snapshotId": context.snapshot_id,
+            "contextTokens": context_tokens,
+            "promptTokens": estimate_tokens(system) + estimate_tokens(user_content),
+            "omittedStocks": omitted,
+        }
+        _prompts.record(prompt)
+        messages = [
+            {"role": "system", "content": system},
+            {"role": "user", "content": user_content},
+        ]
+        deltas = get_advisor_cache().stream(
+            AdvisorResponseCache.key(system, user_content),
+            lambda: cls._complete(client, settings.openai_model, messages),
+            # Not beyond the life of the quote board the prompt was built from.
+            ttl=min(
+                settings.advisor_cache_ttl_seconds,
+                settings.stock_quote_ttl_seconds + settings.stock_quote_stale_seconds,
+            ),
+            replay_delay=settings.advisor_replay_delay_seconds,
+        )
+        frames = cls._frames(
+            deltas,
+            window=settings.advisor_frame_window_seconds,
+            max_chars=settings.advisor_frame_max_chars,
         )
-        system = f"""You are an expert Indian stock market investment advisor. You provide analysis based on fundamental and technical indicators.
+        return frames, prompt
 
-Current Indian Stock Market Data:
-{stock_context or "No stock data available"}
+    @classmethod
+    async def _frames(
+        cls, deltas: AsyncIterator[str], window: float, max_chars: int
+    ) -> AsyncIterator[str]:
+        """Coalesce deltas into ``text-delta`` frames of several entries.
 
-User's Investment Budget: Rs.{budget}
-Risk Tolerance: {risk}
+        A frame is flushed ``window`` seconds after its first delta arrived or
+        once it holds ``max_chars`` characters, whichever comes first; with
+        ``window`` <= 0 every delta gets its own frame.
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        buffer: list[str] = []
+        size = 0
+        deadline = 0.0
 
-Guidelines:
-- Always recommend diversification across sectors
-- Consider P/E ratios, market cap, and recent performance
-- Provide specific allocation percentages
-- Mention risks and disclaimers
-- Use Indian Rupee (Rs.) for all amounts
-- Be specific about which stocks to buy and why
-- Always add a disclaimer that this is for educational purposes only
+        async def pump() -> None:
+            try:
+                async for text in deltas:
+                    queue.put_nowait(text)
+                queue.put_nowait(_END_OF_STREAM)
+            except Exception as exc:
+                queue.put_nowait(exc)
 
-Output format (strict):
-- Respond ONLY in valid Markdown. Your entire response will be rendered as Markdown.
-- Use Markdown headers (##, ###) for sections, bullet points for lists.
-- For the investment summary, use a Markdown table with columns such as: Stock Name, P/E Ratio, Allocation, Amount to Invest (Rs.).
-- Use pipe (|) and hyphens for table borders. Example:
-  | Stock Name | P/E Ratio | Allocation | Amount to Invest |
-  | :--------- | :-------: | :--------: | ----------------: |
-  | HDFC Bank  | 19.2      | 25%        | Rs.25000         |
-- Do not use raw HTML. Use only standard Markdown so the output does not break."""
-        user_content = _user_content(body)
-        client = AsyncOpenAI(api_key=api_key)
+        def frame() -> str:
+            nonlocal size
+            entries = [{"type": "text-delta", "textDelta": text} for text in buffer]
+            buffer.clear()
+            size = 0
+            return f"data: {json.dumps(entries)}\n\n"
+
+        # Reading through a queue lets the flush timer fire without cancelling
+        # the upstream iterator mid-step.
+        reader = asyncio.create_task(pump())
+        try:
+            while True:
+                timeout = max(deadline - loop.time(), 0) if buffer else None
+                try:
+                    item = await asyncio.wait_for(queue.get(), timeout)
+                except TimeoutError:
+                    yield frame()
+                    continue
+                if item is _END_OF_STREAM:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                if not buffer:
+                    deadline = loop.time() + window
+                buffer.append(item)
+                size += len(item)
+                if size >= max_chars or window <= 0:
+                    yield frame()
+            if buffer:
+                yield frame()
+            yield "data: [DONE]\n\n"
+        finally:
+            reader.cancel()
+            await asyncio.gather(reader, return_exceptions=True)
+
+    @classmethod
+    async def _complete(cls, client, model: str, messages: list[dict]):
+        """Stream the upstream completion as text deltas."""
+        started = time.perf_counter()
+        first_token = True
         stream = await client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": system},
-                {"role": "user", "content": user_content},
-            ],
+            model=model,
+            messages=messages,
             stream=True,
         )
         async for chunk in stream:
             if chunk.choices and chunk.choices[0].delta.content:
                 text = chunk.choices[0].delta.content
-                yield f"data: {json.dumps([{'type': 'text-delta', 'textDelta': text}])}\n\n"
-        yield "data: [DONE]\n\n"
+                if first_token:
+                    first_token = False
+                    ttft = time.perf_counter() - started
+                    _ttft.record(ttft)
+                    logger.debug("Advisor time to first token: %.3fs", ttft)
+                yield text
@@ -1,7 +1,19 @@
-from collections import defaultdict
 from datetime import datetime, timedelta
 
+from app.config import get_settings
 from app.database.prisma_client import PrismaClient
+from app.services.expense_snapshot import get_expense_snapshot
+from app.services.rollup_service import RollupService
+from app.utils.cache import AsyncTTLCache
+
+_settings = get_settings()
+
+# Keyed on the normalized (start, end_exclusive) range so year, year+month
+# and equivalent custom ranges share one entry.
+_cache: AsyncTTLCache[tuple[datetime | None, datetime | None], dict] = AsyncTTLCache(
+    maxsize=_settings.dashboard_cache_size,
+    ttl=_settings.local_cache_ttl(_settings.dashboard_cache_ttl_seconds),
+)
 
 
 def _date_range(
@@ -29,6 +41,142 @@ def _date_range(
     return None, None
 
 
+# Raw scan for the partial months at either end of a custom range; whole
+# months come from the rollup table instead (see RollupService).
+_RAW_CELLS_SQL = """
+SELECT
+    to_char(date_trunc('month', "date"), 'YYYY-MM') AS month,
+    category,
+    status,
+    COUNT(*)::int AS count,
+    SUM(amount)::float8 AS amount,
+    to_char(MIN("date"), 'YYYY-MM-DD"T"HH24:MI:SS.US') AS first
+FROM expenses
+WHERE "date" >= $1::timestamp AND "date" < $2::timestamp
+GROUP BY 1, 2, 3
+ORDER BY 1, 2, 3
+"""
+
+
+def _month_start(dt: datetime) -> datetime:
+    return datetime(dt.year, dt.month, 1)
+
+
+def _next_month(dt: datetime) -> datetime:
+    return (
+        datetime(dt.year + 1, 1, 1)
+        if dt.month == 12
+        else datetime(dt.year, dt.month + 1, 1)
+    )
+
+
+def _split_range(
+    start: datetime, end: datetime
+) -> tuple[tuple[datetime, datetime] | None, list[tuple[datetime, datetime]]]:
+    """Split [start, end) into whole months and the partial-month edges.
+
+    Returns ``(whole_months, partial_ranges)`` where ``whole_months`` is the
+    month-aligned span answerable from rollups (or None if there is none).
+    """
+    first_whole = start if start == _month_start(start) else _next_month(start)
+    last_whole = _month_start(end)
+    if first_whole >= last_whole:
+        return None, [(start, end)]
+    partial = []
+    if start < first_whole:
+        partial.append((start, first_whole))
+    if last_whole < end:
+        partial.append((last_whole, end))
+    return (first_whole, last_whole), partial
+
+
+def _by_first_appearance(buckets: dict[str, dict]) -> dict[str, dict]:
+    return dict(sorted(buckets.items(), key=lambda item: (item[1]["first"], item[0])))
+
+
+def _build_aggregates(cells: list[dict]) -> dict:
+    """Fold (month, category, status) cells into the dashboard response payload.
+
+    Each cell's ``first`` (its earliest expense as sortable ISO text) puts the
+    status and category lists in order of first appearance by date, as when
+    they were built from the date-ordered rows.
+    """
+    total_count = 0
+    total_amount = 0.0
+    status_map: dict[str, dict] = {}
+    category_map: dict[str, dict] = {}
+    monthly_map: dict[str, dict] = {}
+    for cell in cells:
+        count, amount = cell["count"], cell["amount"]
+        first = cell.get("first") or cell["month"]
+        total_count += count
+        total_amount += amount
+        for key, target in (
+            (cell["status"], status_map),
+            (cell["category"], category_map),
+            (cell["month"], monthly_map),
+        ):
+            bucket = target.setdefault(key, {"count": 0, "amount": 0.0, "first": first})
+            bucket["count"] += count
+            bucket["amount"] += amount
+            bucket["first"] = min(bucket["first"], first)
+    status_map = _by_first_appearance(status_map)
+    category_map = _by_first_appearance(category_map)
+
+    status_data = [
+        {
+            "status": k.capitalize(),
+            "count": v["count"],
+            "amount": round(v["amount"], 2),
+        }
+        for k, v in status_map.items()
+    ]
+    category_data = [
+        {
+            "id": k,
+            "label": k,
+            "value": v["count"],
+            "amount": round(v["amount"], 2),
+        }
+        for k, v in category_map.items()
+    ]
+    monthly_trend = [
+        {"x": k, "y": round(v["amount"], 2), "count": v["count"]}
+        for k, v in sorted(monthly_map.items())
+    ]
+    completed_amount = status_map.get("completed", {}).get("amount", 0) or 0
+    pending_amount = status_map.get("pending", {}).get("amount", 0) or 0
+    top_categories = sorted(
+        [
+            {
+                "category": k,
+                "amount": round(v["amount"], 2),
+                "count": v["count"],
+            }
+            for k, v in category_map.items()
+        ],
+        key=lambda x: -x["amount"],
+    )[:5]
+
+    return {
+        "data": {
+            "summary": {
+                "totalExpenses": total_count,
+                "totalAmount": round(total_amount, 2),
+                "completedAmount": round(completed_amount, 2),
+                "pendingAmount": round(pending_amount, 2),
+                "averageExpense": round(total_amount / total_count, 2)
+                if total_count
+                else 0,
+            },
+            "statusData": status_data,
+            "categoryData": category_data,
+            "monthlyTrend": monthly_trend,
+            "topCategories": top_categories,
+        },
+    }
+
+
 class DashboardService:
     @classmethod
     async def get_aggregates(
@@ -38,100 +186,58 @@ class DashboardService:
         date_from: str | None = None,
         date_to: str | None = None,
     ) -> dict:
-        prisma = PrismaClient.get_client()
-        start_dt, end_dt = _date_range(
+        key = _date_range(
             year=year, month=month, date_from=date_from, date_to=date_to
         )
-        where = (
-            {"date": {"gte": start_dt, "lt": end_dt}}
-            if (start_dt is not None and end_dt is not None)
-            else None
-        )
+        return await _cache.get_or_load(key, lambda: cls._compute(*key))
 
-        expenses_list = await prisma.expense.find_many(
-            where=where,
-            order=[{"date": "asc"}],
-        )
-        expenses = [e.model_dump() for e in expenses_list]
+    @classmethod
+    async def _compute(
+        cls, start_dt: datetime | None, end_dt: datetime | None
+    ) -> dict:
+        snapshot = get_expense_snapshot()
+        if snapshot.is_ready:
+            return _build_aggregates(snapshot.cells(start_dt, end_dt))
+        if start_dt is None or end_dt is None:
+            return _build_aggregates(await RollupService.fetch_cells())
 
-        total_amount = sum(float(e.get("amount", 0)) for e in expenses)
-        total_count = len(expenses)
-        status_map: dict[str, dict] = defaultdict(
-            lambda: {"count": 0, "amount": 0.0}
-        )
-        category_map: dict[str, dict] = defaultdict(
-            lambda: {"count": 0, "amount": 0.0}
-        )
-        monthly_map: dict[str, dict] = defaultdict(
-            lambda: {"count": 0, "amount": 0.0}
-        )
+        whole_months, partial = _split_range(start_dt, end_dt)
+        cells: list[dict] = []
+        if whole_months is not None:
+            cells.extend(await RollupService.fetch_cells(*whole_months))
+        if partial:
+            prisma = PrismaClient.get_read_client(shared=True)
+            for lo, hi in partial:
+                cells.extend(await prisma.query_raw(_RAW_CELLS_SQL, lo, hi))
+        cells.sort(key=lambda c: c["month"])
+        return _build_aggregates(cells)
 
-        for e in expenses:
-            st = e.get("status", "pending")
-            status_map[st]["count"] += 1
-            status_map[st]["amount"] += float(e.get("amount", 0))
-            cat = e.get("category", "")
-            category_map[cat]["count"] += 1
-            category_map[cat]["amount"] += float(e.get("amount", 0))
-            date_val = e.get("date")
-            if date_val:
-                month_key = (
-                    date_val[:7]
-                    if isinstance(date_val, str)
-                    else str(date_val)[:7]
-                )
-                monthly_map[month_key]["count"] += 1
-                monthly_map[month_key]["amount"] += float(e.get("amount", 0))
-
-        status_data = [
-            {
-                "status": k.capitalize(),
-                "count": v["count"],
-                "amount": round(v["amount"], 2),
-            }
-            for k, v in status_map.items()
-        ]
-        category_data = [
-            {
-                "id": k,
-                "label": k,
-                "value": v["count"],
-                "amount": round(v["amount"], 2),
-            }
-            for k, v in category_map.items()
-        ]
-        monthly_trend = [
-            {"x": k, "y": round(v["amount"], 2), "count": v["count"]}
-            for k, v in sorted(monthly_map.items())
-        ]
-        completed_amount = status_map.get("completed", {}).get("amount", 0) or 0
-        pending_amount = status_map.get("pending", {}).get("amount", 0) or 0
-        top_categories = sorted(
-            [
-                {
-                    "category": k,
-                    "amount": round(v["amount"], 2),
-                    "count": v["count"],
-                }
-                for k, v in category_map.items()
-            ],
-            key=lambda x: -x["amount"],
-        )[:5]
-
-        return {
-            "data": {
-                "summary": {
-                    "totalExpenses": total_count,
-                    "totalAmount": round(total_amount, 2),
-                    "completedAmount": round(completed_amount, 2),
-                    "pendingAmount": round(pending_amount, 2),
-                    "averageExpense": round(total_amount / total_count, 2)
-                    if total_count
-                    else 0,
-                },
-                "statusData": status_data,
-                "categoryData": category_data,
-                "monthlyTrend": monthly_trend,
-                "topCategories": top_categories,
-            },
-        }
+    @classmethod
+    def invalidate(cls, *dates: datetime) -> int:
+        """Drop cached responses whose date range covers any of ``dates``."""
+        days = [d.replace(tzinfo=None) for d in dates if d is not None]
+
+        def covers(key: tuple[datetime | None, datetime | None]) -> bool:
+            start, end = key
+            if start is None or end is None:
+                return True
+            return any(start <= d < end for d in days)
+
+        return _cache.invalidate(covers)
+
+    @classmethod
+    def invalidate_between(cls, first: datetime, last: datetime) -> int:
+        """Drop cached responses whose range overlaps [first, last]."""
+        first, last = first.replace(tzinfo=None), last.replace(tzinfo=None)
+
+        def overlaps(key: tuple[datetime | None, datetime | None]) -> bool:
+            start, end = key
+            if start is None or end is None:
+                return True
+            return start <= last and first < end
+
+        return _cache.invalidate(overlaps)
+
+    @classmethod
+    def cache_stats(cls) -> dict:
+        return _cache.stats()
@@ -0,0 +1,65 @@
+"""Projected (``fields=``) expense list pages without a search term.
+
+prisma-client-py has no ``select`` on find_many, so these read only the
+requested columns through raw SQL and return dict rows keyed by column. The
+filters and (field, id) ordering are those of the ORM list queries, so the
+same indexes serve them; the SQL is built with expense_sql, like searches.
+"""
+
+from app.database.prisma_client import PrismaClient
+from app.services.expense_sql import SqlQuery, keyset_order, select_list
+
+
+def page_query(
+    columns: tuple[str, ...],
+    *,
+    category: str | None = None,
+    status: str | None = None,
+    field: str = "date",
+    order: str = "desc",
+    offset: int = 0,
+    limit: int = 20,
+) -> tuple[str, list]:
+    """SQL and args for an offset page of ``columns`` in (field, id) ``order``."""
+    q = SqlQuery()
+    q.filter(category, status)
+    sql = (
+        f"SELECT {select_list(columns)} FROM expenses {q.where}"
+        f" ORDER BY {keyset_order(field, order)}"
+        f" LIMIT {q.param(limit)} OFFSET {q.param(offset)}"
+    )
+    return sql, q.args
+
+
+def keyset_query(
+    columns: tuple[str, ...],
+    *,
+    category: str | None = None,
+    status: str | None = None,
+    field: str,
+    order: str,
+    after: tuple | None = None,
+    limit: int = 20,
+) -> tuple[str, list]:
+    """SQL and args for ``columns`` of rows past the ``after`` = (value, id)
+    boundary in (field, id) ``order``."""
+    q = SqlQuery()
+    q.filter(category, status)
+    q.after(field, order, after)
+    sql = (
+        f"SELECT {select_list(columns)} FROM expenses {q.where}"
+        f" ORDER BY {keyset_order(field, order)} LIMIT {q.param(limit)}"
+    )
+    return sql, q.args
+
+
+async def projected_page(columns: tuple[str, ...], **kwargs) -> list[dict]:
+    """Offset page of dict rows; see page_query."""
+    sql, args = page_query(columns, **kwargs)
+    return await PrismaClient.get_read_client().query_raw(sql, *args)
+
+
+async def projected_keyset(columns: tuple[str, ...], **kwargs) -> list[dict]:
+    """Keyset page of dict rows; see keyset_query."""
+    sql, args = keyset_query(columns, **kwargs)
+    return await PrismaClient.get_read_client().query_raw(sql, *args)
@@ -0,0 +1,151 @@
+"""Indexed title/description search for the expense list.
+
+Matching uses ILIKE on `title` and `description`, which Postgres serves from
+the pg_trgm GIN indexes declared in schema.prisma instead of a sequential
+scan. Every whitespace-separated term must match one of the two columns:
+terms of three or more characters anywhere, shorter ones only at the start of
+the column. A one- or two-character '%term%' pattern has no trigram to look
+up, so it would scan the whole table; 'term%' still has the padded leading
+trigrams and stays indexed.
+Ranking favours titles that start with the query, then words in the title
+that start with a term, then trigram word similarity.
+
+Searches with ``fields=`` read only the requested columns.
+"""
+
+from prisma.models import Expense
+
+from app.database.prisma_client import PrismaClient
+from app.services.expense_sql import SqlQuery, keyset_order, select_list
+
+# Postgres ARE word-start anchor.
+_WORD_START = r"\m"
+
+# Shortest term matched as a substring; shorter terms are prefix-matched.
+MIN_SUBSTRING_TERM = 3
+
+
+def _like_escape(term: str) -> str:
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _regex_escape(term: str) -> str:
+    return "".join("\\" + ch if not ch.isalnum() else ch for ch in term)
+
+
+def search_terms(search: str) -> list[str]:
+    return search.split()
+
+
+def _filtered(
+    terms: list[str], category: str | None, status: str | None
+) -> SqlQuery:
+    q = SqlQuery()
+    for term in terms:
+        pattern = f"{_like_escape(term)}%"
+        if len(term) >= MIN_SUBSTRING_TERM:
+            pattern = "%" + pattern
+        p = q.param(pattern)
+        q.clauses.append(f"(title ILIKE {p} OR description ILIKE {p})")
+    q.filter(category, status)
+    return q
+
+
+def _rank_sql(q: SqlQuery, terms: list[str]) -> str:
+    text = " ".join(terms)
+    prefix = q.param(f"{_like_escape(text)}%")
+    word_prefixes = " + ".join(
+        f"(title ~* {q.param(_WORD_START + _regex_escape(t))})::int" for t in terms
+    )
+    similarity = q.param(text)
+    return (
+        f"(2 * (title ILIKE {prefix})::int + {word_prefixes}"
+        f" + word_similarity({similarity}, title))"
+    )
+
+
+async def _fetch(sql: str, args: list, columns: tuple[str, ...] | None):
+    client = PrismaClient.get_read_client()
+    if columns:
+        return await client.query_raw(sql, *args)
+    return await client.query_raw(sql, *args, model=Expense)
+
+
+def count_query(
+    search: str, category: str | None = None, status: str | None = None
+) -> tuple[str, list]:
+    q = _filtered(search_terms(search), category, status)
+    return f"SELECT COUNT(*)::int AS total FROM expenses {q.where}", q.args
+
+
+def page_query(
+    search: str,
+    *,
+    category: str | None = None,
+    status: str | None = None,
+    field: str | None = None,
+    order: str = "desc",
+    offset: int = 0,
+    limit: int = 20,
+    columns: tuple[str, ...] | None = None,
+) -> tuple[str, list]:
+    """SQL and args for an offset page of matches ordered by ``field`` or, if
+    None, by relevance."""
+    terms = search_terms(search)
+    q = _filtered(terms, category, status)
+    if field is None:
+        order_by = f'{_rank_sql(q, terms)} DESC, "date" DESC, id DESC'
+    else:
+        order_by = keyset_order(field, order)
+    sql = (
+        f"SELECT {select_list(columns)} FROM expenses {q.where} ORDER BY {order_by}"
+        f" LIMIT {q.param(limit)} OFFSET {q.param(offset)}"
+    )
+    return sql, q.args
+
+
+def keyset_query(
+    search: str,
+    *,
+    category: str | None = None,
+    status: str | None = None,
+    field: str,
+    order: str,
+    after: tuple | None = None,
+    limit: int = 20,
+    columns: tuple[str, ...] | None = None,
+) -> tuple[str, list]:
+    """SQL and args for rows past the ``after`` = (value, id) boundary in
+    (field, id) ``order``."""
+    q = _filtered(search_terms(search), category, status)
+    q.after(field, order, after)
+    sql = (
+        f"SELECT {select_list(columns)} FROM expenses {q.where}"
+        f" ORDER BY {keyset_order(field, order)} LIMIT {q.param(limit)}"
+    )
+    return sql, q.args
+
+
+async def search_count(
+    search: str,
+    category: str | None = None,
+    status: str | None = None,
+    shared: bool = False,
+) -> int:
+    """Number of matches; ``shared`` as for PrismaClient.get_read_client."""
+    sql, args = count_query(search, category, status)
+    row = await PrismaClient.get_read_client(shared=shared).query_first(sql, *args)
+    return row["total"] if row else 0
+
+
+async def search_page(search: str, **kwargs) -> list[Expense] | list[dict]:
+    """Offset page of matches; see page_query. With ``columns``, only those
+    are read and rows come back as dicts."""
+    sql, args = page_query(search, **kwargs)
+    return await _fetch(sql, args, kwargs.get("columns"))
+
+
+async def search_keyset(search: str, **kwargs) -> list[Expense] | list[dict]:
+    """Keyset page of matches; see keyset_query."""
+    sql, args = keyset_query(search, **kwargs)
+    return await _fetch(sql, args, kwargs.get("columns"))
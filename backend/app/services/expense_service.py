@@ -1,8 +1,30 @@
-from datetime import datetime
+import csv
+import io
+import json
+import time
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import AsyncIterator, Callable
+from uuid import uuid4
 
+from prisma.models import Expense
+from pydantic import ValidationError
+
+from app.config import get_settings
 from app.database.prisma_client import PrismaClient
 from app.models.schemas import ExpenseCreate, ExpenseUpdate, ExpenseStatus
-from app.utils.serializers import row_to_expense
+from app.services.dashboard_service import DashboardService
+from app.services.expense_projection import projected_keyset, projected_page
+from app.services.expense_search import search_count, search_keyset, search_page
+from app.services.expense_snapshot import get_expense_snapshot
+from app.utils.cache import AsyncTTLCache
+from app.utils.ingest import ParsedRecord
+from app.utils.pagination import decode_cursor, encode_cursor
+from app.utils.serializers import EXPENSE_FIELDS, compile_plan, register_plan, row_to_expense
+
+# Row-locks the current version so the old date used for cache invalidation
+# is the one this update actually replaced.
+_LOCK_EXPENSE_SQL = "SELECT * FROM expenses WHERE id = $1 FOR UPDATE"
 
 
 def _parse_date(value: str | datetime | None) -> datetime:
@@ -17,6 +39,183 @@ def _parse_date(value: str | datetime | None) -> datetime:
         return datetime.utcnow()
 
 
+# Per-row import errors beyond this many are counted but not returned.
+_MAX_IMPORT_ERRORS = 100
+
+# Imported None values (empty CSV cells, JSON nulls) for these fields fall
+# back to the ExpenseCreate default instead of failing validation.
+_DEFAULTED_FIELDS = frozenset(
+    name for name, field in ExpenseCreate.model_fields.items() if not field.is_required()
+)
+
+
+def _strict_date(value: str | None) -> datetime:
+    """Like `_parse_date`, but rejects unparseable input and returns naive UTC."""
+    if not value:
+        return datetime.utcnow()
+    try:
+        dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        raise ValueError(f"Invalid date {value!r}. Use ISO 8601 (YYYY-MM-DD).")
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt
+
+
+def _validation_message(e: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(p) for p in err['loc']) or 'row'}: {err['msg']}"
+        for err in e.errors()
+    )
+
+
+_EXPORT_BATCH_SIZE = 1000
+_EXPORT_COLUMNS = [
+    "id",
+    "title",
+    "amount",
+    "category",
+    "status",
+    "description",
+    "date",
+    "createdAt",
+    "updatedAt",
+]
+
+
+# API sort names -> Expense fields usable as a keyset (all non-nullable).
+_SORT_FIELDS = {
+    "date": "date",
+    "amount": "amount",
+    "title": "title",
+    "category": "category",
+    "status": "status",
+    "created_at": "created_at",
+    "createdAt": "created_at",
+    "updated_at": "updated_at",
+    "updatedAt": "updated_at",
+}
+_DATETIME_FIELDS = {"date", "created_at", "updated_at"}
+
+# fields= names (response keys or model attributes) -> EXPENSE_FIELDS entry.
+_FIELDS_BY_NAME = {name: f for f in EXPENSE_FIELDS for name in (f[0], f[1])}
+Projection = tuple[tuple[str, str, bool], ...]
+
+# Totals for cursor mode are served from here and may lag writes by the TTL.
+_count_cache: AsyncTTLCache[tuple, int] = AsyncTTLCache(
+    maxsize=256, ttl=get_settings().local_cache_ttl(30.0)
+)
+
+
+def _list_where(category: str | None, status: str | None) -> dict:
+    where: dict = {}
+    if category:
+        where["category"] = category
+    if status:
+        where["status"] = status
+    return where
+
+
+def _projection(fields: str | None) -> Projection | None:
+    """EXPENSE_FIELDS entries named by a ``fields=`` value, in response order.
+
+    No value or ``*`` selects every field (None). ``id`` is always included.
+    """
+    names = {n.strip() for n in (fields or "*").split(",") if n.strip()}
+    if "*" in names:
+        return None
+    unknown = sorted(names - _FIELDS_BY_NAME.keys())
+    if unknown:
+        raise ValueError(
+            f"Unknown field(s): {', '.join(unknown)}. "
+            f"Use any of: {', '.join(key for _, key, _ in EXPENSE_FIELDS)}, or *."
+        )
+    wanted = {_FIELDS_BY_NAME[n] for n in names} | {_FIELDS_BY_NAME["id"]}
+    return tuple(f for f in EXPENSE_FIELDS if f in wanted)
+
+
+@lru_cache(maxsize=64)
+def _row_plan(projection: Projection) -> Callable[[dict], dict]:
+    return compile_plan(projection, mapping=True)
+
+
+def _columns(projection: Projection | None, *extra: str) -> tuple[str, ...] | None:
+    if projection is None:
+        return None
+    columns = [attr for attr, _, _ in projection]
+    return tuple(columns + [c for c in extra if c not in columns])
+
+
+def _row_key(row, field: str) -> tuple:
+    """(sort value, id) of a model or projected dict row, for its cursor."""
+    if isinstance(row, dict):
+        return row[field], row["id"]
+    return getattr(row, field), row.id
+
+
+def _cursor_value(field: str, value):
+    if field in _DATETIME_FIELDS:
+        try:
+            return datetime.fromisoformat(value)
+        except (TypeError, ValueError) as e:
+            raise ValueError("Invalid cursor.") from e
+    return value
+
+
+async def _keyset_batch(
+    *,
+    category: str | None,
+    status: str | None,
+    search: str,
+    field: str,
+    scan: str,
+    after: tuple | None,
+    limit: int,
+    columns: tuple[str, ...] | None = None,
+) -> list[Expense] | list[dict]:
+    """Up to ``limit`` rows past ``after`` = (value, id) in (field, id) ``scan`` order.
+
+    Projected (``columns``) batches are read as dict rows through raw SQL.
+    """
+    if search:
+        return await search_keyset(
+            search,
+            category=category,
+            status=status,
+            field=field,
+            order=scan,
+            after=after,
+            limit=limit,
+            columns=columns,
+        )
+    if columns:
+        return await projected_keyset(
+            columns,
+            category=category,
+            status=status,
+            field=field,
+            order=scan,
+            after=after,
+            limit=limit,
+        )
+    where = _list_where(category, status)
+    filters = [where] if where else []
+    if after is not None:
+        value, id = after
+        op = "lt" if scan == "desc" else "gt"
+        filters.append({"OR": [{field: {op: value}}, {field: value, "id": {op: id}}]})
+    return await PrismaClient.get_read_client().expense.find_many(
+        where={"AND": filters} if filters else None,
+        order=[{field: scan}, {"id": scan}],
+        take=limit,
+    )
+
+
+# List/detail payloads carry Expense models; FastJSONResponse encodes them
+# with this plan. _expense_to_response remains for the CSV/NDJSON export.
+register_plan(Expense, EXPENSE_FIELDS)
+
+
 def _expense_to_response(expense) -> dict:
     return row_to_expense(
         expense.model_dump() if hasattr(expense, "model_dump") else expense
@@ -34,16 +233,50 @@ class ExpenseService:
         search: str | None = None,
         sort_by: str = "date",
         sort_order: str = "desc",
+        fields: str | None = None,
     ) -> dict:
-        prisma = PrismaClient.get_client()
-        where: dict = {}
-        if category:
-            where["category"] = category
-        if status:
-            where["status"] = status
-        if search and search.strip():
-            where["title"] = {"contains": search.strip(), "mode": "insensitive"}
+        """Offset page of expenses.
 
+        ``fields`` (comma-separated) limits the columns read and returned;
+        omitted or ``*``, rows carry every field. Raises ValueError for
+        unknown fields.
+        """
+        projection = _projection(fields)
+        search = (search or "").strip()
+        skip = (page - 1) * limit
+        if search or projection is not None:
+            order = "asc" if sort_order.lower() == "asc" else "desc"
+            if search:
+                total = await search_count(search, category, status)
+                items = await search_page(
+                    search,
+                    category=category,
+                    status=status,
+                    field=None if sort_by == "relevance" else _SORT_FIELDS.get(sort_by, "date"),
+                    order=order,
+                    offset=skip,
+                    limit=limit,
+                    columns=_columns(projection),
+                )
+            else:
+                total = await PrismaClient.get_read_client().expense.count(
+                    where=_list_where(category, status) or None
+                )
+                items = await projected_page(
+                    _columns(projection),
+                    category=category,
+                    status=status,
+                    field=_SORT_FIELDS.get(sort_by, "date"),
+                    order=order,
+                    offset=skip,
+                    limit=limit,
+                )
+            if projection is not None:
+                items = list(map(_row_plan(projection), items))
+            return cls._offset_page(items, page, limit, total)
+
+        prisma = PrismaClient.get_read_client()
+        where = _list_where(category, status)
         order_field = (
             "created_at"
             if sort_by in ("created_at", "createdAt")
@@ -53,7 +286,6 @@ class ExpenseService:
         )
         order = {order_field: "asc" if sort_order.lower() == "asc" else "desc"}
 
-        skip = (page - 1) * limit
         total = await prisma.expense.count(where=where or None)
         items = await prisma.expense.find_many(
             where=where or None,
@@ -61,8 +293,12 @@ class ExpenseService:
             skip=skip,
             take=limit,
         )
+        return cls._offset_page(items, page, limit, total)
+
+    @staticmethod
+    def _offset_page(items: list, page: int, limit: int, total: int) -> dict:
         return {
-            "data": [_expense_to_response(e) for e in items],
+            "data": items,
             "pagination": {
                 "page": page,
                 "limit": limit,
@@ -72,15 +308,104 @@ class ExpenseService:
         }
 
     @classmethod
-    async def get_by_id(cls, id: str) -> dict | None:
-        prisma = PrismaClient.get_client()
-        expense = await prisma.expense.find_unique(where={"id": id})
-        if expense is None:
-            return None
-        return _expense_to_response(expense)
+    async def list_by_cursor(
+        cls,
+        cursor: str | None = None,
+        limit: int = 20,
+        category: str | None = None,
+        status: str | None = None,
+        search: str | None = None,
+        sort_by: str = "date",
+        sort_order: str = "desc",
+        include_total: bool = False,
+        fields: str | None = None,
+    ) -> dict:
+        """Keyset-paginated list; cost per page does not grow with depth.
+
+        The cursor pins the sort field and order it was issued for, so a
+        client paging with it cannot silently switch sort mid-way. ``fields``
+        projects rows as in `list`.
+        """
+        projection = _projection(fields)
+        if sort_by not in _SORT_FIELDS:
+            raise ValueError(
+                f"Invalid sortBy. Use one of: {', '.join(sorted(_SORT_FIELDS))}."
+            )
+        field = _SORT_FIELDS[sort_by]
+        order = "asc" if sort_order.lower() == "asc" else "desc"
+        search = (search or "").strip()
+        forward = True
+        after = None
+        if cursor:
+            c = decode_cursor(cursor)
+            if c["f"] != field or c["o"] != order:
+                raise ValueError("Cursor does not match sortBy/sortOrder.")
+            forward = c["d"] == "next"
+            after = (_cursor_value(field, c["v"]), c["id"])
+
+        # Walk backwards by flipping the order, then restore display order.
+        scan = order if forward else ("desc" if order == "asc" else "asc")
+        items = await _keyset_batch(
+            category=category,
+            status=status,
+            search=search,
+            field=field,
+            scan=scan,
+            after=after,
+            limit=limit + 1,
+            columns=_columns(projection, field),
+        )
+        has_more = len(items) > limit
+        items = items[:limit]
+        if not forward:
+            items.reverse()
+
+        has_next = has_more if forward else True
+        has_prev = bool(cursor) if forward else has_more
+        next_cursor = prev_cursor = None
+        if items and has_next:
+            value, id = _row_key(items[-1], field)
+            next_cursor = encode_cursor(field, order, value, id, "next")
+        if items and has_prev:
+            value, id = _row_key(items[0], field)
+            prev_cursor = encode_cursor(field, order, value, id, "prev")
+        if projection is not None:
+            items = list(map(_row_plan(projection), items))
+
+        pagination: dict = {
+            "limit": limit,
+            "nextCursor": next_cursor,
+            "prevCursor": prev_cursor,
+        }
+        if include_total:
+            pagination["total"] = await _count_cache.get_or_load(
+                (category, status, search),
+                lambda: cls._count(category, status, search),
+            )
+            pagination["totalIsEstimate"] = True
+        return {
+            "data": items,
+            "pagination": pagination,
+        }
+
+    @classmethod
+    async def _count(
+        cls, category: str | None, status: str | None, search: str
+    ) -> int:
+        if search:
+            return await search_count(search, category, status, shared=True)
+        where = _list_where(category, status)
+        return await PrismaClient.get_read_client(shared=True).expense.count(
+            where=where or None
+        )
+
+    @classmethod
+    async def get_by_id(cls, id: str) -> Expense | None:
+        prisma = PrismaClient.get_read_client()
+        return await prisma.expense.find_unique(where={"id": id})
 
     @classmethod
-    async def create(cls, body: ExpenseCreate) -> dict:
+    async def create(cls, body: ExpenseCreate) -> Expense:
         prisma = PrismaClient.get_client()
         data = {
             "title": body.title,
@@ -91,10 +416,14 @@ class ExpenseService:
             "date": _parse_date(body.date),
         }
         expense = await prisma.expense.create(data=data)
-        return _expense_to_response(expense)
+        get_expense_snapshot().upsert(expense)
+        DashboardService.invalidate(expense.date)
+        _count_cache.clear()
+        PrismaClient.note_write()
+        return expense
 
     @classmethod
-    async def update(cls, id: str, body: ExpenseUpdate) -> dict | None:
+    async def update(cls, id: str, body: ExpenseUpdate) -> Expense | None:
         prisma = PrismaClient.get_client()
         payload = body.model_dump(exclude_unset=True)
         if "status" in payload and isinstance(payload["status"], ExpenseStatus):
@@ -103,12 +432,163 @@ class ExpenseService:
             payload["date"] = _parse_date(payload["date"])
         if not payload:
             return await cls.get_by_id(id)
-        expense = await prisma.expense.update(where={"id": id}, data=payload)
-        if expense is None:
-            return None
-        return _expense_to_response(expense)
+        async with prisma.tx() as tx:
+            before = await tx.query_first(_LOCK_EXPENSE_SQL, id, model=Expense)
+            if before is None:
+                return None
+            expense = await tx.expense.update(where={"id": id}, data=payload)
+        get_expense_snapshot().upsert(expense)
+        DashboardService.invalidate(before.date, expense.date)
+        _count_cache.clear()
+        PrismaClient.note_write()
+        return expense
 
     @classmethod
     async def delete(cls, id: str) -> None:
         prisma = PrismaClient.get_client()
-        await prisma.expense.delete(where={"id": id})
+        expense = await prisma.expense.delete(where={"id": id})
+        get_expense_snapshot().forget(id)
+        if expense is not None:
+            DashboardService.invalidate(expense.date)
+            _count_cache.clear()
+            PrismaClient.note_write()
+
+    @classmethod
+    async def bulk_import(
+        cls,
+        records: AsyncIterator[ParsedRecord],
+        batch_size: int = 1000,
+    ) -> dict:
+        """Validate streamed records and insert them in `create_many` batches.
+
+        Each batch is one INSERT (rollups follow via the table's triggers), so
+        a failing batch does not undo the ones before it. Ids are generated
+        here so inserted rows can go straight into the expense snapshot.
+        """
+        started = time.perf_counter()
+        prisma = PrismaClient.get_client()
+        snapshot = get_expense_snapshot()
+        inserted = failed = 0
+        errors: list[dict] = []
+        batch: list[dict] = []
+        batch_start = 0
+        first_date: datetime | None = None
+        last_date: datetime | None = None
+
+        def fail(line: int, message: str, rows: int = 1) -> None:
+            nonlocal failed
+            failed += rows
+            if len(errors) < _MAX_IMPORT_ERRORS:
+                errors.append({"line": line, "error": message})
+
+        async def flush() -> None:
+            nonlocal inserted, first_date, last_date
+            if not batch:
+                return
+            try:
+                await prisma.expense.create_many(data=batch)
+            except Exception as e:
+                fail(batch_start, f"Batch of {len(batch)} rows starting here failed: {e}", len(batch))
+            else:
+                inserted += len(batch)
+                snapshot.upsert_rows(batch)
+                dates = [row["date"] for row in batch]
+                lo, hi = min(dates), max(dates)
+                first_date = lo if first_date is None else min(first_date, lo)
+                last_date = hi if last_date is None else max(last_date, hi)
+            batch.clear()
+
+        async for line, record, error in records:
+            if error is not None:
+                fail(line, error)
+                continue
+            record = {
+                k: v for k, v in record.items() if v is not None or k not in _DEFAULTED_FIELDS
+            }
+            try:
+                body = ExpenseCreate.model_validate(record)
+                date = _strict_date(body.date)
+            except ValidationError as e:
+                fail(line, _validation_message(e))
+                continue
+            except ValueError as e:
+                fail(line, str(e))
+                continue
+            if not batch:
+                batch_start = line
+            batch.append(
+                {
+                    "id": str(uuid4()),
+                    "title": body.title,
+                    "amount": body.amount,
+                    "category": body.category,
+                    "status": body.status.value,
+                    "description": body.description,
+                    "date": date,
+                }
+            )
+            if len(batch) >= batch_size:
+                await flush()
+        await flush()
+
+        if inserted:
+            DashboardService.invalidate_between(first_date, last_date)
+            _count_cache.clear()
+            PrismaClient.note_write()
+        elapsed = time.perf_counter() - started
+        return {
+            "inserted": inserted,
+            "failed": failed,
+            "errors": errors,
+            "elapsedMs": round(elapsed * 1000, 1),
+            "rowsPerSecond": round(inserted / elapsed, 1) if elapsed > 0 else None,
+        }
+
+    @classmethod
+    async def export(
+        cls,
+        format: str = "csv",
+        category: str | None = None,
+        status: str | None = None,
+        search: str | None = None,
+        sort_by: str = "date",
+        sort_order: str = "desc",
+    ) -> AsyncIterator[str]:
+        """Yield the filtered expenses as CSV or NDJSON text, one keyset batch at a time."""
+        if sort_by not in _SORT_FIELDS:
+            raise ValueError(
+                f"Invalid sortBy. Use one of: {', '.join(sorted(_SORT_FIELDS))}."
+            )
+        field = _SORT_FIELDS[sort_by]
+        order = "asc" if sort_order.lower() == "asc" else "desc"
+        search = (search or "").strip()
+
+        async def generate() -> AsyncIterator[str]:
+            if format == "csv":
+                yield ",".join(_EXPORT_COLUMNS) + "\r\n"
+            after = None
+            while True:
+                items = await _keyset_batch(
+                    category=category,
+                    status=status,
+                    search=search,
+                    field=field,
+                    scan=order,
+                    after=after,
+                    limit=_EXPORT_BATCH_SIZE,
+                )
+                if not items:
+                    return
+                rows = [_expense_to_response(e) for e in items]
+                if format == "csv":
+                    buf = io.StringIO()
+                    csv.DictWriter(buf, _EXPORT_COLUMNS, extrasaction="ignore").writerows(rows)
+                    yield buf.getvalue()
+                else:
+                    yield "".join(json.dumps(row) + "\n" for row in rows)
+                if len(items) < _EXPORT_BATCH_SIZE:
+                    return
+                last = items[-1]
+                after = (getattr(last, field), last.id)
+
+        return generate()
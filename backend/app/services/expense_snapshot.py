@@ -0,0 +1,376 @@
+"""In-process columnar copy of `expenses` for dashboard analytics.
+
+Only the columns the dashboard aggregates over are kept, one NumPy array per
+column: amounts as float64, dates as int32 days since the Unix epoch and
+category/status as small dictionary-encoded ints. The snapshot follows the
+table by polling `updated_at` past a high-water mark. Deletes made through
+this process are applied immediately; after each poll, per-month row counts
+are checked against the trigger-maintained rollup table, and any month that
+disagrees (a delete made by another worker or tool) is re-read. The periodic
+full reload is only a safety net.
+"""
+
+import asyncio
+import sys
+import time
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+
+import numpy as np
+
+from app.config import get_settings
+from app.core.logging import get_logger
+from app.database.prisma_client import PrismaClient
+
+logger = get_logger(__name__)
+
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+# Re-read this far behind the high-water mark so rows whose transaction
+# committed after a later `updated_at` became visible are not skipped.
+_OVERLAP = timedelta(seconds=2)
+
+# ORDER BY is qualified: bare `updated_at` names the to_char() output column,
+# which sorts text and cannot walk the (updated_at, id) index.
+_CHANGES_SQL = """
+SELECT
+    id,
+    amount,
+    category,
+    status,
+    ("date"::date - DATE '1970-01-01') AS day,
+    to_char(updated_at, 'YYYY-MM-DD"T"HH24:MI:SS.US') AS updated_at
+FROM expenses
+WHERE (updated_at, id) > ($1::timestamp, $2)
+ORDER BY expenses.updated_at, expenses.id
+LIMIT $3
+"""
+
+_MIN_WATERMARK = "1970-01-01T00:00:00.000000"
+
+_MONTH_COUNTS_SQL = """
+SELECT to_char(month, 'YYYY-MM') AS month, SUM(count)::int AS count
+FROM expense_monthly_rollups
+GROUP BY 1
+"""
+
+_MONTH_ROWS_SQL = """
+SELECT
+    id,
+    amount,
+    category,
+    status,
+    ("date"::date - DATE '1970-01-01') AS day
+FROM expenses
+WHERE "date" >= $1::timestamp AND "date" < $2::timestamp
+"""
+
+
+def _to_day(value: datetime | date) -> int:
+    return value.toordinal() - _EPOCH_ORDINAL
+
+
+def _month_index(day: int) -> int:
+    d = date.fromordinal(day + _EPOCH_ORDINAL)
+    return d.year * 12 + d.month - 1
+
+
+def _next_month(dt: datetime) -> datetime:
+    return datetime(dt.year + (dt.month == 12), dt.month % 12 + 1, 1)
+
+
+def _month_day(month_index: int) -> int:
+    year, month0 = divmod(month_index, 12)
+    return _to_day(date(year, month0 + 1, 1))
+
+
+class _Columns:
+    """Growable column store; rows are appended and overwritten in place."""
+
+    def __init__(self, capacity: int = 1024) -> None:
+        self.size = 0
+        self.amount = np.zeros(capacity, dtype=np.float64)
+        self.day = np.zeros(capacity, dtype=np.int32)
+        self.category = np.zeros(capacity, dtype=np.uint16)
+        self.status = np.zeros(capacity, dtype=np.uint8)
+        self.live = np.zeros(capacity, dtype=np.bool_)
+        self.rows: dict[str, int] = {}
+        self.ids: list[str] = []
+        self.categories: list[str] = []
+        self.statuses: list[str] = []
+        self._category_codes: dict[str, int] = {}
+        self._status_codes: dict[str, int] = {}
+
+    def _grow(self, needed: int) -> None:
+        capacity = len(self.amount)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        for name in ("amount", "day", "category", "status", "live"):
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[: self.size] = old[: self.size]
+            setattr(self, name, new)
+
+    def _code(self, value: str, codes: dict[str, int], names: list[str], limit: int) -> int:
+        code = codes.get(value)
+        if code is None:
+            if len(names) >= limit:
+                raise OverflowError(f"Too many distinct values for snapshot column: {value!r}")
+            code = codes[value] = len(names)
+            names.append(value)
+        return code
+
+    def upsert(self, rows: list[dict]) -> None:
+        self._grow(self.size + len(rows))
+        for row in rows:
+            i = self.rows.get(row["id"])
+            if i is None:
+                i = self.rows[row["id"]] = self.size
+                self.ids.append(row["id"])
+                self.size += 1
+            self.amount[i] = row["amount"]
+            self.day[i] = row["day"]
+            self.category[i] = self._code(
+                row["category"], self._category_codes, self.categories, 1 << 16
+            )
+            self.status[i] = self._code(
+                row["status"], self._status_codes, self.statuses, 1 << 8
+            )
+            self.live[i] = True
+
+    def forget(self, id: str) -> None:
+        i = self.rows.pop(id, None)
+        if i is not None:
+            self.live[i] = False
+
+    def month_counts(self) -> dict[str, int]:
+        """Live rows per "YYYY-MM" month."""
+        n = self.size
+        days = self.day[:n][self.live[:n]]
+        if days.size == 0:
+            return {}
+        first_day = int(days.min())
+        per_day = np.bincount(days - first_day)
+        first_month = _month_index(first_day)
+        last_month = _month_index(first_day + len(per_day) - 1)
+        starts = [max(_month_day(m) - first_day, 0) for m in range(first_month, last_month + 1)]
+        out = {}
+        for offset, count in enumerate(np.add.reduceat(per_day, starts).tolist()):
+            if count:
+                year, month0 = divmod(first_month + offset, 12)
+                out[f"{year:04d}-{month0 + 1:02d}"] = count
+        return out
+
+    def replace_range(self, first_day: int, end_day: int, rows: list[dict]) -> int:
+        """Make ``rows`` the full contents of days [first_day, end_day); returns rows dropped."""
+        n = self.size
+        in_range = self.live[:n] & (self.day[:n] >= first_day) & (self.day[:n] < end_day)
+        keep = np.fromiter(
+            (self.rows[r["id"]] for r in rows if r["id"] in self.rows), dtype=np.int64
+        )
+        candidates = np.flatnonzero(in_range)
+        dropped = candidates[~np.isin(candidates, keep)].tolist()
+        for i in dropped:
+            del self.rows[self.ids[i]]
+            self.live[i] = False
+        self.upsert(rows)
+        return len(dropped)
+
+    def nbytes(self) -> dict:
+        arrays = sum(
+            getattr(self, name).nbytes
+            for name in ("amount", "day", "category", "status", "live")
+        )
+        index = (
+            sys.getsizeof(self.rows)
+            + sys.getsizeof(self.ids)
+            + sum(sys.getsizeof(k) for k in self.rows)
+        )
+        dictionaries = sum(sys.getsizeof(v) for v in self.categories + self.statuses)
+        return {
+            "rows": len(self.rows),
+            "capacity": len(self.amount),
+            "arrayBytes": arrays,
+            "idIndexBytes": index,
+            "dictionaryBytes": dictionaries,
+            "totalBytes": arrays + index + dictionaries,
+        }
+
+
+class ExpenseSnapshot:
+    def __init__(self, batch_size: int = 10_000) -> None:
+        self._columns: _Columns | None = None
+        self._watermark: tuple[str, str] = (_MIN_WATERMARK, "")
+        self._batch_size = batch_size
+        self._loaded_at = 0.0
+
+    @property
+    def is_ready(self) -> bool:
+        return self._columns is not None
+
+    async def _pull(self, columns: _Columns, watermark: tuple[str, str]) -> tuple[str, str]:
+        prisma = PrismaClient.get_client()
+        while True:
+            rows = await prisma.query_raw(_CHANGES_SQL, *watermark, self._batch_size)
+            if not rows:
+                return watermark
+            columns.upsert(rows)
+            watermark = (rows[-1]["updated_at"], rows[-1]["id"])
+            if len(rows) < self._batch_size:
+                return watermark
+
+    async def reload(self) -> None:
+        """Build a fresh snapshot from the whole table and swap it in."""
+        started = time.perf_counter()
+        columns = _Columns()
+        watermark = await self._pull(columns, (_MIN_WATERMARK, ""))
+        self._columns, self._watermark = columns, watermark
+        self._loaded_at = time.monotonic()
+        usage = columns.nbytes()
+        logger.info(
+            "Expense snapshot loaded: %d rows, %.1f MiB in %.2fs",
+            usage["rows"],
+            usage["totalBytes"] / (1 << 20),
+            time.perf_counter() - started,
+        )
+
+    async def refresh(self) -> None:
+        """Apply rows changed since the high-water mark."""
+        if self._columns is None:
+            await self.reload()
+            return
+        since_dt = datetime.fromisoformat(self._watermark[0]) - _OVERLAP
+        since = (since_dt.isoformat(timespec="microseconds"), "")
+        watermark = await self._pull(self._columns, since)
+        self._watermark = max(self._watermark, watermark)
+        await self._reconcile()
+
+    async def _reconcile(self) -> None:
+        """Re-read months whose row count disagrees with the rollup table."""
+        prisma = PrismaClient.get_client()
+        expected = {
+            row["month"]: row["count"] for row in await prisma.query_raw(_MONTH_COUNTS_SQL)
+        }
+        actual = self._columns.month_counts()
+        for month in sorted(expected.keys() | actual.keys()):
+            if expected.get(month, 0) == actual.get(month, 0):
+                continue
+            start = datetime.strptime(month, "%Y-%m")
+            end = _next_month(start)
+            rows = await prisma.query_raw(_MONTH_ROWS_SQL, start, end)
+            dropped = self._columns.replace_range(_to_day(start), _to_day(end), rows)
+            logger.debug("Expense snapshot resynced %s (%d rows dropped)", month, dropped)
+
+    async def run(self) -> None:
+        """Background loop: incremental refreshes plus a periodic full reload."""
+        settings = get_settings()
+        while True:
+            try:
+                due = time.monotonic() - self._loaded_at
+                if due >= settings.dashboard_snapshot_reload_seconds:
+                    await self.reload()
+                else:
+                    await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Expense snapshot refresh failed")
+            await asyncio.sleep(settings.dashboard_snapshot_refresh_seconds)
+
+    def upsert(self, expense) -> None:
+        """Apply a write from this process without waiting for the next poll."""
+        self.upsert_rows([expense.model_dump()])
+
+    def upsert_rows(self, rows: list[dict]) -> None:
+        """Like `upsert`, for rows with Expense field names (id, amount,
+        category, status, date)."""
+        if self._columns is None:
+            return
+        self._columns.upsert(
+            [
+                {
+                    "id": row["id"],
+                    "amount": row["amount"],
+                    "category": row["category"],
+                    "status": row["status"],
+                    "day": _to_day(row["date"]),
+                }
+                for row in rows
+            ]
+        )
+
+    def forget(self, id: str) -> None:
+        if self._columns is not None:
+            self._columns.forget(id)
+
+    def memory_usage(self) -> dict:
+        return self._columns.nbytes() if self._columns is not None else {}
+
+    def cells(
+        self,
+        start: datetime | None = None,
+        end: datetime | None = None,
+    ) -> list[dict]:
+        """Return (month, category, status) cells for dates in [start, end).
+
+        Same shape as `RollupService.fetch_cells`, so the dashboard can fold
+        either source into its response.
+        """
+        c = self._columns
+        if c is None or c.size == 0:
+            return []
+        n = c.size
+        mask = c.live[:n].copy()
+        if start is not None:
+            mask &= c.day[:n] >= _to_day(start)
+        if end is not None:
+            mask &= c.day[:n] < _to_day(end)
+        days = c.day[:n][mask]
+        if days.size == 0:
+            return []
+
+        first_month = _month_index(int(days.min()))
+        last_month = _month_index(int(days.max()))
+        boundaries = np.array(
+            [_month_day(m) for m in range(first_month, last_month + 2)],
+            dtype=np.int32,
+        )
+        month_bins = np.searchsorted(boundaries, days, side="right") - 1
+
+        n_cat, n_status = len(c.categories), len(c.statuses)
+        keys = (
+            month_bins.astype(np.int64) * (n_cat * n_status)
+            + c.category[:n][mask].astype(np.int64) * n_status
+            + c.status[:n][mask]
+        )
+        length = (last_month - first_month + 1) * n_cat * n_status
+        counts = np.bincount(keys, minlength=length)
+        amounts = np.bincount(keys, weights=c.amount[:n][mask], minlength=length)
+        first_days = np.full(length, np.iinfo(np.int32).max, dtype=np.int32)
+        np.minimum.at(first_days, keys, days)
+
+        out = []
+        for key in np.flatnonzero(counts).tolist():
+            month_bin, rest = divmod(key, n_cat * n_status)
+            cat, status = divmod(rest, n_status)
+            year, month0 = divmod(first_month + month_bin, 12)
+            out.append(
+                {
+                    "month": f"{year:04d}-{month0 + 1:02d}",
+                    "category": c.categories[cat],
+                    "status": c.statuses[status],
+                    "count": int(counts[key]),
+                    "amount": float(amounts[key]),
+                    # Day resolution: the snapshot keeps dates, not times.
+                    "first": f"{date.fromordinal(int(first_days[key]) + _EPOCH_ORDINAL)}T00:00:00.000000",
+                }
+            )
+        out.sort(key=lambda cell: (cell["month"], cell["category"], cell["status"]))
+        return out
+
+
+@lru_cache(maxsize=1)
+def get_expense_snapshot() -> ExpenseSnapshot:
+    return ExpenseSnapshot()
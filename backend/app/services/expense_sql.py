@@ -0,0 +1,60 @@
+"""Raw-SQL building blocks for expense list queries.
+
+Shared by the search (expense_search) and projected list
+(expense_projection) queries, so both filter, page and order alike and the
+same indexes serve them.
+"""
+
+from datetime import datetime
+
+ALL_COLUMNS = (
+    'id, title, amount, category, status, description, "date", created_at, updated_at'
+)
+
+# SQL casts for keyset parameters, which Prisma binds as text/number.
+_CASTS = {"date": "::timestamp", "created_at": "::timestamp", "updated_at": "::timestamp"}
+
+
+def select_list(columns: tuple[str, ...] | None) -> str:
+    """``columns`` quoted for SELECT, or every column when None."""
+    return ", ".join(f'"{c}"' for c in columns) if columns else ALL_COLUMNS
+
+
+def keyset_order(field: str, order: str) -> str:
+    """ORDER BY terms for (field, id) in ``order``."""
+    direction = "ASC" if order == "asc" else "DESC"
+    return f'"{field}" {direction}, id {direction}'
+
+
+class SqlQuery:
+    """Accumulates WHERE clauses with positional ($n) parameters."""
+
+    def __init__(self) -> None:
+        self.clauses: list[str] = []
+        self.args: list = []
+
+    def param(self, value, cast: str = "") -> str:
+        self.args.append(value)
+        return f"${len(self.args)}{cast}"
+
+    def filter(self, category: str | None, status: str | None) -> None:
+        if category:
+            self.clauses.append(f"category = {self.param(category)}")
+        if status:
+            self.clauses.append(f"status = {self.param(status)}")
+
+    def after(self, field: str, order: str, after: tuple | None) -> None:
+        """Keep rows past the ``after`` = (value, id) boundary in (field, id) ``order``."""
+        if after is None:
+            return
+        value, id = after
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        op = "<" if order == "desc" else ">"
+        self.clauses.append(
+            f'("{field}", id) {op} ({self.param(value, _CASTS.get(field, ""))}, {self.param(id)})'
+        )
+
+    @property
+    def where(self) -> str:
+        return "WHERE " + " AND ".join(self.clauses) if self.clauses else ""
@@ -0,0 +1,91 @@
+"""Seeded market simulator: sector-correlated geometric Brownian motion.
+
+Every symbol advances in one vectorized step per tick, and ticks follow wall
+time (one per ``tick_seconds``), not how often the board is read. Each shock
+mixes a per-sector factor with an idiosyncratic term, so stocks in a sector
+move together. The same seed and tick sequence always reproduce the same prices.
+It backs the quote board when Yahoo is unavailable and, with
+``stock_feed=synthetic``, replaces the upstream entirely.
+"""
+
+import time
+from functools import lru_cache
+
+import numpy as np
+
+from app.config import get_settings
+from app.utils.stocks import get_symbol_registry
+
+# NSE: ~252 sessions of 6h15m.
+_TRADING_SECONDS_PER_YEAR = 252 * 6.25 * 3600
+
+# After a long idle spell, catch up at most one session's worth of ticks.
+_MAX_CATCH_UP_SECONDS = 6.25 * 3600
+
+
+class MarketSimulator:
+    def __init__(
+        self,
+        stocks: list[dict],
+        *,
+        seed: int,
+        drift: float,
+        volatility: float,
+        sector_correlation: float,
+        tick_seconds: float,
+    ) -> None:
+        self.stocks = stocks
+        self.ticks = 0
+        self.tick_seconds = tick_seconds
+        self._clock = time.monotonic()
+        self._rng = np.random.default_rng(seed)
+        self._prices = np.array([s["ref_price"] for s in stocks], dtype=np.float64)
+        # Session open implied by the reference change %, so change starts there.
+        self._open = self._prices / (1 + np.array([s["ref_change"] for s in stocks]) / 100)
+        sectors, self._sector_of = np.unique(
+            [s["sector"] for s in stocks], return_inverse=True
+        )
+        self._n_sectors = len(sectors)
+        dt = tick_seconds / _TRADING_SECONDS_PER_YEAR
+        self._drift = (drift - 0.5 * volatility**2) * dt
+        self._scale = volatility * np.sqrt(dt)
+        self._rho = sector_correlation
+        self._idio = np.sqrt(1 - sector_correlation**2)
+
+    def step(self, ticks: int = 1) -> None:
+        for _ in range(ticks):
+            common = self._rng.standard_normal(self._n_sectors)[self._sector_of]
+            own = self._rng.standard_normal(len(self._prices))
+            shock = self._rho * common + self._idio * own
+            self._prices *= np.exp(self._drift + self._scale * shock)
+        self.ticks += ticks
+
+    def advance(self, now: float | None = None) -> int:
+        """Step once per ``tick_seconds`` elapsed since the last tick; returns
+        the ticks taken (0 if a tick has not elapsed yet)."""
+        now = time.monotonic() if now is None else now
+        ticks = int((now - self._clock) // self.tick_seconds)
+        if ticks <= 0:
+            return 0
+        self._clock += ticks * self.tick_seconds
+        ticks = min(ticks, int(_MAX_CATCH_UP_SECONDS // self.tick_seconds) or 1)
+        self.step(ticks)
+        return ticks
+
+    def quotes(self) -> tuple[list[float], list[float]]:
+        """Current (price, change %) per stock, in registry order."""
+        change = (self._prices / self._open - 1) * 100
+        return self._prices.round(2).tolist(), change.round(2).tolist()
+
+
+@lru_cache(maxsize=1)
+def get_market_simulator() -> MarketSimulator:
+    settings = get_settings()
+    return MarketSimulator(
+        get_symbol_registry().stocks,
+        seed=settings.stock_sim_seed,
+        drift=settings.stock_sim_drift,
+        volatility=settings.stock_sim_volatility,
+        sector_correlation=settings.stock_sim_sector_correlation,
+        tick_seconds=settings.stock_sim_tick_seconds,
+    )
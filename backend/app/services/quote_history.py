@@ -0,0 +1,141 @@
+"""Fixed-memory per-symbol quote history with batch technical indicators.
+
+Prices and timestamps live in (symbols x capacity) NumPy ring buffers, so
+memory is fixed up front. Indicators are computed for every symbol at once
+on the time-ordered matrix and cached until the next quote is recorded.
+"""
+
+import time
+import warnings
+from functools import lru_cache
+
+import numpy as np
+
+from app.config import get_settings
+from app.utils.stocks import get_symbol_registry
+
+SMA_WINDOW = 20
+EMA_SPAN = 20
+RSI_WINDOW = 14
+VOLATILITY_WINDOW = 20
+
+
+def _indicators(prices: np.ndarray) -> dict[str, np.ndarray]:
+    """Latest SMA/EMA/RSI/volatility per row of a right-aligned price matrix.
+
+    ``prices`` has one row per symbol, oldest to newest, with NaN padding on
+    the left for symbols that have not filled their buffer yet. Each result
+    has one value per symbol; NaN where there is not enough history.
+    """
+    n_symbols, width = prices.shape
+    valid = np.sum(~np.isnan(prices), axis=1)
+
+    def tail(window: int) -> np.ndarray:
+        return prices[:, max(width - window, 0):]
+
+    # All-NaN rows (too little history) are expected; they resolve to NaN.
+    with np.errstate(invalid="ignore", divide="ignore"), warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        sma = np.where(valid >= SMA_WINDOW, np.nanmean(tail(SMA_WINDOW), axis=1), np.nan)
+
+        # EMA: recursive in time, vectorized across symbols. Seeding it a few
+        # spans back is enough for the weights of older prices to vanish.
+        alpha = 2.0 / (EMA_SPAN + 1)
+        ema = np.full(n_symbols, np.nan)
+        for column in tail(EMA_SPAN * 5).T:
+            present = ~np.isnan(column)
+            start = present & np.isnan(ema)
+            ema[start] = column[start]
+            step = present & ~start
+            ema[step] = alpha * column[step] + (1 - alpha) * ema[step]
+        ema = np.where(valid >= EMA_SPAN, ema, np.nan)
+
+        deltas = np.diff(tail(RSI_WINDOW + 1), axis=1)
+        gains = np.nanmean(np.clip(deltas, 0, None), axis=1)
+        losses = np.nanmean(np.clip(-deltas, 0, None), axis=1)
+        rsi = np.where(losses == 0, 100.0, 100.0 - 100.0 / (1.0 + gains / losses))
+        rsi = np.where(valid > RSI_WINDOW, rsi, np.nan)
+
+        returns = np.diff(np.log(tail(VOLATILITY_WINDOW + 1)), axis=1)
+        volatility = np.where(
+            valid > VOLATILITY_WINDOW, np.nanstd(returns, axis=1, ddof=1), np.nan
+        )
+    return {"sma": sma, "ema": ema, "rsi": rsi, "volatility": volatility}
+
+
+class QuoteHistory:
+    def __init__(self, symbols: list[str], capacity: int) -> None:
+        self.symbols = list(symbols)
+        self.capacity = capacity
+        self._index = {s: i for i, s in enumerate(self.symbols)}
+        self._prices = np.full((len(symbols), capacity), np.nan)
+        self._times = np.zeros((len(symbols), capacity))
+        self._head = np.zeros(len(symbols), dtype=np.int64)
+        self._count = np.zeros(len(symbols), dtype=np.int64)
+        self._indicators: dict[str, np.ndarray] | None = None
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self._index
+
+    @property
+    def nbytes(self) -> int:
+        return self._prices.nbytes + self._times.nbytes
+
+    def record(self, rows: list[dict], at: float | None = None) -> None:
+        """Append one quote per row (``symbol``/``price``); unknown symbols are ignored."""
+        pairs = [
+            (self._index[r["symbol"]], r["price"]) for r in rows if r.get("symbol") in self._index
+        ]
+        if not pairs:
+            return
+        idx = np.fromiter((i for i, _ in pairs), dtype=np.int64, count=len(pairs))
+        prices = np.fromiter((p for _, p in pairs), dtype=np.float64, count=len(pairs))
+        pos = self._head[idx]
+        self._prices[idx, pos] = prices
+        self._times[idx, pos] = time.time() if at is None else at
+        self._head[idx] = (pos + 1) % self.capacity
+        self._count[idx] = np.minimum(self._count[idx] + 1, self.capacity)
+        self._indicators = None
+
+    def _ordered(self) -> tuple[np.ndarray, np.ndarray]:
+        """Time-ordered (oldest -> newest) prices/times, NaN/0 padded on the left."""
+        offsets = np.arange(self.capacity)
+        cols = (self._head[:, None] + offsets[None, :]) % self.capacity
+        prices = np.take_along_axis(self._prices, cols, axis=1)
+        times = np.take_along_axis(self._times, cols, axis=1)
+        return prices, times
+
+    def indicators(self) -> dict[str, np.ndarray]:
+        if self._indicators is None:
+            self._indicators = _indicators(self._ordered()[0])
+        return self._indicators
+
+    def series(self, symbol: str, limit: int | None = None) -> dict:
+        i = self._index[symbol]
+        count = int(self._count[i])
+        if limit is not None:
+            count = min(count, limit)
+        slots = (self._head[i] - count + np.arange(count)) % self.capacity
+        points = [
+            {"t": round(float(t), 3), "price": float(p)}
+            for t, p in zip(self._times[i, slots], self._prices[i, slots])
+        ]
+
+        def value(x: float) -> float | None:
+            return None if np.isnan(x) else round(float(x), 6)
+
+        return {
+            "symbol": symbol,
+            "points": points,
+            "indicators": {
+                name: value(values[i]) for name, values in self.indicators().items()
+            },
+        }
+
+
+@lru_cache(maxsize=1)
+def get_quote_history() -> QuoteHistory:
+    return QuoteHistory(
+        get_symbol_registry().symbols,
+        capacity=get_settings().stock_history_capacity,
+    )
@@ -0,0 +1,101 @@
+"""Shared live quote snapshot fanned out to SSE subscribers.
+
+One background task refreshes the snapshot through `StockService.get_stocks`
+and pushes only the symbols whose row changed. Each subscriber holds a
+per-symbol "latest" map rather than a queue: a slow client never blocks the
+publisher, and anything it has not sent yet is simply overwritten by the
+newer quote (drop-to-latest). An idle subscriber costs a dict and an Event.
+With no subscribers the task waits instead of polling quotes nobody reads.
+"""
+
+import asyncio
+from functools import lru_cache
+
+from app.config import get_settings
+from app.core.logging import get_logger
+from app.services.stock_service import StockService
+
+logger = get_logger(__name__)
+
+
+class QuoteSubscriber:
+    __slots__ = ("pending", "dropped", "_event")
+
+    def __init__(self, initial: dict[str, dict]) -> None:
+        self.pending: dict[str, dict] = dict(initial)
+        self.dropped = 0
+        self._event = asyncio.Event()
+        if self.pending:
+            self._event.set()
+
+    def offer(self, changes: dict[str, dict]) -> None:
+        for symbol, row in changes.items():
+            if symbol in self.pending:
+                self.dropped += 1
+            self.pending[symbol] = row
+        self._event.set()
+
+    async def next(self, timeout: float) -> list[dict]:
+        """Wait for changes and take them; [] if ``timeout`` passes first."""
+        try:
+            await asyncio.wait_for(self._event.wait(), timeout)
+        except TimeoutError:
+            return []
+        self._event.clear()
+        changes, self.pending = list(self.pending.values()), {}
+        return changes
+
+
+class QuoteBroadcaster:
+    def __init__(self) -> None:
+        self.snapshot: dict[str, dict] = {}
+        self.source: str | None = None
+        self._subscribers: set[QuoteSubscriber] = set()
+        # Set while anyone is subscribed; run() waits on it.
+        self._active = asyncio.Event()
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self) -> QuoteSubscriber:
+        subscriber = QuoteSubscriber(self.snapshot)
+        self._subscribers.add(subscriber)
+        self._active.set()
+        return subscriber
+
+    def unsubscribe(self, subscriber: QuoteSubscriber) -> None:
+        self._subscribers.discard(subscriber)
+        if not self._subscribers:
+            self._active.clear()
+
+    def publish(self, result: dict) -> int:
+        """Merge a `get_stocks` result and fan out the changed rows."""
+        self.source = result.get("source")
+        changes = {
+            row["symbol"]: row
+            for row in result.get("data", [])
+            if self.snapshot.get(row["symbol"]) != row
+        }
+        if changes:
+            self.snapshot.update(changes)
+            for subscriber in self._subscribers:
+                subscriber.offer(changes)
+        return len(changes)
+
+    async def run(self) -> None:
+        settings = get_settings()
+        while True:
+            await self._active.wait()
+            try:
+                self.publish(await StockService.get_stocks())
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Quote refresh failed")
+            await asyncio.sleep(settings.stock_stream_refresh_seconds)
+
+
+@lru_cache(maxsize=1)
+def get_quote_broadcaster() -> QuoteBroadcaster:
+    return QuoteBroadcaster()
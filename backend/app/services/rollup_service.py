@@ -0,0 +1,213 @@
+from datetime import datetime, timedelta
+
+from prisma import Prisma
+
+from app.core.logging import get_logger
+from app.database.prisma_client import PrismaClient
+
+logger = get_logger(__name__)
+
+# `expense_monthly_rollups` is maintained by statement-level triggers on
+# `expenses`, so every writer (the API, bulk import, Prisma Studio, psql)
+# keeps it in step within its own transaction. Each statement folds its
+# transition rows into one delta per bucket and applies them in bucket order,
+# so concurrent writers lock rollup rows in the same order and cannot deadlock.
+# `first_date` (earliest expense in the bucket) orders the dashboard's status
+# and category lists; it is recomputed from the (category, date) index only
+# when a statement removes a bucket's earliest row.
+_UPSERT = """
+        INSERT INTO expense_monthly_rollups AS r (month, category, status, count, amount, first_date)
+        SELECT date_trunc('month', "date"), category, status, SUM(n), SUM(amount),
+               MIN("date") FILTER (WHERE n > 0)
+        FROM ({deltas}) AS d
+        GROUP BY 1, 2, 3
+        ORDER BY 1, 2, 3
+        ON CONFLICT (month, category, status) DO UPDATE SET
+            count = r.count + EXCLUDED.count,
+            amount = r.amount + EXCLUDED.amount,
+            first_date = LEAST(r.first_date, EXCLUDED.first_date);"""
+
+_ADDED = 'SELECT "date", category, status, 1 AS n, amount FROM {rows} AS t'
+_REMOVED = 'SELECT "date", category, status, -1 AS n, -amount AS amount FROM {rows} AS t'
+
+# Rows of one transition table without an identical counterpart in the other:
+# an UPDATE only moves the rows whose bucket or amount actually changed.
+_CHANGED = """(
+            SELECT * FROM {rows} AS x WHERE NOT EXISTS (
+                SELECT 1 FROM {other} AS y
+                WHERE y.id = x.id
+                  AND (y."date", y.category, y.status, y.amount)
+                    = (x."date", x.category, x.status, x.amount)
+            )
+        )"""
+
+_PRUNE = """
+        DELETE FROM expense_monthly_rollups AS r
+        USING (
+            SELECT DISTINCT date_trunc('month', "date") AS month, category, status
+            FROM {removed} AS x
+        ) AS o
+        WHERE r.month = o.month AND r.category = o.category AND r.status = o.status
+          AND r.count <= 0;
+        UPDATE expense_monthly_rollups AS r
+        SET first_date = (
+            SELECT MIN(e."date") FROM expenses AS e
+            WHERE e.category = r.category AND e.status = r.status
+              AND e."date" >= r.month AND e."date" < r.month + interval '1 month'
+        )
+        FROM (
+            SELECT date_trunc('month', "date") AS month, category, status, MIN("date") AS first_date
+            FROM {removed} AS x
+            GROUP BY 1, 2, 3
+        ) AS o
+        WHERE r.month = o.month AND r.category = o.category AND r.status = o.status
+          AND r.first_date >= o.first_date;"""
+
+_CHANGED_OLD = _CHANGED.format(rows="old_rows", other="new_rows")
+_CHANGED_NEW = _CHANGED.format(rows="new_rows", other="old_rows")
+
+_SYNC_FUNCTION_SQL = f"""
+CREATE OR REPLACE FUNCTION expense_rollups_sync() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+{_UPSERT.format(deltas=_ADDED.format(rows="new_rows"))}
+    ELSIF TG_OP = 'DELETE' THEN
+{_UPSERT.format(deltas=_REMOVED.format(rows="old_rows"))}
+{_PRUNE.format(removed="old_rows")}
+    ELSE
+{_UPSERT.format(
+    deltas=_ADDED.format(rows=_CHANGED_NEW) + " UNION ALL " + _REMOVED.format(rows=_CHANGED_OLD)
+)}
+{_PRUNE.format(removed=_CHANGED_OLD)}
+    END IF;
+    RETURN NULL;
+END
+$$
+"""
+
+_TRUNCATE_FUNCTION_SQL = """
+CREATE OR REPLACE FUNCTION expense_rollups_truncate() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    DELETE FROM expense_monthly_rollups;
+    RETURN NULL;
+END
+$$
+"""
+
+_TRIGGERS_SQL = (
+    """
+    CREATE OR REPLACE TRIGGER expenses_rollup_insert AFTER INSERT ON expenses
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION expense_rollups_sync()
+    """,
+    """
+    CREATE OR REPLACE TRIGGER expenses_rollup_update AFTER UPDATE ON expenses
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION expense_rollups_sync()
+    """,
+    """
+    CREATE OR REPLACE TRIGGER expenses_rollup_delete AFTER DELETE ON expenses
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION expense_rollups_sync()
+    """,
+    """
+    CREATE OR REPLACE TRIGGER expenses_rollup_truncate AFTER TRUNCATE ON expenses
+    FOR EACH STATEMENT EXECUTE FUNCTION expense_rollups_truncate()
+    """,
+)
+
+# Serializes install() across workers starting at the same time.
+_INSTALL_LOCK_SQL = "SELECT pg_advisory_xact_lock(hashtext('expense_monthly_rollups'))"
+
+_INSTALLED_SQL = """
+SELECT
+    EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = 'expenses_rollup_insert') AS installed,
+    NOT EXISTS (SELECT 1 FROM expense_monthly_rollups) AS empty,
+    EXISTS (SELECT 1 FROM expense_monthly_rollups WHERE first_date IS NULL) AS stale
+"""
+
+_CELLS_SQL = """
+SELECT
+    to_char(month, 'YYYY-MM') AS month,
+    category,
+    status,
+    count,
+    amount,
+    to_char(first_date, 'YYYY-MM-DD"T"HH24:MI:SS.US') AS first
+FROM expense_monthly_rollups
+WHERE count > 0 {where}
+ORDER BY month, category, status
+"""
+
+_REBUILD_SQL = """
+INSERT INTO expense_monthly_rollups (month, category, status, count, amount, first_date)
+SELECT
+    date_trunc('month', "date"),
+    category,
+    status,
+    COUNT(*)::int,
+    SUM(amount)::float8,
+    MIN("date")
+FROM expenses
+GROUP BY 1, 2, 3
+"""
+
+_REBUILD_TIMEOUT = timedelta(minutes=5)
+
+
+class RollupService:
+    """Reads `expense_monthly_rollups` and installs the triggers that maintain it."""
+
+    @classmethod
+    async def install(cls) -> None:
+        """Create or update the rollup triggers; backfill when they are new or the table is
+        empty or predates `first_date`.
+
+        Called at startup, so existing deployments get correct dashboards
+        without a manual `make db-rebuild-rollups`.
+        """
+        prisma = PrismaClient.get_client()
+        async with prisma.tx(timeout=_REBUILD_TIMEOUT) as tx:
+            await tx.query_raw(_INSTALL_LOCK_SQL)
+            state = await tx.query_first(_INSTALLED_SQL)
+            await tx.execute_raw(_SYNC_FUNCTION_SQL)
+            await tx.execute_raw(_TRUNCATE_FUNCTION_SQL)
+            for sql in _TRIGGERS_SQL:
+                await tx.execute_raw(sql)
+            if not state["installed"] or state["empty"] or state["stale"]:
+                rows = await cls._rebuild(tx)
+                logger.info("Backfilled %d expense rollup rows", rows)
+
+    @classmethod
+    async def fetch_cells(
+        cls,
+        month_from: datetime | None = None,
+        month_to: datetime | None = None,
+    ) -> list[dict]:
+        """Return (month, category, status) cells for months in [month_from, month_to)."""
+        prisma = PrismaClient.get_read_client(shared=True)
+        if month_from is not None and month_to is not None:
+            return await prisma.query_raw(
+                _CELLS_SQL.format(
+                    where="AND month >= $1::timestamp AND month < $2::timestamp"
+                ),
+                month_from,
+                month_to,
+            )
+        return await prisma.query_raw(_CELLS_SQL.format(where=""))
+
+    @classmethod
+    async def rebuild(cls) -> int:
+        """Regenerate every rollup row from `expenses`; returns the row count."""
+        prisma = PrismaClient.get_client()
+        async with prisma.tx(timeout=_REBUILD_TIMEOUT) as tx:
+            return await cls._rebuild(tx)
+
+    @classmethod
+    async def _rebuild(cls, tx: Prisma) -> int:
+        # Block expense writes so none slip between the wipe and the reinsert.
+        await tx.execute_raw("LOCK TABLE expenses IN SHARE MODE")
+        await tx.execute_raw("DELETE FROM expense_monthly_rollups")
+        return await tx.execute_raw(_REBUILD_SQL)
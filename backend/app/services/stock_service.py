@@ -1,42 +1,185 @@
-import random
+import hashlib
+import json
 
-from app.utils.stocks import (
-    FALLBACK_STOCKS,
-    NSE_STOCK_META,
-    fetch_nse_quotes,
+from app.config import get_settings
+from app.services.market_simulator import get_market_simulator
+from app.services.quote_history import get_quote_history
+from app.utils.cache import AsyncTTLCache
+from app.utils.circuit_breaker import CircuitBreaker
+from app.utils.stocks import fetch_nse_quotes, get_symbol_registry
+
+
+_settings = get_settings()
+
+# Single entry: the whole quote board. Stale-while-revalidate keeps requests
+# off the upstream path; concurrent misses share one fetch.
+_quotes_cache: AsyncTTLCache[str, dict] = AsyncTTLCache(
+    maxsize=1,
+    ttl=_settings.stock_quote_ttl_seconds,
+    stale_ttl=_settings.stock_quote_stale_seconds,
 )
 
+# Guards the Yahoo upstream: while open, boards are built without waiting on it.
+_breaker = CircuitBreaker(
+    failure_threshold=_settings.stock_breaker_failure_threshold,
+    reset_timeout=_settings.stock_breaker_reset_seconds,
+)
+
+
+def _row(meta: dict, price: float, change: float) -> dict:
+    return {
+        "symbol": meta["symbol"],
+        "name": meta["name"],
+        "sector": meta["sector"],
+        "price": round(float(price), 2),
+        "change": round(float(change), 2),
+        "pe": meta["pe"],
+        "marketCap": meta["market_cap"],
+    }
+
 
 class StockService:
+    # Latest upstream row per symbol: served while Yahoo is failing and used to
+    # fill the symbols a partial board is missing.
+    _last_live: dict[str, dict] = {}
+
+    @classmethod
+    async def get_stocks(
+        cls,
+        symbols: list[str] | None = None,
+        sector: str | None = None,
+        page: int = 1,
+        limit: int | None = None,
+    ) -> dict:
+        """Quote board, optionally narrowed to ``symbols``/``sector`` and paginated.
+
+        Filtering goes through the registry indexes and the board's by-symbol
+        map, so the work follows the size of the answer, not the universe.
+        """
+        board = await cls.get_board()
+        if symbols is None and sector is None:
+            rows = board["data"]
+        else:
+            by_symbol = board["bySymbol"]
+            rows = [
+                by_symbol[m["symbol"]]
+                for m in get_symbol_registry().select(symbols, sector)
+                if m["symbol"] in by_symbol
+            ]
+        if limit is None:
+            return {"data": rows, "source": board["source"], "snapshotId": board["snapshotId"]}
+        total = len(rows)
+        start = (page - 1) * limit
+        return {
+            "data": rows[start:start + limit],
+            "source": board["source"],
+            "snapshotId": board["snapshotId"],
+            "pagination": {
+                "page": page,
+                "limit": limit,
+                "total": total,
+                "totalPages": (total + limit - 1) // limit,
+            },
+        }
+
+    @classmethod
+    async def get_board(cls) -> dict:
+        """The cached board: ``data``, ``source``, ``snapshotId`` and ``bySymbol``."""
+        return await _quotes_cache.get_or_load("quotes", cls._load_stocks)
+
+    @classmethod
+    def cache_stats(cls) -> dict:
+        return _quotes_cache.stats()
+
+    @classmethod
+    def breaker_stats(cls) -> dict:
+        return _breaker.stats()
+
+    @classmethod
+    async def _load_stocks(cls) -> dict:
+        """Build the board; ``source`` is yahoo, partial, cached or fallback,
+        suffixed with the breaker state (e.g. ``cached:open``) unless it is closed."""
+        data, source = await cls._fetch_stocks()
+        if source != "cached":
+            get_quote_history().record(data)
+        if _breaker.state != CircuitBreaker.CLOSED:
+            source = f"{source}:{_breaker.state}"
+        # Content hash: an unchanged board keeps its id (and derived caches).
+        snapshot_id = hashlib.blake2b(
+            json.dumps(data, separators=(",", ":")).encode("utf-8"), digest_size=8
+        ).hexdigest()
+        return {
+            "data": data,
+            "source": source,
+            "snapshotId": snapshot_id,
+            "bySymbol": {row["symbol"]: row for row in data},
+        }
+
+    @classmethod
+    async def _fetch_stocks(cls) -> tuple[list[dict], str]:
+        if _settings.stock_feed == "synthetic":
+            return cls._simulated(), "synthetic"
+        if _breaker.allow():
+            try:
+                live, complete = await cls._fetch_live()
+            except Exception:
+                # A cancelled (abandoned) request says nothing about upstream health.
+                _breaker.record_failure()
+                raise
+            if live:
+                # Merged, not replaced: Yahoo can leave a symbol out of a chunk
+                # that otherwise answered, and its last quote should survive.
+                cls._last_live = {**cls._last_live, **live}
+            if live and complete:
+                _breaker.record_success()
+                return cls._filled(live), "yahoo"
+            # Failed or abandoned chunks leave the board incomplete: a degraded
+            # answer, so it counts against the breaker.
+            _breaker.record_failure()
+            if live:
+                return cls._filled(live), "partial"
+        if cls._last_live:
+            return cls._filled(cls._last_live), "cached"
+        return cls._simulated(), "fallback"
+
+    @classmethod
+    def _filled(cls, live: dict[str, dict]) -> list[dict]:
+        """Registry-ordered board from ``live`` rows; other symbols come from
+        the last live board, else the simulator."""
+        registry = get_symbol_registry()
+        if all(m["symbol"] in live for m in registry.stocks):
+            return [live[m["symbol"]] for m in registry.stocks]
+        simulated = None
+        data = []
+        for i, m in enumerate(registry.stocks):
+            row = live.get(m["symbol"]) or cls._last_live.get(m["symbol"])
+            if row is None:
+                simulated = simulated or cls._simulated()
+                row = simulated[i]
+            data.append(row)
+        return data
+
+    @classmethod
+    def _simulated(cls) -> list[dict]:
+        """Advance the simulator to now and return its board."""
+        simulator = get_market_simulator()
+        simulator.advance()
+        prices, changes = simulator.quotes()
+        return [_row(m, p, c) for m, p, c in zip(simulator.stocks, prices, changes)]
+
     @classmethod
-    async def get_stocks(cls) -> dict:
-        quotes = await fetch_nse_quotes()
-        if quotes:
-            by_symbol = {q["symbol"]: q for q in quotes}
-            data = []
-            for m in NSE_STOCK_META:
-                q = by_symbol.get(m["yahoo_symbol"])
-                if q:
-                    price = q.get("regularMarketPrice") or 0
-                    change = q.get("regularMarketChangePercent") or 0
-                    if price > 0:
-                        data.append({
-                            "symbol": m["symbol"],
-                            "name": m["name"],
-                            "sector": m["sector"],
-                            "price": round(float(price), 2),
-                            "change": round(float(change), 2),
-                            "pe": m["pe"],
-                            "marketCap": m["market_cap"],
-                        })
-            if data:
-                return {"data": data, "source": "yahoo"}
-        out = [
-            {
-                **s,
-                "price": round(s["price"] * (1 + (random.random() - 0.5) * 0.02), 2),
-                "change": round(s["change"] + (random.random() - 0.5) * 0.5, 2),
-            }
-            for s in FALLBACK_STOCKS
-        ]
-        return {"data": out, "source": "fallback"}
+    async def _fetch_live(cls) -> tuple[dict[str, dict], bool]:
+        """Upstream rows by symbol, in registry order, and whether every chunk answered."""
+        registry = get_symbol_registry()
+        quotes, missing = await fetch_nse_quotes()
+        rows = {}
+        for q in quotes:
+            meta = registry.by_yahoo.get(q.get("symbol"))
+            if meta is None:
+                continue
+            price = q.get("regularMarketPrice") or 0
+            change = q.get("regularMarketChangePercent") or 0
+            if price > 0:
+                rows[meta["symbol"]] = _row(meta, price, change)
+        live = {m["symbol"]: rows[m["symbol"]] for m in registry.stocks if m["symbol"] in rows}
+        return live, not missing
@@ -1,3 +1,17 @@
-from app.utils.serializers import row_to_expense
+from app.utils.cache import AsyncTTLCache
+from app.utils.circuit_breaker import CircuitBreaker
+from app.utils.limiter import ConcurrencyLimiter, QueueFullError, QueueTimeoutError
+from app.utils.metrics import LatencyStats
+from app.utils.serializers import FastJSONResponse, register_plan, row_to_expense
 
-__all__ = ["row_to_expense"]
+__all__ = [
+    "AsyncTTLCache",
+    "CircuitBreaker",
+    "ConcurrencyLimiter",
+    "FastJSONResponse",
+    "LatencyStats",
+    "QueueFullError",
+    "QueueTimeoutError",
+    "register_plan",
+    "row_to_expense",
+]
@@ -0,0 +1,143 @@
+"""Small async-aware LRU/TTL cache with single-flight loading."""
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Generic, Hashable, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class AsyncTTLCache(Generic[K, V]):
+    """Bounded LRU cache whose entries also expire after ``ttl`` seconds.
+
+    ``get_or_load`` collapses concurrent misses for the same key into one call
+    of the loader; every waiter receives the same result (or exception).
+
+    With ``stale_ttl`` > 0, an entry past its TTL is still served for up to
+    ``stale_ttl`` more seconds while a single background load refreshes it
+    (stale-while-revalidate).
+    """
+
+    def __init__(self, maxsize: int = 128, ttl: float = 60.0, stale_ttl: float = 0.0) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        # key -> (fresh_until, stale_until, value)
+        self._entries: OrderedDict[K, tuple[float, float, V]] = OrderedDict()
+        # Loads started since the key was last invalidated. An invalidated
+        # load is dropped from here: it still answers its own waiters, but
+        # later callers start a fresh load and its result is not stored.
+        self._inflight: dict[K, asyncio.Future] = {}
+        self._loads: set[asyncio.Task] = set()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def _lookup(self, key: K) -> tuple[V | None, bool]:
+        """Return (value, is_stale); value is None when absent or expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None, False
+        fresh_until, stale_until, value = entry
+        now = time.monotonic()
+        if now >= stale_until:
+            del self._entries[key]
+            self.expirations += 1
+            return None, False
+        self._entries.move_to_end(key)
+        return value, now >= fresh_until
+
+    def get(self, key: K) -> V | None:
+        value, stale = self._lookup(key)
+        return None if stale else value
+
+    def set(self, key: K, value: V) -> None:
+        fresh_until = time.monotonic() + self.ttl
+        self._entries[key] = (fresh_until, fresh_until + self.stale_ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def get_or_load(self, key: K, loader: Callable[[], Awaitable[V]]) -> V:
+        value, stale = self._lookup(key)
+        if value is not None:
+            if stale:
+                self.stale_hits += 1
+                if key not in self._inflight:
+                    self._start_load(key, loader)
+            else:
+                self.hits += 1
+            return value
+        self.misses += 1
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self.coalesced += 1
+        else:
+            pending = self._start_load(key, loader)
+        # Shielded: a cancelled caller must not abort the load for the others.
+        return await asyncio.shield(pending)
+
+    def _start_load(self, key: K, loader: Callable[[], Awaitable[V]]) -> asyncio.Future:
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        task = asyncio.create_task(self._run_load(key, loader, future))
+        self._loads.add(task)
+        task.add_done_callback(self._loads.discard)
+        return future
+
+    async def _run_load(
+        self, key: K, loader: Callable[[], Awaitable[V]], future: asyncio.Future
+    ) -> None:
+        try:
+            value = await loader()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            # Mark retrieved so a failed background refresh is not logged as
+            # never-awaited; waiters still receive the exception.
+            future.exception()
+        else:
+            future.set_result(value)
+            if self._inflight.get(key) is future:
+                self.set(key, value)
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    def invalidate(self, predicate: Callable[[K], bool]) -> int:
+        """Drop every entry whose key matches ``predicate``; returns the count."""
+        keys = [k for k in self._entries if predicate(k)]
+        for k in keys:
+            del self._entries[k]
+        for k in [k for k in self._inflight if predicate(k)]:
+            del self._inflight[k]
+        self.invalidations += len(keys)
+        return len(keys)
+
+    def clear(self) -> None:
+        self.invalidations += len(self._entries)
+        self._entries.clear()
+        self._inflight.clear()
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "inflight": len(self._inflight),
+            "hits": self.hits,
+            "staleHits": self.stale_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
@@ -0,0 +1,157 @@
+"""Incremental CSV / NDJSON record parsing over an async byte stream.
+
+Records are yielded as they complete, so memory is bounded by the longest
+record rather than the size of the upload.
+"""
+
+import codecs
+import csv
+import json
+from collections import deque
+from typing import AsyncIterator
+
+# (line number of the record's first line, parsed record or None, error or None)
+ParsedRecord = tuple[int, dict | None, str | None]
+
+
+async def _iter_line_batches(chunks: AsyncIterator[bytes]) -> AsyncIterator[list[str]]:
+    """Complete lines (without line endings), one list per received chunk."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        if lines:
+            yield [line.rstrip("\r") for line in lines]
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield [pending.rstrip("\r")]
+
+
+async def _iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    async for lines in _iter_line_batches(chunks):
+        for line in lines:
+            yield line
+
+
+async def iter_ndjson(chunks: AsyncIterator[bytes]) -> AsyncIterator[ParsedRecord]:
+    line_no = 0
+    async for line in _iter_lines(chunks):
+        line_no += 1
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield line_no, None, f"Invalid JSON: {e.msg}"
+            continue
+        if not isinstance(record, dict):
+            yield line_no, None, "Expected a JSON object"
+            continue
+        yield line_no, record, None
+
+
+# Longest CSV record accepted, in characters. It also bounds how far an
+# unbalanced opening quote can run before the record is rejected.
+MAX_CSV_RECORD_CHARS = 64 * 1024
+
+
+class _NeedMore(Exception):
+    """The buffered lines end inside a record."""
+
+
+class _TooLong(Exception):
+    pass
+
+
+class _RecordFeed:
+    """Line source for one long-lived csv.reader over lines that arrive in batches.
+
+    Remembers the lines consumed by the record being parsed, so a record cut
+    off by the end of a batch (or rejected) can be handed back and re-read.
+    """
+
+    def __init__(self, limit: int) -> None:
+        self.lines: deque[tuple[int, str]] = deque()
+        self.record: list[tuple[int, str]] = []
+        self.limit = limit
+        self.size = 0
+        self.eof = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> str:
+        if not self.lines:
+            if self.eof:
+                raise StopIteration
+            raise _NeedMore
+        line = self.lines.popleft()
+        self.record.append(line)
+        self.size += len(line[1])
+        if self.size > self.limit:
+            raise _TooLong
+        return line[1] + "\n"
+
+    @property
+    def start(self) -> int:
+        return self.record[0][0]
+
+    def done(self) -> None:
+        self.record = []
+        self.size = 0
+
+    def rewind(self, skip: int = 0) -> None:
+        """Put the current record's lines, after the first ``skip``, back in front."""
+        self.lines.extendleft(reversed(self.record[skip:]))
+        self.done()
+
+
+async def iter_csv(chunks: AsyncIterator[bytes]) -> AsyncIterator[ParsedRecord]:
+    """Parse CSV with a header row; empty cells become None.
+
+    Quoted fields may span lines. A malformed or over-long record is reported
+    at its first line and parsing resumes on the line after it.
+    """
+    feed = _RecordFeed(MAX_CSV_RECORD_CHARS)
+    reader = csv.reader(feed, strict=True)
+    header: list[str] | None = None
+    line_no = 0
+    batches = _iter_line_batches(chunks)
+    while True:
+        try:
+            row = next(reader)
+        except _NeedMore:
+            # Re-read the partial record once the next batch is buffered.
+            feed.rewind()
+            lines = await anext(batches, None)
+            if lines is None:
+                feed.eof = True
+            else:
+                feed.lines.extend(enumerate(lines, line_no + 1))
+                line_no += len(lines)
+            continue
+        except _TooLong:
+            yield feed.start, None, f"Record longer than {MAX_CSV_RECORD_CHARS} characters"
+            feed.rewind(skip=1)
+            continue
+        except csv.Error as e:
+            message = (
+                "Unterminated quoted field" if feed.eof and not feed.lines else f"Invalid CSV: {e}"
+            )
+            yield feed.start, None, message
+            feed.rewind(skip=1)
+            continue
+        except StopIteration:
+            return
+        start = feed.start
+        feed.done()
+        if not row or (len(row) == 1 and not row[0].strip()):
+            continue
+        if header is None:
+            header = [h.strip() for h in row]
+            continue
+        if len(row) != len(header):
+            yield start, None, f"Expected {len(header)} columns, got {len(row)}"
+            continue
+        yield start, {k: (v if v != "" else None) for k, v in zip(header, row)}, None
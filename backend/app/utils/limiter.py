@@ -0,0 +1,63 @@
+"""Concurrency limit with a bounded, time-limited wait queue."""
+
+import asyncio
+
+
+class QueueFullError(Exception):
+    """Every slot is busy and the wait queue is full."""
+
+
+class QueueTimeoutError(Exception):
+    """Waited in the queue longer than the limiter's timeout."""
+
+
+class ConcurrencyLimiter:
+    """At most ``limit`` holders; up to ``max_waiting`` more may queue for
+    ``timeout`` seconds. Anything beyond that is rejected immediately."""
+
+    def __init__(self, limit: int, max_waiting: int, timeout: float) -> None:
+        self.limit = limit
+        self.max_waiting = max_waiting
+        self.timeout = timeout
+        self._semaphore = asyncio.Semaphore(limit)
+        self.active = 0
+        self.waiting = 0
+        self.completed = 0
+        self.cancelled = 0
+        self.rejected = 0
+        self.timed_out = 0
+
+    async def acquire(self) -> None:
+        if self._semaphore.locked() and self.waiting >= self.max_waiting:
+            self.rejected += 1
+            raise QueueFullError()
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), self.timeout)
+        except TimeoutError:
+            self.timed_out += 1
+            raise QueueTimeoutError() from None
+        finally:
+            self.waiting -= 1
+        self.active += 1
+
+    def release(self, cancelled: bool = False) -> None:
+        """Free a slot; ``cancelled`` counts holders that were cut short."""
+        self.active -= 1
+        if cancelled:
+            self.cancelled += 1
+        else:
+            self.completed += 1
+        self._semaphore.release()
+
+    def stats(self) -> dict:
+        return {
+            "active": self.active,
+            "queued": self.waiting,
+            "limit": self.limit,
+            "maxQueued": self.max_waiting,
+            "completed": self.completed,
+            "cancelled": self.cancelled,
+            "rejected": self.rejected,
+            "timedOut": self.timed_out,
+        }
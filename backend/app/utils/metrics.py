@@ -0,0 +1,35 @@
+"""In-process latency counters."""
+
+from collections import deque
+
+
+class LatencyStats:
+    """Count/mean/max over all samples, percentiles over the last ``window``."""
+
+    def __init__(self, window: int = 512) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._recent: deque[float] = deque(maxlen=window)
+
+    def record(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self._recent.append(seconds)
+
+    def _percentile(self, ordered: list[float], q: float) -> float:
+        return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+    def stats(self) -> dict:
+        """Seconds, rounded to the millisecond."""
+        if not self.count:
+            return {"count": 0}
+        ordered = sorted(self._recent)
+        return {
+            "count": self.count,
+            "mean": round(self.total / self.count, 3),
+            "p50": round(self._percentile(ordered, 0.50), 3),
+            "p95": round(self._percentile(ordered, 0.95), 3),
+            "max": round(self.max, 3),
+        }
@@ -0,0 +1,42 @@
+"""Shared AsyncOpenAI client, opened and closed by the app lifespan."""
+
+import httpx
+from openai import AsyncOpenAI
+
+from app.config import get_settings
+
+_client: AsyncOpenAI | None = None
+
+
+def open_openai_client() -> AsyncOpenAI | None:
+    """Create the pooled client; None while OPENAI_API_KEY is not configured."""
+    global _client
+    if _client is None:
+        settings = get_settings()
+        api_key = settings.openai_api_key.strip()
+        if not api_key:
+            return None
+        _client = AsyncOpenAI(
+            api_key=api_key,
+            base_url=settings.openai_base_url or None,
+            max_retries=settings.openai_max_retries,
+            http_client=httpx.AsyncClient(
+                timeout=httpx.Timeout(
+                    settings.openai_timeout_seconds,
+                    connect=settings.openai_connect_timeout_seconds,
+                ),
+                limits=httpx.Limits(
+                    max_connections=settings.openai_max_connections,
+                    max_keepalive_connections=settings.openai_max_connections,
+                    keepalive_expiry=60.0,
+                ),
+            ),
+        )
+    return _client
+
+
+async def close_openai_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.close()
+        _client = None
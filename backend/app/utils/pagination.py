@@ -0,0 +1,32 @@
+"""Opaque keyset cursors for list endpoints."""
+
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any
+
+
+def encode_cursor(field: str, order: str, value: Any, id: str, direction: str) -> str:
+    """Encode the sort key and id of a boundary row as a URL-safe token."""
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    payload = json.dumps(
+        {"f": field, "o": order, "v": value, "id": id, "d": direction},
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> dict:
+    """Decode a cursor from `encode_cursor`; raises ValueError if malformed."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ValueError("Invalid cursor.") from e
+    if not isinstance(data, dict) or not {"f", "o", "v", "id", "d"} <= data.keys():
+        raise ValueError("Invalid cursor.")
+    if data["d"] not in ("next", "prev") or data["o"] not in ("asc", "desc"):
+        raise ValueError("Invalid cursor.")
+    return data
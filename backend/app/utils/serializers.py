@@ -1,5 +1,12 @@
 """Serialize DB rows to API response shape (camelCase for frontend)."""
 
+import json
+from datetime import date, datetime
+from operator import attrgetter, itemgetter
+from typing import Any, Callable, Iterable
+
+from starlette.responses import Response
+
 
 def row_to_expense(row: dict) -> dict:
     """Convert expense row (snake_case) to API shape (camelCase)."""
@@ -12,3 +19,83 @@ def row_to_expense(row: dict) -> dict:
         if k in out and hasattr(out[k], "isoformat"):
             out[k] = out[k].isoformat()
     return out
+
+
+# (model attribute, response key, is_datetime) in response order.
+EXPENSE_FIELDS: tuple[tuple[str, str, bool], ...] = (
+    ("id", "id", False),
+    ("title", "title", False),
+    ("amount", "amount", False),
+    ("category", "category", False),
+    ("status", "status", False),
+    ("description", "description", False),
+    ("date", "date", True),
+    ("created_at", "createdAt", True),
+    ("updated_at", "updatedAt", True),
+)
+
+
+def _iso(value):
+    if value is None:
+        return None
+    # Raw query rows carry datetimes as ISO text; normalise to isoformat().
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return value.isoformat()
+
+
+def compile_plan(
+    fields: Iterable[tuple[str, str, bool]], *, mapping: bool = False
+) -> Callable[[Any], dict]:
+    """Build a function mapping a model instance straight to its response dict.
+
+    The getters and renames are resolved once, so each row costs one dict
+    comprehension over C-level attrgetter/itemgetter calls. With ``mapping``
+    the rows are dicts keyed by attribute (raw query results).
+    """
+    getter = itemgetter if mapping else attrgetter
+    steps = tuple((key, getter(attr), is_datetime) for attr, key, is_datetime in fields)
+
+    def plan(row: Any) -> dict:
+        return {key: _iso(get(row)) if iso else get(row) for key, get, iso in steps}
+
+    return plan
+
+
+_plans: dict[type, Callable[[Any], dict]] = {}
+
+
+def register_plan(model: type, fields: Iterable[tuple[str, str, bool]]) -> None:
+    """Serialize instances of ``model`` with ``fields`` in `FastJSONResponse`."""
+    _plans[model] = compile_plan(fields)
+
+
+def _default(obj: Any) -> Any:
+    plan = _plans.get(type(obj))
+    if plan is not None:
+        return plan(obj)
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+_encoder = json.JSONEncoder(
+    ensure_ascii=False,
+    allow_nan=False,
+    separators=(",", ":"),
+    default=_default,
+)
+
+
+class FastJSONResponse(Response):
+    """JSON response encoded in one C ``json`` pass.
+
+    Registered models (see `register_plan`) are converted by their compiled
+    plan as the encoder reaches them, instead of going through model_dump,
+    row_to_expense and FastAPI's jsonable_encoder first.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return _encoder.encode(content).encode("utf-8")
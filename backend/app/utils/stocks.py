@@ -1,52 +1,224 @@
+import asyncio
+import csv
+import random
+from functools import lru_cache
+from pathlib import Path
+from urllib.parse import quote
+
 import httpx
 
-NSE_STOCK_META = [
-    {"symbol": "RELIANCE", "yahoo_symbol": "RELIANCE.NS", "name": "Reliance Industries", "sector": "Energy", "pe": 28.5, "market_cap": "19.9L Cr"},
-    {"symbol": "TCS", "yahoo_symbol": "TCS.NS", "name": "Tata Consultancy Services", "sector": "IT", "pe": 32.1, "market_cap": "14.1L Cr"},
-    {"symbol": "HDFCBANK", "yahoo_symbol": "HDFCBANK.NS", "name": "HDFC Bank", "sector": "Banking", "pe": 19.2, "market_cap": "12.8L Cr"},
-    {"symbol": "INFY", "yahoo_symbol": "INFY.NS", "name": "Infosys", "sector": "IT", "pe": 26.8, "market_cap": "6.4L Cr"},
-    {"symbol": "ICICIBANK", "yahoo_symbol": "ICICIBANK.NS", "name": "ICICI Bank", "sector": "Banking", "pe": 17.8, "market_cap": "8.7L Cr"},
-    {"symbol": "HINDUNILVR", "yahoo_symbol": "HINDUNILVR.NS", "name": "Hindustan Unilever", "sector": "FMCG", "pe": 55.2, "market_cap": "5.8L Cr"},
-    {"symbol": "SBIN", "yahoo_symbol": "SBIN.NS", "name": "State Bank of India", "sector": "Banking", "pe": 10.5, "market_cap": "7.0L Cr"},
-    {"symbol": "BHARTIARTL", "yahoo_symbol": "BHARTIARTL.NS", "name": "Bharti Airtel", "sector": "Telecom", "pe": 45.3, "market_cap": "8.9L Cr"},
-    {"symbol": "ITC", "yahoo_symbol": "ITC.NS", "name": "ITC Limited", "sector": "FMCG", "pe": 27.1, "market_cap": "5.8L Cr"},
-    {"symbol": "KOTAKBANK", "yahoo_symbol": "KOTAKBANK.NS", "name": "Kotak Mahindra Bank", "sector": "Banking", "pe": 21.3, "market_cap": "3.7L Cr"},
-    {"symbol": "LT", "yahoo_symbol": "LT.NS", "name": "Larsen & Toubro", "sector": "Infrastructure", "pe": 34.5, "market_cap": "4.8L Cr"},
-    {"symbol": "WIPRO", "yahoo_symbol": "WIPRO.NS", "name": "Wipro", "sector": "IT", "pe": 22.4, "market_cap": "2.4L Cr"},
-    {"symbol": "AXISBANK", "yahoo_symbol": "AXISBANK.NS", "name": "Axis Bank", "sector": "Banking", "pe": 14.8, "market_cap": "3.5L Cr"},
-    {"symbol": "ADANIENT", "yahoo_symbol": "ADANIENT.NS", "name": "Adani Enterprises", "sector": "Conglomerate", "pe": 78.9, "market_cap": "3.3L Cr"},
-    {"symbol": "TATAMOTORS", "yahoo_symbol": "TATAMOTORS.NS", "name": "Tata Motors", "sector": "Automobile", "pe": 8.7, "market_cap": "3.5L Cr"},
-]
-
-FALLBACK_STOCKS = [
-    {"symbol": "RELIANCE", "name": "Reliance Industries", "sector": "Energy", "price": 2945.5, "change": 1.2, "pe": 28.5, "marketCap": "19.9L Cr"},
-    {"symbol": "TCS", "name": "Tata Consultancy Services", "sector": "IT", "price": 3890.25, "change": -0.5, "pe": 32.1, "marketCap": "14.1L Cr"},
-    {"symbol": "HDFCBANK", "name": "HDFC Bank", "sector": "Banking", "price": 1678.9, "change": 0.8, "pe": 19.2, "marketCap": "12.8L Cr"},
-    {"symbol": "INFY", "name": "Infosys", "sector": "IT", "price": 1545.6, "change": -1.1, "pe": 26.8, "marketCap": "6.4L Cr"},
-    {"symbol": "ICICIBANK", "name": "ICICI Bank", "sector": "Banking", "price": 1234.75, "change": 1.5, "pe": 17.8, "marketCap": "8.7L Cr"},
-    {"symbol": "HINDUNILVR", "name": "Hindustan Unilever", "sector": "FMCG", "price": 2456.3, "change": -0.3, "pe": 55.2, "marketCap": "5.8L Cr"},
-    {"symbol": "SBIN", "name": "State Bank of India", "sector": "Banking", "price": 789.45, "change": 2.1, "pe": 10.5, "marketCap": "7.0L Cr"},
-    {"symbol": "BHARTIARTL", "name": "Bharti Airtel", "sector": "Telecom", "price": 1567.8, "change": 0.9, "pe": 45.3, "marketCap": "8.9L Cr"},
-    {"symbol": "ITC", "name": "ITC Limited", "sector": "FMCG", "price": 467.25, "change": 0.4, "pe": 27.1, "marketCap": "5.8L Cr"},
-    {"symbol": "KOTAKBANK", "name": "Kotak Mahindra Bank", "sector": "Banking", "price": 1845.9, "change": -0.7, "pe": 21.3, "marketCap": "3.7L Cr"},
-    {"symbol": "LT", "name": "Larsen & Toubro", "sector": "Infrastructure", "price": 3456.7, "change": 1.8, "pe": 34.5, "marketCap": "4.8L Cr"},
-    {"symbol": "WIPRO", "name": "Wipro", "sector": "IT", "price": 467.85, "change": -0.2, "pe": 22.4, "marketCap": "2.4L Cr"},
-    {"symbol": "AXISBANK", "name": "Axis Bank", "sector": "Banking", "price": 1123.4, "change": 1.3, "pe": 14.8, "marketCap": "3.5L Cr"},
-    {"symbol": "ADANIENT", "name": "Adani Enterprises", "sector": "Conglomerate", "price": 2890.15, "change": 3.2, "pe": 78.9, "marketCap": "3.3L Cr"},
-    {"symbol": "TATAMOTORS", "name": "Tata Motors", "sector": "Automobile", "price": 945.6, "change": 2.5, "pe": 8.7, "marketCap": "3.5L Cr"},
-]
-
-
-async def fetch_nse_quotes():
-    symbols = ",".join(m["yahoo_symbol"] for m in NSE_STOCK_META)
-    url = f"https://query1.finance.yahoo.com/v7/finance/quote?symbols={symbols}"
+from app.config import get_settings
+
+_DATA_FILE = Path(__file__).resolve().parent.parent / "data" / "nse_stocks.csv"
+
+_QUOTE_URL = "https://query1.finance.yahoo.com/v7/finance/quote"
+# Encoded length budget for the ``symbols=`` value of one upstream request.
+_MAX_SYMBOLS_CHARS = 1500
+
+_SYNTHETIC_SECTORS = ("Banking", "IT", "Energy", "FMCG", "Automobile", "Telecom", "Infrastructure")
+
+
+class SymbolRegistry:
+    """Stock metadata loaded once and indexed by NSE symbol, Yahoo symbol and sector.
+
+    Each entry is a dict with ``symbol``, ``yahoo_symbol``, ``name``, ``sector``,
+    ``pe``, ``market_cap`` and the reference ``ref_price``/``ref_change`` used
+    when the upstream is unavailable.
+    """
+
+    def __init__(self, stocks: list[dict]) -> None:
+        self.stocks = stocks
+        self.by_symbol = {s["symbol"]: s for s in stocks}
+        self.by_yahoo = {s["yahoo_symbol"]: s for s in stocks}
+        self.by_sector: dict[str, list[dict]] = {}
+        for s in stocks:
+            self.by_sector.setdefault(s["sector"].lower(), []).append(s)
+
+    def __len__(self) -> int:
+        return len(self.stocks)
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self.by_symbol
+
+    @property
+    def symbols(self) -> list[str]:
+        return [s["symbol"] for s in self.stocks]
+
+    @classmethod
+    def from_csv(cls, path: Path) -> "SymbolRegistry":
+        with open(path, newline="", encoding="utf-8") as f:
+            stocks = [
+                {
+                    "symbol": row["symbol"].strip().upper(),
+                    "yahoo_symbol": row["yahoo_symbol"].strip(),
+                    "name": row["name"].strip(),
+                    "sector": row["sector"].strip(),
+                    "pe": float(row["pe"]) if row["pe"] else None,
+                    "market_cap": row["market_cap"].strip(),
+                    "ref_price": float(row["ref_price"]),
+                    "ref_change": float(row["ref_change"] or 0),
+                }
+                for row in csv.DictReader(f)
+            ]
+        return cls(stocks)
+
+    @classmethod
+    def synthetic(cls, count: int, seed: int) -> "SymbolRegistry":
+        """``count`` generated symbols spread over a few sectors."""
+        rng = random.Random(seed)
+        stocks = []
+        for i in range(count):
+            symbol = f"SYN{i:05d}"
+            stocks.append({
+                "symbol": symbol,
+                "yahoo_symbol": f"{symbol}.NS",
+                "name": f"Synthetic {i}",
+                "sector": _SYNTHETIC_SECTORS[i % len(_SYNTHETIC_SECTORS)],
+                "pe": round(rng.uniform(8, 80), 1),
+                "market_cap": f"{rng.uniform(0.1, 20):.1f}L Cr",
+                "ref_price": round(rng.uniform(50, 5000), 2),
+                "ref_change": round(rng.uniform(-3, 3), 2),
+            })
+        return cls(stocks)
+
+    def select(
+        self,
+        symbols: list[str] | None = None,
+        sector: str | None = None,
+    ) -> list[dict]:
+        """Entries matching the given symbols and/or sector, in registry order
+        for a sector and request order for symbols. Unknown symbols are skipped."""
+        if symbols is not None:
+            found = [self.by_symbol[s] for s in symbols if s in self.by_symbol]
+            if sector is not None:
+                found = [s for s in found if s["sector"].lower() == sector.lower()]
+            return found
+        if sector is not None:
+            return self.by_sector.get(sector.lower(), [])
+        return self.stocks
+
+
+@lru_cache(maxsize=1)
+def get_symbol_registry() -> SymbolRegistry:
+    settings = get_settings()
+    if settings.stock_sim_symbols > 0:
+        return SymbolRegistry.synthetic(settings.stock_sim_symbols, settings.stock_sim_seed)
+    path = settings.stock_universe_file
+    return SymbolRegistry.from_csv(Path(path) if path else _DATA_FILE)
+
+
+_USER_AGENT = "Mozilla/5.0 (compatible; PensiveApp/1.0)"
+
+_http_client: httpx.AsyncClient | None = None
+
+
+def open_http_client() -> httpx.AsyncClient:
+    """Create the shared pooled client (called from the app lifespan)."""
+    global _http_client
+    if _http_client is None:
+        settings = get_settings()
+        _http_client = httpx.AsyncClient(
+            timeout=settings.stock_http_timeout_seconds,
+            limits=httpx.Limits(
+                max_connections=settings.stock_http_max_connections,
+                max_keepalive_connections=settings.stock_http_max_connections,
+                keepalive_expiry=30.0,
+            ),
+            headers={"User-Agent": _USER_AGENT},
+        )
+    return _http_client
+
+
+async def close_http_client() -> None:
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+def _chunks(symbols: list[str], max_symbols: int) -> list[list[str]]:
+    """Split symbols into groups that fit one upstream URL."""
+    chunks: list[list[str]] = []
+    chunk: list[str] = []
+    length = 0
+    for symbol in symbols:
+        cost = len(quote(symbol, safe="")) + 3  # plus the encoded comma
+        if chunk and (len(chunk) >= max_symbols or length + cost > _MAX_SYMBOLS_CHARS):
+            chunks.append(chunk)
+            chunk, length = [], 0
+        chunk.append(symbol)
+        length += cost
+    if chunk:
+        chunks.append(chunk)
+    return chunks
+
+
+async def _request_chunk(symbols: list[str]) -> list | None:
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            r = await client.get(url, headers={"User-Agent": "Mozilla/5.0 (compatible; PensiveApp/1.0)"})
-            if r.status_code != 200:
-                return None
-            data = r.json()
-            result = data.get("quoteResponse", {}).get("result")
-            return result if isinstance(result, list) else None
+        r = await open_http_client().get(_QUOTE_URL, params={"symbols": ",".join(symbols)})
+        if r.status_code != 200:
+            return None
+        data = r.json()
+        result = data.get("quoteResponse", {}).get("result")
+        return result if isinstance(result, list) else None
     except Exception:
         return None
+
+
+async def _fetch_chunk(
+    symbols: list[str], semaphore: asyncio.Semaphore, hedge_after: float
+) -> list | None:
+    """One chunk; if it is still pending after ``hedge_after`` seconds a second
+    identical request races it and the first usable answer wins."""
+    async with semaphore:
+        tasks = {asyncio.create_task(_request_chunk(symbols))}
+        try:
+            if hedge_after > 0:
+                done, _ = await asyncio.wait(tasks, timeout=hedge_after)
+                if not done:
+                    tasks.add(asyncio.create_task(_request_chunk(symbols)))
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.result() is not None:
+                        return task.result()
+            return None
+        finally:
+            for task in tasks:
+                task.cancel()
+
+
+async def fetch_nse_quotes(
+    yahoo_symbols: list[str] | None = None,
+) -> tuple[list[dict], list[str]]:
+    """Fetch Yahoo quotes in URL-sized chunks, a few requests at a time.
+
+    Chunks still outstanding when ``stock_quote_budget_seconds`` runs out are
+    abandoned. Returns the merged quotes and the symbols of every chunk that
+    failed or was abandoned, so callers can tell a partial board from a full one.
+    """
+    settings = get_settings()
+    if yahoo_symbols is None:
+        yahoo_symbols = [s["yahoo_symbol"] for s in get_symbol_registry().stocks]
+    chunks = _chunks(yahoo_symbols, settings.stock_quote_chunk_size)
+    if not chunks:
+        return [], []
+    semaphore = asyncio.Semaphore(settings.stock_quote_concurrency)
+    tasks = [
+        asyncio.create_task(_fetch_chunk(chunk, semaphore, settings.stock_quote_hedge_seconds))
+        for chunk in chunks
+    ]
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=settings.stock_quote_budget_seconds)
+    finally:
+        for task in tasks:
+            task.cancel()
+    quotes: list[dict] = []
+    missing: list[str] = []
+    for chunk, task in zip(chunks, tasks):
+        result = task.result() if task in done else None
+        if result is None:
+            missing.extend(chunk)
+        else:
+            quotes.extend(result)
+    return quotes, missing
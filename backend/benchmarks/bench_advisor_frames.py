@@ -0,0 +1,66 @@
+"""Advisor SSE framing: frames, bytes and CPU per answer, per delta vs coalesced.
+
+No OpenAI key needed: a fake token stream yields ``--deltas`` short deltas,
+with ``--gap`` seconds between them (0 for a burst, e.g. a cache replay).
+Run from backend/:
+
+    python -m benchmarks.bench_advisor_frames [--deltas 800] [--gap 0 0.002]
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+from app.config import get_settings
+from app.services.advisor_service import AdvisorService
+
+_WORDS = [
+    "HDFC", " Bank", " has", " a", " P/E", " of", " 19.2", ",", " so", " allocate", " 25%", "\n",
+]
+
+
+async def _fake_stream(count: int, gap: float, seed: int = 7):
+    rng = random.Random(seed)
+    for _ in range(count):
+        if gap:
+            await asyncio.sleep(gap)
+        yield rng.choice(_WORDS)
+
+
+async def _measure(count: int, gap: float, window: float, max_chars: int) -> dict:
+    frames = size = 0
+    cpu = time.process_time()
+    started = time.perf_counter()
+    async for frame in AdvisorService._frames(_fake_stream(count, gap), window, max_chars):
+        frames += 1
+        size += len(frame.encode())
+    return {
+        "frames": frames,
+        "bytes": size,
+        "cpu": (time.process_time() - cpu) * 1000,
+        "wall": (time.perf_counter() - started) * 1000,
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--deltas", type=int, default=800)
+    parser.add_argument("--gap", type=float, nargs="+", default=[0.0, 0.002])
+    args = parser.parse_args()
+    settings = get_settings()
+    window, max_chars = settings.advisor_frame_window_seconds, settings.advisor_frame_max_chars
+
+    print(f"{args.deltas} deltas; coalesced = {window * 1000:g} ms window, {max_chars} chars\n")
+    print(f"{'gap ms':>6} {'framing':<10} {'frames':>7} {'bytes':>8} {'cpu ms':>8} {'wall ms':>8}")
+    for gap in args.gap:
+        for label, w in (("per delta", 0.0), ("coalesced", window)):
+            r = await _measure(args.deltas, gap, w, max_chars)
+            print(
+                f"{gap * 1000:>6g} {label:<10} {r['frames']:>7} {r['bytes']:>8,}"
+                f" {r['cpu']:>8.1f} {r['wall']:>8.1f}"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
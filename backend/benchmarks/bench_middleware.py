@@ -0,0 +1,119 @@
+"""Request middleware overhead: the previous BaseHTTPMiddleware pair against
+RequestContextMiddleware.
+
+No database or server needed: requests are driven in-process through
+httpx's ASGI transport against /health and a stub /api/expenses that returns
+a fixed 20-row page. Run from backend/:
+
+    python -m benchmarks.bench_middleware [--requests 5000] [--concurrency 16]
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+import uuid
+from datetime import datetime
+
+import httpx
+from fastapi import FastAPI
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+
+from app.middlewares.request_context import RequestContextMiddleware
+from app.utils.serializers import FastJSONResponse
+
+_PAGE = {
+    "data": [
+        {
+            "id": f"{i:08x}-0000-4000-8000-000000000000",
+            "title": f"Expense #{i}",
+            "amount": i * 1.25,
+            "category": "Food",
+            "status": "pending",
+            "date": datetime(2024, 1, 1 + i).isoformat(),
+        }
+        for i in range(20)
+    ],
+    "pagination": {"page": 1, "limit": 20, "total": 20, "totalPages": 1},
+}
+
+
+class _TraceIDMiddleware(BaseHTTPMiddleware):
+    """The previous trace-id layer, as it was before RequestContextMiddleware."""
+
+    async def dispatch(self, request: Request, call_next):
+        trace_id = request.headers.get("x-trace-id") or str(uuid.uuid4())
+        request.state.trace_id = trace_id
+        response = await call_next(request)
+        response.headers["x-trace-id"] = trace_id
+        return response
+
+
+class _RequestLoggingMiddleware(BaseHTTPMiddleware):
+    """The previous request-logging layer."""
+
+    async def dispatch(self, request: Request, call_next):
+        trace_id = getattr(request.state, "trace_id", None)
+        logging.getLogger(__name__).debug(
+            "Request %s %s",
+            request.method,
+            request.url.path,
+            extra={"trace_id": trace_id} if trace_id else {},
+        )
+        return await call_next(request)
+
+
+def _app(previous: bool) -> FastAPI:
+    app = FastAPI()
+    if previous:
+        app.add_middleware(_TraceIDMiddleware)
+        app.add_middleware(_RequestLoggingMiddleware)
+    else:
+        app.add_middleware(RequestContextMiddleware)
+
+    @app.get("/health")
+    async def health():
+        return {"status": "healthy"}
+
+    @app.get("/api/expenses")
+    async def expenses():
+        return FastJSONResponse(_PAGE)
+
+    return app
+
+
+async def _drive(app: FastAPI, path: str, requests: int, concurrency: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        remaining = min(requests, 500)  # warm-up
+
+        async def user() -> None:
+            nonlocal remaining
+            while remaining > 0:
+                remaining -= 1
+                response = await client.get(path)
+                assert response.status_code == 200 and "x-trace-id" in response.headers
+
+        await asyncio.gather(*(user() for _ in range(concurrency)))
+        remaining = requests
+        started = time.perf_counter()
+        await asyncio.gather(*(user() for _ in range(concurrency)))
+        return requests / (time.perf_counter() - started)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+
+    print(f"{'path':<14} {'previous req/s':>15} {'fused req/s':>12}")
+    for path in ("/health", "/api/expenses"):
+        before = await _drive(_app(previous=True), path, args.requests, args.concurrency)
+        after = await _drive(_app(previous=False), path, args.requests, args.concurrency)
+        print(f"{path:<14} {before:>15.0f} {after:>12.0f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,102 @@
+"""Expense list payload and latency: full rows against the table projection.
+
+Needs DATABASE_URL (after `make db-migrate`). Rows with long descriptions
+are inserted in a transaction that is rolled back, so the database is left
+as it was. Each page is read and encoded as GET /api/expenses would: full
+rows through find_many, projected ones (fields=) through expense_projection.
+Run from backend/:
+
+    python -m benchmarks.bench_projection [--rows 100000] [--limit 100] [--pages 50]
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import timedelta
+
+from app.config import get_settings
+from app.database.prisma_client import PrismaClient
+from app.services import expense_projection
+from app.services.expense_service import _columns, _projection, _row_plan
+from app.utils.serializers import FastJSONResponse
+
+_SEED_SQL = """
+INSERT INTO expenses (id, title, amount, category, status, description, "date", updated_at)
+SELECT
+    gen_random_uuid()::text,
+    'Expense #' || i,
+    (i % 100000) / 100.0,
+    (ARRAY['Food', 'Travel', 'Rent', 'Utilities', 'Shopping', 'Health', 'Other'])[1 + i % 7],
+    (ARRAY['pending', 'completed', 'cancelled'])[1 + i % 3],
+    repeat(md5(i::text), 6),
+    timestamp '2022-01-01' + (i % 1095) * interval '1 day',
+    now()
+FROM generate_series(1, $1::int) AS i
+"""
+
+_TABLE_FIELDS = "id,title,amount,category,status,date"
+
+
+class _Rollback(Exception):
+    pass
+
+
+async def _full_page(tx, offset: int, limit: int) -> bytes:
+    items = await tx.expense.find_many(order=[{"date": "desc"}], skip=offset, take=limit)
+    return FastJSONResponse({"data": items}).body
+
+
+async def _projected_page(tx, offset: int, limit: int) -> bytes:
+    projection = _projection(_TABLE_FIELDS)
+    sql, args = expense_projection.page_query(
+        _columns(projection), field="date", offset=offset, limit=limit
+    )
+    rows = await tx.query_raw(sql, *args)
+    return FastJSONResponse({"data": list(map(_row_plan(projection), rows))}).body
+
+
+async def _measure(label: str, read, tx, args: argparse.Namespace) -> None:
+    latencies: list[float] = []
+    size = 0
+    for page in range(args.pages):
+        offset = page * args.limit
+        started = time.perf_counter()
+        body = await read(tx, offset, args.limit)
+        latencies.append((time.perf_counter() - started) * 1000)
+        size += len(body)
+    print(
+        f"{label:<12} {size / args.pages:>12,.0f} {statistics.median(latencies):>10.2f}"
+        f" {max(latencies):>10.2f}"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--pages", type=int, default=50)
+    args = parser.parse_args()
+    if not get_settings().database_url:
+        raise SystemExit("DATABASE_URL is not set")
+
+    await PrismaClient.connect()
+    prisma = PrismaClient.get_client()
+    try:
+        async with prisma.tx(timeout=timedelta(minutes=10)) as tx:
+            await tx.execute_raw(_SEED_SQL, args.rows)
+            await tx.execute_raw("ANALYZE expenses")
+            print(f"{args.limit}-row pages, {args.pages} pages each\n")
+            print(f"{'rows':<12} {'bytes/page':>12} {'p50 ms':>10} {'max ms':>10}")
+            for label, read in (("full", _full_page), ("projected", _projected_page)):
+                await read(tx, 0, args.limit)  # warm-up
+                await _measure(label, read, tx, args)
+            raise _Rollback
+    except _Rollback:
+        pass
+    finally:
+        await PrismaClient.disconnect()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,105 @@
+"""Expense search plans and timings against a seeded expenses table.
+
+Needs DATABASE_URL (with pg_trgm and the schema.prisma indexes, i.e. after
+`make db-migrate`). Rows are inserted in a transaction that is rolled back,
+so the database is left as it was. Run from backend/:
+
+    python -m benchmarks.bench_search [--rows 1000000]
+
+Short terms are also run as substrings (the old matching) for comparison.
+"""
+
+import argparse
+import asyncio
+import re
+import time
+from datetime import timedelta
+
+from app.config import get_settings
+from app.database.prisma_client import PrismaClient
+from app.services import expense_search
+from app.services.expense_search import count_query, page_query
+
+_SEED_SQL = """
+INSERT INTO expenses (id, title, amount, category, status, description, "date", updated_at)
+SELECT
+    gen_random_uuid()::text,
+    (ARRAY['Lunch', 'Dinner', 'Coffee', 'Taxi', 'Flight', 'Hotel', 'Groceries', 'Rent',
+           'Internet', 'Phone', 'Gym', 'Pharmacy', 'Books', 'Cinema', 'Fuel', 'Parking',
+           'Uber', 'AI course', 'TV licence', 'Gas bill'])[1 + i % 20]
+        || ' ' || (ARRAY['at', 'with', 'for', 'in', 'on'])[1 + (i / 20) % 5]
+        || ' ' || (ARRAY['Berlin', 'Paris', 'office', 'home', 'client', 'team', 'airport',
+                         'downtown', 'Rome', 'NYC'])[1 + (i / 100) % 10]
+        || ' #' || i % 997,
+    (i % 100000) / 100.0,
+    (ARRAY['Food', 'Travel', 'Rent', 'Utilities', 'Shopping', 'Health', 'Other'])[1 + i % 7],
+    (ARRAY['pending', 'completed', 'cancelled'])[1 + i % 3],
+    CASE WHEN i % 4 = 0 THEN NULL ELSE 'note ' || md5(i::text) END,
+    timestamp '2022-01-01' + (i % 1095) * interval '1 day',
+    now()
+FROM generate_series(1, $1::int) AS i
+"""
+
+_CASES = [
+    ("substring term", "rome", None),
+    ("two terms", "lunch berlin", None),
+    ("short term", "ai", None),
+    ("one-char term", "r", None),
+    ("short + long term", "ai rome", None),
+    ("term + category", "taxi", "Travel"),
+]
+
+_SCAN = re.compile(r"(?:Parallel )?(?:Seq|Index Only|Index|Bitmap Heap|Bitmap Index) Scan")
+_EXECUTION = re.compile(r"Execution Time: ([\d.]+) ms")
+
+
+class _Rollback(Exception):
+    pass
+
+
+async def _explain(tx, sql: str, args: list) -> tuple[str, float]:
+    rows = await tx.query_raw(f"EXPLAIN (ANALYZE, BUFFERS OFF) {sql}", *args)
+    plan = "\n".join(row["QUERY PLAN"] for row in rows)
+    scans = sorted(set(_SCAN.findall(plan)))
+    return ", ".join(scans), float(_EXECUTION.search(plan).group(1))
+
+
+async def _report(tx, label: str, search: str, category: str | None) -> None:
+    for shape, (sql, args) in (
+        ("count", count_query(search, category)),
+        ("page", page_query(search, category=category, field="date")),
+        ("relevance", page_query(search, category=category)),
+    ):
+        scans, ms = await _explain(tx, sql, args)
+        print(f"{label:<26} {shape:<10} {ms:9.2f} ms  {scans}")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+    if not get_settings().database_url:
+        raise SystemExit("DATABASE_URL is not set")
+
+    await PrismaClient.connect()
+    prisma = PrismaClient.get_client()
+    try:
+        async with prisma.tx(timeout=timedelta(minutes=30)) as tx:
+            started = time.perf_counter()
+            await tx.execute_raw(_SEED_SQL, args.rows)
+            await tx.execute_raw("ANALYZE expenses")
+            print(f"seeded {args.rows:,} rows in {time.perf_counter() - started:.1f} s\n")
+            for label, search, category in _CASES:
+                await _report(tx, label, search, category)
+            expense_search.MIN_SUBSTRING_TERM = 1
+            for label, search, category in _CASES[2:4]:
+                await _report(tx, f"{label} as substring", search, category)
+            raise _Rollback
+    except _Rollback:
+        pass
+    finally:
+        await PrismaClient.disconnect()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,88 @@
+"""Expense list serialization: the old encoding chain against FastJSONResponse.
+
+No database needed; rows are synthetic Expense models (and raw dicts for the
+projected path). Run from backend/:
+
+    python -m benchmarks.bench_serializers [--rows 100] [--repeat 200]
+"""
+
+import argparse
+import json
+import random
+import time
+from datetime import datetime, timedelta
+
+from fastapi.encoders import jsonable_encoder
+from prisma.models import Expense
+
+from app.services import expense_service
+from app.utils.serializers import EXPENSE_FIELDS, FastJSONResponse, row_to_expense
+
+CATEGORIES = ["Food", "Travel", "Rent", "Utilities", "Shopping", "Health", "Other"]
+STATUSES = ["pending", "completed", "cancelled"]
+
+
+def _expenses(n: int, seed: int = 7) -> list[Expense]:
+    rng = random.Random(seed)
+    first = datetime(2022, 1, 1)
+    return [
+        Expense(
+            id=f"{i:08x}-0000-4000-8000-{rng.getrandbits(48):012x}",
+            title=f"Expense #{i}",
+            amount=rng.randrange(100, 1_000_000) / 100,
+            category=rng.choice(CATEGORIES),
+            status=rng.choice(STATUSES),
+            description=None if i % 4 == 0 else f"note {i}",
+            date=first + timedelta(days=rng.randrange(3 * 365)),
+            created_at=first,
+            updated_at=first + timedelta(minutes=i),
+        )
+        for i in range(n)
+    ]
+
+
+def _old_chain(items: list[Expense]) -> bytes:
+    # model_dump -> row_to_expense -> jsonable_encoder -> json.dumps, as before.
+    content = {"data": [row_to_expense(e.model_dump()) for e in items]}
+    return json.dumps(
+        jsonable_encoder(content), ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def _timed(label: str, fn, rows: int, repeat: int) -> bytes:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        body = fn()
+        best = min(best, time.perf_counter() - started)
+    print(f"{label:<28} {best / rows * 1e6:8.2f} us/row  {len(body):>9,} bytes")
+    return body
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    items = _expenses(args.rows)
+    response = FastJSONResponse(None)
+    old = _timed("model_dump chain", lambda: _old_chain(items), args.rows, args.repeat)
+    new = _timed(
+        "FastJSONResponse", lambda: response.render({"data": items}), args.rows, args.repeat
+    )
+    assert new == old, "FastJSONResponse output differs from the old chain"
+
+    projection = expense_service._projection("id,title,amount,category,status,date")
+    plan = expense_service._row_plan(projection)
+    raw = [{attr: getattr(e, attr) for attr, _, _ in EXPENSE_FIELDS} for e in items]
+    _timed(
+        "projected raw rows",
+        lambda: response.render({"data": [plan(row) for row in raw]}),
+        args.rows,
+        args.repeat,
+    )
+
+
+if __name__ == "__main__":
+    main()
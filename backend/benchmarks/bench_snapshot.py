@@ -0,0 +1,78 @@
+"""Expense snapshot at scale: load, memory, dashboard cells and month resync.
+
+No database needed; rows are synthetic. Run from backend/:
+
+    python -m benchmarks.bench_snapshot [--rows 1000000]
+"""
+
+import argparse
+import random
+import time
+from datetime import date, datetime
+
+from app.services.expense_snapshot import ExpenseSnapshot, _Columns, _to_day
+
+CATEGORIES = ["Food", "Travel", "Rent", "Utilities", "Shopping", "Health", "Other"]
+STATUSES = ["pending", "completed", "cancelled"]
+
+
+def _rows(n: int, seed: int = 7) -> list[dict]:
+    rng = random.Random(seed)
+    first, span = _to_day(date(2022, 1, 1)), 3 * 365
+    return [
+        {
+            "id": f"{i:08x}-0000-4000-8000-{rng.getrandbits(48):012x}",
+            "amount": rng.randrange(100, 1_000_000) / 100,
+            "category": rng.choice(CATEGORIES),
+            "status": rng.choice(STATUSES),
+            "day": first + rng.randrange(span),
+        }
+        for i in range(n)
+    ]
+
+
+def _timed(label: str, fn, repeat: int = 5):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    print(f"{label:<32} {best * 1000:9.2f} ms")
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    rows = _rows(args.rows)
+    columns = _Columns()
+    _timed(f"load {args.rows:,} rows", lambda: columns.upsert(rows), repeat=1)
+    usage = columns.nbytes()
+    print(
+        f"{'memory':<32} {usage['totalBytes'] / (1 << 20):9.1f} MiB"
+        f" (arrays {usage['arrayBytes'] / (1 << 20):.1f}, id index {usage['idIndexBytes'] / (1 << 20):.1f})"
+    )
+
+    snapshot = ExpenseSnapshot()
+    snapshot._columns = columns
+    _timed("cells, all time", snapshot.cells)
+    _timed("cells, one year", lambda: snapshot.cells(datetime(2023, 1, 1), datetime(2024, 1, 1)))
+    _timed("cells, one month", lambda: snapshot.cells(datetime(2023, 6, 1), datetime(2023, 7, 1)))
+    _timed("month_counts (per refresh)", columns.month_counts)
+
+    # A month resync after 1% of its rows were deleted elsewhere.
+    lo, hi = _to_day(date(2023, 6, 1)), _to_day(date(2023, 7, 1))
+    month = [r for r in rows if lo <= r["day"] < hi]
+    survivors = month[len(month) // 100 :]
+    dropped = _timed(
+        f"replace_range, {len(month):,} rows",
+        lambda: columns.replace_range(lo, hi, survivors),
+        repeat=1,
+    )
+    print(f"{'rows dropped':<32} {dropped:9d}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""HTTP load test: expense list and dashboard throughput per worker count.
+
+For each worker count, starts `uvicorn app.main:app --workers N` against
+DATABASE_URL and drives it with closed-loop clients for a fixed time. The
+dashboard cache is disabled, so every request reaches the database. Load
+some expenses first (e.g. POST /api/expenses/import). Run from backend/:
+
+    python -m benchmarks.load_test [--workers 1 2 4] [--concurrency 32] [--seconds 10]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+from app.config import get_settings
+
+CATEGORIES = ["Food", "Travel", "Rent", "Utilities", "Shopping", "Health", "Other"]
+
+
+def _path(rng: random.Random) -> str:
+    kind = rng.randrange(3)
+    if kind == 0:
+        return f"/api/expenses?page={rng.randint(1, 50)}&limit=20"
+    if kind == 1:
+        return f"/api/expenses?category={rng.choice(CATEGORIES)}&limit=20"
+    return f"/api/dashboard?year={rng.randint(2022, 2024)}&month={rng.randint(1, 12)}"
+
+
+def _start_server(workers: int, port: int) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        "WEB_CONCURRENCY": str(workers),
+        "DASHBOARD_CACHE_TTL_SECONDS": "0",
+        "STOCK_FEED": "synthetic",
+    }
+    return subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "app.main:app",
+            "--port", str(port), "--workers", str(workers), "--log-level", "warning",
+        ],
+        env=env,
+    )
+
+
+async def _wait_ready(client: httpx.AsyncClient, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get("/health/db")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.5)
+    raise RuntimeError("server did not become ready")
+
+
+async def _drive(client: httpx.AsyncClient, concurrency: int, seconds: float) -> dict:
+    latencies: list[float] = []
+    errors = 0
+    deadline = time.monotonic() + seconds
+
+    async def user(seed: int) -> None:
+        nonlocal errors
+        rng = random.Random(seed)
+        while time.monotonic() < deadline:
+            started = time.perf_counter()
+            try:
+                response = await client.get(_path(rng))
+                ok = response.status_code == 200
+            except httpx.HTTPError:
+                ok = False
+            if ok:
+                latencies.append(time.perf_counter() - started)
+            else:
+                errors += 1
+
+    await asyncio.gather(*(user(i) for i in range(concurrency)))
+    latencies.sort()
+    return {
+        "rps": len(latencies) / seconds,
+        "p50": statistics.median(latencies) * 1000 if latencies else 0.0,
+        "p95": latencies[int(len(latencies) * 0.95)] * 1000 if latencies else 0.0,
+        "errors": errors,
+    }
+
+
+async def _run(workers: int, args: argparse.Namespace) -> dict:
+    server = _start_server(workers, args.port)
+    try:
+        async with httpx.AsyncClient(
+            base_url=f"http://127.0.0.1:{args.port}",
+            timeout=30.0,
+            limits=httpx.Limits(max_connections=args.concurrency),
+        ) as client:
+            await _wait_ready(client)
+            await _drive(client, args.concurrency, min(2.0, args.seconds))  # warm-up
+            return await _drive(client, args.concurrency, args.seconds)
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--port", type=int, default=8100)
+    args = parser.parse_args()
+    if not get_settings().database_url:
+        raise SystemExit("DATABASE_URL is not set")
+
+    print(f"{os.cpu_count()} CPUs, {args.concurrency} clients, {args.seconds:g}s per run\n")
+    print(f"{'workers':>7} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'errors':>7}")
+    for workers in args.workers:
+        r = await _run(workers, args)
+        print(f"{workers:>7} {r['rps']:>9.1f} {r['p50']:>8.1f} {r['p95']:>8.1f} {r['errors']:>7}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,10 +1,19 @@
 #!/usr/bin/env bash
 set -e
 
-echo "Starting FastAPI server on port ${PORT:-8000}..."
+WORKERS=${WEB_CONCURRENCY:-1}
+echo "Starting FastAPI server on port ${PORT:-8000} with ${WORKERS} worker(s)..."
 
-# Single worker to avoid multiple Prisma clients and connection pool exhaustion (e.g. Supabase free tier)
+# Each worker opens its own Prisma pool. Keep DB_CONNECTION_BUDGET within the
+# database's limit (e.g. Supabase free tier); it is split across WEB_CONCURRENCY
+# workers unless DB_POOL_SIZE (or connection_limit in DATABASE_URL) is set.
+#
+# Workers share nothing in memory. Each has its own dashboard/count caches
+# (TTLs clamped to MULTI_WORKER_CACHE_TTL_SECONDS, since another worker's
+# writes cannot invalidate them), its own Yahoo poller and expense snapshot,
+# and its share of ADVISOR_MAX_STREAMS. See "Running several workers" in the
+# README.
 exec uvicorn app.main:app \
   --host 0.0.0.0 \
   --port ${PORT:-8000} \
-  --workers 1
\ No newline at end of file
+  --workers ${WORKERS}
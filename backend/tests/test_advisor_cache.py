@@ -0,0 +1,90 @@
+import asyncio
+
+import pytest
+
+from app.services.advisor_cache import AdvisorResponseCache
+
+_KEY = AdvisorResponseCache.key("system", "user")
+
+
+class _Upstream:
+    """Counts calls; each stream waits for ``release`` before its deltas."""
+
+    def __init__(self, deltas=("a", "b", "c"), fail_after: int | None = None) -> None:
+        self.deltas = deltas
+        self.fail_after = fail_after
+        self.calls = 0
+        self.release = asyncio.Event()
+
+    async def __call__(self):
+        self.calls += 1
+        await self.release.wait()
+        for i, delta in enumerate(self.deltas):
+            if i == self.fail_after:
+                raise RuntimeError("upstream failed")
+            yield delta
+            await asyncio.sleep(0)
+
+
+async def _read(cache: AdvisorResponseCache, upstream, ttl: float = 60) -> list[str]:
+    return [d async for d in cache.stream(_KEY, upstream, ttl=ttl)]
+
+
+async def test_identical_concurrent_requests_share_one_upstream_stream():
+    cache = AdvisorResponseCache(max_bytes=1 << 20)
+    upstream = _Upstream()
+    readers = [asyncio.create_task(_read(cache, upstream)) for _ in range(2)]
+    await asyncio.sleep(0.01)
+    upstream.release.set()
+
+    first, second = await asyncio.gather(*readers)
+    assert first == second == ["a", "b", "c"]
+    assert upstream.calls == 1
+    assert cache.stats()["coalesced"] == 1
+
+    assert await _read(cache, upstream) == ["a", "b", "c"]
+    assert upstream.calls == 1
+    assert cache.stats()["hits"] == 1
+
+
+async def test_failed_leader_does_not_poison_the_cache():
+    cache = AdvisorResponseCache(max_bytes=1 << 20)
+    failing = _Upstream(fail_after=1)
+    failing.release.set()
+    with pytest.raises(RuntimeError):
+        await _read(cache, failing)
+    assert cache.stats()["size"] == 0
+    assert cache.stats()["inflight"] == 0
+
+    upstream = _Upstream()
+    upstream.release.set()
+    assert await _read(cache, upstream) == ["a", "b", "c"]
+    assert upstream.calls == 1
+
+
+async def test_cancelled_leader_does_not_poison_the_cache():
+    cache = AdvisorResponseCache(max_bytes=1 << 20)
+    upstream = _Upstream()
+    upstream.release.set()
+    stream = cache.stream(_KEY, upstream, ttl=60)
+    assert await anext(stream) == "a"
+    await stream.aclose()
+    await asyncio.sleep(0)
+    assert cache.stats()["size"] == 0
+    assert cache.stats()["inflight"] == 0
+
+    assert await _read(cache, upstream) == ["a", "b", "c"]
+    assert upstream.calls == 2
+
+
+async def test_expired_answer_is_fetched_again():
+    cache = AdvisorResponseCache(max_bytes=1 << 20)
+    upstream = _Upstream()
+    upstream.release.set()
+    assert await _read(cache, upstream, ttl=0.05) == ["a", "b", "c"]
+    assert await _read(cache, upstream, ttl=0.05) == ["a", "b", "c"]
+    assert upstream.calls == 1
+
+    await asyncio.sleep(0.1)
+    assert await _read(cache, upstream, ttl=0.05) == ["a", "b", "c"]
+    assert upstream.calls == 2
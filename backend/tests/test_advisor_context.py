@@ -0,0 +1,127 @@
+import pytest
+
+from app.config import get_settings
+from app.models.schemas import AdvisorRequest
+from app.services import advisor_context, advisor_service
+from app.services.advisor_context import StockContext, estimate_tokens, get_stock_context
+from app.services.advisor_service import AdvisorService
+from app.services.stock_service import StockService
+
+
+def _rows(n: int) -> list[dict]:
+    return [
+        {"symbol": f"S{i}", "name": f"Stock {i}", "price": 100.0 + i, "change": 1.0,
+         "pe": 20.0, "sector": "IT"}
+        for i in range(n)
+    ]
+
+
+def _listed(context: str) -> list[str]:
+    return [line.split(" ", 1)[0] for line in context.splitlines()]
+
+
+def test_unknown_and_repeated_symbols_are_skipped():
+    context = StockContext("snap", _rows(5))
+    text, tokens, omitted = context.render(["S3", "NOPE", "S1", "S3", "S1"], max_tokens=1000)
+    assert _listed(text) == ["S3", "S1"]
+    assert tokens == sum(estimate_tokens(line) + 1 for line in text.splitlines())
+    assert omitted == 0
+
+    assert context.render(["NOPE"], max_tokens=1000) == ("", 0, 0)
+
+
+def test_requested_symbols_past_the_cap_are_omitted():
+    context = StockContext("snap", _rows(10))
+    text, _, omitted = context.render(
+        ["S9", "S9", "S2", "S5", "S7", "S0"], max_tokens=1000, max_symbols=3
+    )
+    assert _listed(text) == ["S9", "S2", "S5"]
+    assert omitted == 2
+
+
+def test_context_stops_at_the_token_budget():
+    rows = _rows(40)
+    context = StockContext("snap", rows)
+    per_line = estimate_tokens(context.render(["S0"], max_tokens=1000)[0]) + 1
+    text, tokens, omitted = context.render(None, max_tokens=per_line * 7 + per_line // 2)
+    assert len(_listed(text)) == 7
+    assert tokens <= per_line * 7 + per_line // 2
+    assert estimate_tokens(text) <= tokens
+    assert omitted == 33
+    assert context.render(None, max_tokens=0) == ("", 0, 40)
+
+
+def test_context_is_rebuilt_only_for_a_new_snapshot(monkeypatch):
+    monkeypatch.setattr(advisor_context, "_current", None)
+    first = get_stock_context({"snapshotId": "a", "data": _rows(2)})
+    assert get_stock_context({"snapshotId": "a", "data": _rows(3)}) is first
+    second = get_stock_context({"snapshotId": "b", "data": _rows(3)})
+    assert second is not first
+    assert _listed(second.render(None, max_tokens=1000)[0]) == ["S0", "S1", "S2"]
+
+
+@pytest.fixture
+def prompts(monkeypatch) -> list:
+    """Serves a 200-symbol board and records the messages sent upstream."""
+    sent: list = []
+
+    async def get_board():
+        return {"snapshotId": "snap-1", "data": _rows(200)}
+
+    async def complete(client, model, messages):
+        sent.append(messages)
+        yield "ok"
+
+    monkeypatch.setattr(advisor_context, "_current", None)
+    monkeypatch.setattr(StockService, "get_board", get_board)
+    monkeypatch.setattr(AdvisorService, "_complete", complete)
+    monkeypatch.setattr(advisor_service, "open_openai_client", lambda: object())
+    monkeypatch.setattr(get_settings(), "advisor_cache_ttl_seconds", 0)
+    return sent
+
+
+async def _advise(body: AdvisorRequest) -> dict:
+    frames, prompt = await AdvisorService.stream_advice(body)
+    async for _ in frames:
+        pass
+    return prompt
+
+
+async def test_symbols_render_from_the_server_board(prompts):
+    body = AdvisorRequest(
+        snapshotId="stale", symbols=["s7", "S7", "NOPE", "s150"],
+        messages=[{"role": "user", "content": "Hi"}],
+    )
+    prompt = await _advise(body)
+    system = prompts[0][0]["content"]
+    assert prompt["snapshotId"] == "snap-1"
+    assert prompt["omittedStocks"] == 0
+    assert "S7 (Stock 7)" in system and "S150 (Stock 150)" in system
+    assert system.count("S7 (Stock 7)") == 1
+    assert "S8 (" not in system
+
+
+async def test_symbol_cap_applies_to_requests(prompts, monkeypatch):
+    monkeypatch.setattr(get_settings(), "advisor_context_max_symbols", 4)
+    body = AdvisorRequest(symbols=[f"S{i}" for i in range(10)], messages=[])
+    prompt = await _advise(body)
+    system = prompts[0][0]["content"]
+    assert prompt["omittedStocks"] == 6
+    assert "S3 (" in system and "S4 (" not in system
+
+
+async def test_rendered_prompt_respects_the_context_cap(prompts, monkeypatch):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "advisor_context_max_tokens", 120)
+    monkeypatch.setattr(settings, "advisor_context_max_symbols", 500)
+    body = AdvisorRequest(symbols=[f"S{i}" for i in range(200)], messages=[])
+    prompt = await _advise(body)
+    system = prompts[0][0]["content"]
+    listed = [line for line in system.splitlines() if line.startswith("S") and " (Stock " in line]
+
+    assert 0 < prompt["contextTokens"] <= 120
+    assert estimate_tokens("\n".join(listed)) <= 120
+    assert prompt["omittedStocks"] == 200 - len(listed)
+    assert prompt["promptTokens"] == estimate_tokens(system) + estimate_tokens(
+        prompts[0][1]["content"]
+    )
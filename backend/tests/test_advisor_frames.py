@@ -0,0 +1,66 @@
+import asyncio
+import json
+
+import pytest
+
+from app.services.advisor_service import AdvisorService
+
+
+async def _deltas(texts: list[str], gap: float = 0.0):
+    for text in texts:
+        if gap:
+            await asyncio.sleep(gap)
+        yield text
+
+
+async def _frames(deltas, window: float, max_chars: int) -> list[list[str]]:
+    frames = [f async for f in AdvisorService._frames(deltas, window, max_chars)]
+    assert frames[-1] == "data: [DONE]\n\n"
+    return [
+        [entry["textDelta"] for entry in json.loads(f.removeprefix("data: "))]
+        for f in frames[:-1]
+    ]
+
+
+async def test_frames_flush_once_they_reach_max_chars():
+    frames = await _frames(_deltas(["abcd"] * 7), window=60, max_chars=10)
+    assert frames == [["abcd"] * 3, ["abcd"] * 3, ["abcd"]]
+
+
+async def test_frames_flush_when_the_window_elapses():
+    frames = await _frames(_deltas(["a", "b", "c"], gap=0.05), window=0.01, max_chars=1000)
+    assert frames == [["a"], ["b"], ["c"]]
+
+
+async def test_deltas_within_the_window_share_a_frame():
+    frames = await _frames(_deltas(["a", "b", "c"]), window=1, max_chars=1000)
+    assert frames == [["a", "b", "c"]]
+
+
+async def test_zero_window_sends_every_delta_alone():
+    frames = await _frames(_deltas(["a", "b"]), window=0, max_chars=1000)
+    assert frames == [["a"], ["b"]]
+
+
+async def test_no_delta_is_lost_or_reordered():
+    texts = [f"t{i} " for i in range(200)]
+
+    async def bursty():
+        for i, text in enumerate(texts):
+            if i % 17 == 0:
+                await asyncio.sleep(0.003)
+            yield text
+
+    frames = await _frames(bursty(), window=0.002, max_chars=40)
+    assert [t for frame in frames for t in frame] == texts
+    assert all(frames)
+
+
+async def test_upstream_errors_reach_the_reader():
+    async def failing():
+        yield "a"
+        raise RuntimeError("upstream")
+
+    with pytest.raises(RuntimeError, match="upstream"):
+        async for _ in AdvisorService._frames(failing(), window=60, max_chars=1000):
+            pass
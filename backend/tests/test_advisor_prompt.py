@@ -0,0 +1,36 @@
+from app.config import get_settings
+from app.models.schemas import AdvisorRequest
+from app.services import advisor_service
+from app.services.advisor_service import AdvisorService
+
+
+def _stocks(n: int) -> list[dict]:
+    return [
+        {"symbol": f"S{i}", "name": f"Stock {i}", "price": 100.0, "change": 1.0, "pe": 20.0,
+         "sector": "IT"}
+        for i in range(n)
+    ]
+
+
+async def test_whole_prompt_is_capped(monkeypatch):
+    monkeypatch.setattr(advisor_service, "open_openai_client", lambda: object())
+    settings = get_settings()
+    body = AdvisorRequest(
+        stocks=_stocks(500),
+        budget="9" * 10_000,
+        messages=[{"role": "user", "content": "Which stocks? " * 5_000}],
+    )
+    frames, prompt = await AdvisorService.stream_advice(body)
+    await frames.aclose()
+
+    assert prompt["promptTokens"] <= settings.advisor_prompt_max_tokens
+    assert prompt["omittedStocks"] > 0
+
+
+async def test_short_message_keeps_the_full_context_budget(monkeypatch):
+    monkeypatch.setattr(advisor_service, "open_openai_client", lambda: object())
+    body = AdvisorRequest(stocks=_stocks(5), messages=[{"role": "user", "content": "Hi"}])
+    frames, prompt = await AdvisorService.stream_advice(body)
+    await frames.aclose()
+
+    assert prompt["omittedStocks"] == 0
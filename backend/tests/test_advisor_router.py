@@ -0,0 +1,73 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException, Request
+
+from app.models.schemas import AdvisorRequest
+from app.routers import advisor
+from app.services.advisor_service import AdvisorService
+from app.utils.limiter import ConcurrencyLimiter
+
+
+@pytest.fixture
+def calls(monkeypatch) -> list:
+    calls: list = []
+
+    async def stream_advice(body):
+        calls.append(body)
+        raise ValueError("OpenAI API key is not configured.")
+
+    monkeypatch.setattr(AdvisorService, "stream_advice", stream_advice)
+    return calls
+
+
+async def test_full_limiter_rejects_before_building_the_prompt(monkeypatch, calls):
+    limiter = ConcurrencyLimiter(limit=1, max_waiting=0, timeout=1)
+    await limiter.acquire()
+    monkeypatch.setattr(advisor, "_limiter", limiter)
+
+    with pytest.raises(HTTPException) as e:
+        await advisor.advisor_stream(AdvisorRequest(), request=None)
+    assert e.value.status_code == 429
+    assert calls == []
+
+
+async def test_failed_prompt_releases_its_slot(monkeypatch, calls):
+    limiter = ConcurrencyLimiter(limit=1, max_waiting=0, timeout=1)
+    monkeypatch.setattr(advisor, "_limiter", limiter)
+
+    with pytest.raises(HTTPException) as e:
+        await advisor.advisor_stream(AdvisorRequest(), request=None)
+    assert e.value.status_code == 503
+    assert len(calls) == 1
+    assert limiter.stats()["active"] == 0
+
+
+async def test_response_cancelled_before_the_body_releases_its_slot(monkeypatch):
+    limiter = ConcurrencyLimiter(limit=1, max_waiting=0, timeout=1)
+    monkeypatch.setattr(advisor, "_limiter", limiter)
+
+    async def chunks():
+        yield "data: hi\n\n"
+
+    async def stream_advice(body):
+        return chunks(), {"snapshotId": None, "promptTokens": 1, "omittedStocks": 0}
+
+    monkeypatch.setattr(AdvisorService, "stream_advice", stream_advice)
+
+    async def never() -> dict:
+        await asyncio.Event().wait()
+
+    async def blocked_send(message) -> None:
+        await asyncio.Event().wait()
+
+    scope = {"type": "http", "asgi": {"spec_version": "2.4"}}
+    response = await advisor.advisor_stream(AdvisorRequest(), request=Request(scope, never))
+    assert limiter.stats()["active"] == 1
+
+    task = asyncio.create_task(response(scope, never, blocked_send))
+    await asyncio.sleep(0.01)
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+    assert limiter.stats()["active"] == 0
+    assert limiter.stats()["cancelled"] == 1
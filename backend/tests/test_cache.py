@@ -0,0 +1,49 @@
+import asyncio
+
+from app.utils.cache import AsyncTTLCache
+
+
+async def test_concurrent_misses_share_one_load():
+    cache: AsyncTTLCache[str, int] = AsyncTTLCache()
+    calls = 0
+
+    async def loader() -> int:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return calls
+
+    assert await asyncio.gather(*(cache.get_or_load("k", loader) for _ in range(5))) == [1] * 5
+    assert calls == 1
+    assert cache.stats()["coalesced"] == 4
+
+
+async def _invalidated_mid_load(invalidate) -> None:
+    cache: AsyncTTLCache[str, str] = AsyncTTLCache()
+    gate = asyncio.Event()
+
+    async def before_write() -> str:
+        await gate.wait()
+        return "before"
+
+    async def after_write() -> str:
+        return "after"
+
+    first = asyncio.create_task(cache.get_or_load("k", before_write))
+    await asyncio.sleep(0)
+    invalidate(cache)
+    # A request issued after the write must not join the pre-write load.
+    assert await cache.get_or_load("k", after_write) == "after"
+    gate.set()
+    assert await first == "before"
+    # Nor may the pre-write result replace the fresh entry.
+    assert cache.get("k") == "after"
+    assert cache.stats()["inflight"] == 0
+
+
+async def test_invalidate_detaches_inflight_load():
+    await _invalidated_mid_load(lambda cache: cache.invalidate(lambda key: key == "k"))
+
+
+async def test_clear_detaches_inflight_load():
+    await _invalidated_mid_load(lambda cache: cache.clear())
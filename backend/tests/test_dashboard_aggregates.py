@@ -0,0 +1,147 @@
+"""Dashboard aggregates built from grouped cells match the original per-row loop."""
+
+import random
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.services.dashboard_service import _build_aggregates
+from app.services.expense_snapshot import _Columns, _to_day, ExpenseSnapshot
+
+CATEGORIES = ["Travel", "Food", "Rent", "Utilities", "Shopping", "Health", "Other"]
+STATUSES = ["pending", "completed", "cancelled"]
+
+
+def _rows(n: int, seed: int, *, midnight: bool = False) -> list[dict]:
+    rng = random.Random(seed)
+    start = datetime(2024, 11, 3)
+    rows = []
+    for i in range(n):
+        date = start + timedelta(minutes=rng.randrange(0, 60 * 24 * 120))
+        if midnight:
+            date = date.replace(hour=0, minute=0)
+        rows.append(
+            {
+                "id": f"e{i}",
+                # Quarter-unit amounts add up exactly in any order.
+                "amount": rng.randrange(1, 40_000) / 4,
+                "category": rng.choice(CATEGORIES),
+                "status": rng.choice(STATUSES),
+                "date": date,
+            }
+        )
+    return rows
+
+
+def _baseline(rows: list[dict]) -> dict:
+    """The dashboard's original implementation: one Python pass over date-ordered rows."""
+    expenses = sorted(rows, key=lambda e: e["date"])
+    total_amount = sum(float(e.get("amount", 0)) for e in expenses)
+    total_count = len(expenses)
+    status_map: dict[str, dict] = defaultdict(lambda: {"count": 0, "amount": 0.0})
+    category_map: dict[str, dict] = defaultdict(lambda: {"count": 0, "amount": 0.0})
+    monthly_map: dict[str, dict] = defaultdict(lambda: {"count": 0, "amount": 0.0})
+    for e in expenses:
+        st = e.get("status", "pending")
+        status_map[st]["count"] += 1
+        status_map[st]["amount"] += float(e.get("amount", 0))
+        cat = e.get("category", "")
+        category_map[cat]["count"] += 1
+        category_map[cat]["amount"] += float(e.get("amount", 0))
+        month_key = str(e["date"])[:7]
+        monthly_map[month_key]["count"] += 1
+        monthly_map[month_key]["amount"] += float(e.get("amount", 0))
+
+    status_data = [
+        {"status": k.capitalize(), "count": v["count"], "amount": round(v["amount"], 2)}
+        for k, v in status_map.items()
+    ]
+    category_data = [
+        {"id": k, "label": k, "value": v["count"], "amount": round(v["amount"], 2)}
+        for k, v in category_map.items()
+    ]
+    monthly_trend = [
+        {"x": k, "y": round(v["amount"], 2), "count": v["count"]}
+        for k, v in sorted(monthly_map.items())
+    ]
+    completed_amount = status_map.get("completed", {}).get("amount", 0) or 0
+    pending_amount = status_map.get("pending", {}).get("amount", 0) or 0
+    top_categories = sorted(
+        [
+            {"category": k, "amount": round(v["amount"], 2), "count": v["count"]}
+            for k, v in category_map.items()
+        ],
+        key=lambda x: -x["amount"],
+    )[:5]
+    return {
+        "data": {
+            "summary": {
+                "totalExpenses": total_count,
+                "totalAmount": round(total_amount, 2),
+                "completedAmount": round(completed_amount, 2),
+                "pendingAmount": round(pending_amount, 2),
+                "averageExpense": round(total_amount / total_count, 2) if total_count else 0,
+            },
+            "statusData": status_data,
+            "categoryData": category_data,
+            "monthlyTrend": monthly_trend,
+            "topCategories": top_categories,
+        },
+    }
+
+
+def _cells(rows: list[dict]) -> list[dict]:
+    """What the rollup table and the raw partial-month query return for ``rows``."""
+    cells: dict[tuple, dict] = {}
+    for e in rows:
+        key = (e["date"].strftime("%Y-%m"), e["category"], e["status"])
+        first = e["date"].strftime("%Y-%m-%dT%H:%M:%S.%f")
+        cell = cells.setdefault(
+            key,
+            {"month": key[0], "category": key[1], "status": key[2], "count": 0, "amount": 0.0, "first": first},
+        )
+        cell["count"] += 1
+        cell["amount"] += e["amount"]
+        cell["first"] = min(cell["first"], first)
+    return [cells[key] for key in sorted(cells)]
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_cells_match_baseline(seed):
+    rows = _rows(2_000, seed)
+    assert _build_aggregates(_cells(rows)) == _baseline(rows)
+
+
+def test_status_and_category_order_is_first_appearance():
+    base = datetime(2025, 3, 1)
+    rows = [
+        # "Rent" and "completed" appear first, though they sort last by name.
+        {"id": "a", "amount": 5.0, "category": "Rent", "status": "completed", "date": base},
+        {"id": "b", "amount": 7.0, "category": "Food", "status": "pending", "date": base + timedelta(hours=2)},
+        {"id": "c", "amount": 1.0, "category": "Rent", "status": "cancelled", "date": base + timedelta(days=40)},
+    ]
+    data = _build_aggregates(_cells(rows))["data"]
+    assert [s["status"] for s in data["statusData"]] == ["Completed", "Pending", "Cancelled"]
+    assert [c["id"] for c in data["categoryData"]] == ["Rent", "Food"]
+    assert data == _baseline(rows)["data"]
+
+
+def test_empty():
+    assert _build_aggregates([]) == _baseline([])
+
+
+def test_snapshot_cells_match_baseline():
+    # The snapshot keeps dates at day resolution, so use whole days.
+    rows = _rows(2_000, 4, midnight=True)
+    columns = _Columns()
+    columns.upsert([{**r, "day": _to_day(r["date"])} for r in rows])
+    snapshot = ExpenseSnapshot()
+    snapshot._columns = columns
+    baseline = _baseline(rows)
+    result = _build_aggregates(snapshot.cells())
+    assert result["data"]["summary"] == baseline["data"]["summary"]
+    assert result["data"]["monthlyTrend"] == baseline["data"]["monthlyTrend"]
+    # Order within one day is arbitrary in the original loop; compare as sets.
+    for key in ("statusData", "categoryData"):
+        assert sorted(map(str, result["data"][key])) == sorted(map(str, baseline["data"][key]))
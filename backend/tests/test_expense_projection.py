@@ -0,0 +1,25 @@
+from datetime import datetime
+
+from app.services.expense_projection import keyset_query, page_query
+
+
+def test_page_reads_only_the_requested_columns():
+    sql, args = page_query(("id", "title"), category="Food", field="amount", order="asc", offset=40)
+    assert sql.startswith('SELECT "id", "title" FROM expenses WHERE category = $1')
+    assert sql.endswith('ORDER BY "amount" ASC, id ASC LIMIT $2 OFFSET $3')
+    assert args == ["Food", 20, 40]
+
+
+def test_keyset_boundary_follows_the_filters():
+    sql, args = keyset_query(
+        ("id", "date"),
+        category="Food",
+        status="pending",
+        field="date",
+        order="desc",
+        after=(datetime(2025, 1, 1), "e1"),
+        limit=21,
+    )
+    assert '("date", id) < ($3::timestamp, $4)' in sql
+    assert sql.endswith("LIMIT $5")
+    assert args == ["Food", "pending", "2025-01-01T00:00:00", "e1", 21]
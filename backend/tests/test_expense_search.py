@@ -0,0 +1,12 @@
+from app.services.expense_search import count_query
+
+
+def test_short_terms_are_prefix_matched():
+    sql, args = count_query("ai rome", category="Travel")
+    assert args == ["ai%", "%rome%", "Travel"]
+    assert sql.count("ILIKE") == 4
+
+
+def test_like_wildcards_in_terms_are_escaped():
+    _, args = count_query("50% a_b")
+    assert args == ["%50\\%%", "%a\\_b%"]
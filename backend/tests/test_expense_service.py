@@ -0,0 +1,169 @@
+import csv
+import gzip
+import io
+import json
+from datetime import datetime
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from prisma.models import Expense
+
+from app.database.prisma_client import PrismaClient
+from app.routers import expenses
+from app.services import expense_service
+from app.services.expense_service import ExpenseService
+from app.utils.pagination import encode_cursor
+from app.utils.serializers import row_to_expense
+
+# Ties on date and amount, so the id tie-breaker decides the order.
+_ROWS = [
+    Expense(
+        id=f"e{i:02d}",
+        title=f"Expense {i}",
+        amount=[10.0, 25.5][i % 2],
+        category=["Food", "Travel"][i % 2],
+        status="pending",
+        description=None if i % 3 else f"note, \"{i}\"\nline",
+        date=datetime(2024, 1, 1 + i % 3),
+        created_at=datetime(2024, 1, 1),
+        updated_at=datetime(2024, 1, 2),
+    )
+    for i in range(11)
+]
+
+
+def _matches(row: Expense, where: dict | None) -> bool:
+    for key, value in (where or {}).items():
+        if key == "AND":
+            ok = all(_matches(row, w) for w in value)
+        elif key == "OR":
+            ok = any(_matches(row, w) for w in value)
+        elif isinstance(value, dict):
+            ok = all(
+                getattr(row, key) < v if op == "lt" else getattr(row, key) > v
+                for op, v in value.items()
+            )
+        else:
+            ok = getattr(row, key) == value
+        if not ok:
+            return False
+    return True
+
+
+class _FakeExpenses:
+    """The find_many/count subset the list queries use, over _ROWS."""
+
+    async def find_many(self, where=None, order=None, skip=0, take=None):
+        rows = [r for r in _ROWS if _matches(r, where)]
+        for spec in reversed(order or []):
+            [(field, direction)] = spec.items()
+            rows.sort(key=lambda r: getattr(r, field), reverse=direction == "desc")
+        return rows[skip or 0 :][:take]
+
+    async def count(self, where=None):
+        return sum(_matches(r, where) for r in _ROWS)
+
+
+class _FakeClient:
+    expense = _FakeExpenses()
+
+
+@pytest.fixture(autouse=True)
+def fake_db(monkeypatch):
+    monkeypatch.setattr(
+        PrismaClient, "get_read_client", classmethod(lambda cls, shared=False: _FakeClient())
+    )
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(expenses.router)
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+
+def _expected(field: str, order: str, category: str | None = None) -> list[str]:
+    rows = [r for r in _ROWS if category is None or r.category == category]
+    rows.sort(key=lambda r: (getattr(r, field), r.id), reverse=order == "desc")
+    return [r.id for r in rows]
+
+
+@pytest.mark.parametrize("sort_by", ["date", "amount"])
+@pytest.mark.parametrize("order", ["desc", "asc"])
+@pytest.mark.parametrize("category", [None, "Food"])
+async def test_walking_cursors_over_ties_yields_every_row_once(sort_by, order, category):
+    kwargs = {"limit": 3, "category": category, "sort_by": sort_by, "sort_order": order}
+    pages = [await ExpenseService.list_by_cursor(**kwargs)]
+    while pages[-1]["pagination"]["nextCursor"]:
+        pages.append(
+            await ExpenseService.list_by_cursor(
+                cursor=pages[-1]["pagination"]["nextCursor"], **kwargs
+            )
+        )
+    forward = [e.id for page in pages for e in page["data"]]
+    assert forward == _expected(sort_by, order, category)
+
+    # And back from the last page to the first.
+    back = [pages[-1]]
+    while back[-1]["pagination"]["prevCursor"]:
+        back.append(
+            await ExpenseService.list_by_cursor(
+                cursor=back[-1]["pagination"]["prevCursor"], **kwargs
+            )
+        )
+    assert [e.id for page in reversed(back) for e in page["data"]] == forward
+    assert back[-1]["pagination"]["prevCursor"] is None
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not-a-cursor",
+        encode_cursor("amount", "desc", 10.0, "e01", "next"),
+        encode_cursor("date", "asc", "2024-01-02T00:00:00", "e01", "next"),
+        encode_cursor("date", "desc", "yesterday", "e01", "next"),
+    ],
+)
+async def test_bad_or_mismatched_cursor_is_a_400(client, cursor):
+    async with client:
+        response = await client.get(
+            "/api/expenses", params={"cursor": cursor, "sortBy": "date", "sortOrder": "desc"}
+        )
+    assert response.status_code == 400
+
+
+def _exported() -> list[dict]:
+    by_id = {r.id: r for r in _ROWS}
+    return [row_to_expense(by_id[id].model_dump()) for id in _expected("date", "desc")]
+
+
+async def _export(client, format: str, gzipped: bool = False) -> str:
+    headers = {"Accept-Encoding": "gzip" if gzipped else "identity"}
+    async with client.stream(
+        "GET", "/api/expenses/export", params={"format": format}, headers=headers
+    ) as response:
+        assert response.status_code == 200
+        assert (response.headers.get("content-encoding") == "gzip") is gzipped
+        raw = b"".join([chunk async for chunk in response.aiter_raw()])
+    return (gzip.decompress(raw) if gzipped else raw).decode()
+
+
+@pytest.mark.parametrize("gzipped", [False, True])
+async def test_csv_export_round_trips(client, monkeypatch, gzipped):
+    monkeypatch.setattr(expense_service, "_EXPORT_BATCH_SIZE", 4)
+    async with client:
+        body = await _export(client, "csv", gzipped)
+    rows = list(csv.DictReader(io.StringIO(body, newline="")))
+    assert rows == [
+        {k: "" if row[k] is None else str(row[k]) for k in expense_service._EXPORT_COLUMNS}
+        for row in _exported()
+    ]
+
+
+@pytest.mark.parametrize("gzipped", [False, True])
+async def test_ndjson_export_round_trips(client, monkeypatch, gzipped):
+    monkeypatch.setattr(expense_service, "_EXPORT_BATCH_SIZE", 4)
+    async with client:
+        body = await _export(client, "ndjson", gzipped)
+    assert [json.loads(line) for line in body.splitlines()] == _exported()
@@ -0,0 +1,38 @@
+from datetime import date
+
+from app.services.expense_snapshot import _Columns, _to_day
+
+
+def _row(id: str, day: date, amount: float = 1.0) -> dict:
+    return {"id": id, "amount": amount, "category": "Food", "status": "pending", "day": _to_day(day)}
+
+
+def test_month_counts():
+    columns = _Columns()
+    columns.upsert(
+        [_row("a", date(2024, 12, 31)), _row("b", date(2025, 1, 1)), _row("c", date(2025, 3, 9))]
+    )
+    columns.forget("b")
+    assert columns.month_counts() == {"2024-12": 1, "2025-03": 1}
+    assert _Columns().month_counts() == {}
+
+
+def test_replace_range_drops_rows_deleted_elsewhere():
+    columns = _Columns()
+    columns.upsert(
+        [
+            _row("a", date(2025, 1, 5)),
+            _row("b", date(2025, 1, 20)),
+            _row("c", date(2025, 2, 1)),
+        ]
+    )
+    # "b" was deleted by another process, "a" changed and "d" is new.
+    dropped = columns.replace_range(
+        _to_day(date(2025, 1, 1)),
+        _to_day(date(2025, 2, 1)),
+        [_row("a", date(2025, 1, 5), 9.0), _row("d", date(2025, 1, 7))],
+    )
+    assert dropped == 1
+    assert set(columns.rows) == {"a", "c", "d"}
+    assert columns.month_counts() == {"2025-01": 2, "2025-02": 1}
+    assert columns.amount[columns.rows["a"]] == 9.0
@@ -0,0 +1,76 @@
+from types import SimpleNamespace
+
+from app.database.prisma_client import PrismaClient
+from app.services import expense_service
+from app.services.expense_service import ExpenseService
+from app.services.expense_snapshot import ExpenseSnapshot, _Columns
+from app.utils.ingest import MAX_CSV_RECORD_CHARS, iter_csv
+
+
+async def _chunks(text: str, size: int):
+    data = text.encode()
+    for i in range(0, len(data), size):
+        yield data[i : i + size]
+
+
+async def _parse(text: str, size: int = 5) -> list:
+    return [record async for record in iter_csv(_chunks(text, size))]
+
+
+async def test_csv_records_span_lines_and_chunks():
+    text = 'title,amount,description\r\nLunch,12.5,"two\nlines"\n\nTV 55" screen,400,\n'
+    for size in (1, 5, 4096):
+        assert await _parse(text, size) == [
+            (2, {"title": "Lunch", "amount": "12.5", "description": "two\nlines"}, None),
+            (5, {"title": 'TV 55" screen', "amount": "400", "description": None}, None),
+        ]
+
+
+async def test_csv_errors_resume_on_next_line():
+    text = 'title,amount\n"bad"x,1\nshort\n"open,2\nok,3\n'
+    records = await _parse(text)
+    assert [(line, error is None) for line, _, error in records] == [
+        (2, False),
+        (3, False),
+        (4, False),
+        (5, True),
+    ]
+    assert records[2][2] == "Unterminated quoted field"
+
+
+async def test_csv_record_length_is_capped():
+    rows = "".join(f"t{i},{i}\n" for i in range(MAX_CSV_RECORD_CHARS // 4))
+    records = await _parse('title,amount\n"stray,1\n' + rows, size=65536)
+    assert records[0] == (2, None, f"Record longer than {MAX_CSV_RECORD_CHARS} characters")
+    assert all(error is None for _, _, error in records[1:])
+    assert len(records) == 1 + MAX_CSV_RECORD_CHARS // 4
+
+
+async def test_bulk_import_defaults_empty_cells_and_updates_snapshot(monkeypatch):
+    inserted: list[dict] = []
+
+    async def create_many(data):
+        inserted.extend(data)
+        return len(data)
+
+    client = SimpleNamespace(expense=SimpleNamespace(create_many=create_many))
+    monkeypatch.setattr(PrismaClient, "get_client", classmethod(lambda cls: client))
+    snapshot = ExpenseSnapshot()
+    snapshot._columns = _Columns()
+    monkeypatch.setattr(expense_service, "get_expense_snapshot", lambda: snapshot)
+
+    text = "title,amount,category,status,date\nTaxi,20,Travel,,2025-03-04\n"
+    result = await ExpenseService.bulk_import(iter_csv(_chunks(text, 64)))
+
+    assert result["inserted"] == 1 and result["failed"] == 0
+    assert inserted[0]["status"] == "pending"
+    assert snapshot.cells() == [
+        {
+            "month": "2025-03",
+            "category": "Travel",
+            "status": "pending",
+            "count": 1,
+            "amount": 20.0,
+            "first": "2025-03-04T00:00:00.000000",
+        }
+    ]
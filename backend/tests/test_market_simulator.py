@@ -0,0 +1,33 @@
+from app.services.market_simulator import MarketSimulator
+
+
+def _simulator() -> MarketSimulator:
+    stocks = [
+        {"symbol": "A", "sector": "IT", "ref_price": 100.0, "ref_change": 0.0},
+        {"symbol": "B", "sector": "Energy", "ref_price": 50.0, "ref_change": 1.0},
+    ]
+    return MarketSimulator(
+        stocks, seed=7, drift=0.08, volatility=0.25, sector_correlation=0.6, tick_seconds=5.0
+    )
+
+
+def test_advance_follows_elapsed_time():
+    simulator = _simulator()
+    start = simulator._clock
+    assert simulator.advance(start + 4.9) == 0
+    assert simulator.advance(start + 12.0) == 2
+    # The remainder carries over: 12s + 3.5s crosses the 15s tick.
+    assert simulator.advance(start + 15.5) == 1
+    assert simulator.ticks == 3
+
+
+def test_advance_matches_stepping_the_same_ticks():
+    by_time, by_step = _simulator(), _simulator()
+    by_time.advance(by_time._clock + 30.0)
+    by_step.step(6)
+    assert by_time.quotes() == by_step.quotes()
+
+
+def test_advance_caps_catch_up_after_idle():
+    simulator = _simulator()
+    assert simulator.advance(simulator._clock + 7 * 24 * 3600) == 4500
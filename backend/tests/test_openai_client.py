@@ -0,0 +1,96 @@
+import asyncio
+import json
+
+import pytest
+import uvicorn
+
+from app import main
+from app.config import get_settings
+from app.database.prisma_client import PrismaClient
+from app.models.schemas import AdvisorRequest
+from app.services import advisor_service
+from app.services.advisor_service import AdvisorService
+from app.services.rollup_service import RollupService
+from app.utils import openai_client
+
+
+def _completion(*texts: str) -> bytes:
+    chunks = [
+        {
+            "id": "c1",
+            "object": "chat.completion.chunk",
+            "created": 0,
+            "model": "test",
+            "choices": [{"index": 0, "delta": {"content": text}, "finish_reason": None}],
+        }
+        for text in texts
+    ]
+    return "".join(f"data: {json.dumps(c)}\n\n" for c in chunks).encode() + b"data: [DONE]\n\n"
+
+
+@pytest.fixture
+async def upstream(monkeypatch) -> list[dict]:
+    """A local OpenAI-compatible stub server; skips the database."""
+    requests: list[dict] = []
+
+    async def app(scope, receive, send):
+        if scope["type"] != "http":
+            return
+        requests.append({"path": scope["path"], "client": scope["client"]})
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [(b"content-type", b"text/event-stream")],
+            }
+        )
+        await send({"type": "http.response.body", "body": _completion("Buy ", "index funds.")})
+
+    server = uvicorn.Server(uvicorn.Config(app, port=0, log_level="warning", lifespan="off"))
+    serving = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+    port = server.servers[0].sockets[0].getsockname()[1]
+
+    settings = get_settings()
+    monkeypatch.setattr(settings, "openai_api_key", "sk-test")
+    monkeypatch.setattr(settings, "openai_base_url", f"http://127.0.0.1:{port}/v1")
+
+    async def noop(*args, **kwargs):
+        return None
+
+    monkeypatch.setattr(PrismaClient, "connect", noop)
+    monkeypatch.setattr(PrismaClient, "disconnect", noop)
+    monkeypatch.setattr(RollupService, "install", noop)
+    yield requests
+    server.should_exit = True
+    await serving
+
+
+async def _advise(question: str) -> str:
+    body = AdvisorRequest(
+        stocks=[{"symbol": "TCS", "name": "TCS", "price": 3500}],
+        messages=[{"role": "user", "content": question}],
+    )
+    frames, _ = await AdvisorService.stream_advice(body)
+    return "".join([frame async for frame in frames])
+
+
+async def test_client_lives_for_the_lifespan_and_is_reused(upstream):
+    ttft_before = advisor_service._ttft.count
+    async with main.lifespan(main.app):
+        client = openai_client._client
+        assert client is not None
+
+        first = await _advise("What should I buy?")
+        second = await _advise("And with a larger budget?")
+
+        assert openai_client._client is client
+        assert [r["path"] for r in upstream] == ["/v1/chat/completions"] * 2
+        # Both requests went over the same pooled connection.
+        assert upstream[0]["client"] == upstream[1]["client"]
+        assert "index funds." in first and "index funds." in second
+        assert advisor_service._ttft.count == ttft_before + 2
+
+    assert openai_client._client is None
+    assert client._client.is_closed
@@ -0,0 +1,34 @@
+import httpx
+
+from app import main
+from app.database.prisma_client import PrismaClient, _with_pool_params
+
+_URL = "postgresql://u:p@db:5432/app"
+
+
+def test_pool_params_are_appended_to_the_query_untouched():
+    query = "sslrootcert=%2Fetc%2Fssl%2Froot.crt&options=-c%20statement_timeout%3D5000"
+    assert _with_pool_params(f"{_URL}?{query}", 5, 10) == (
+        f"{_URL}?{query}&connection_limit=5&pool_timeout=10"
+    )
+
+
+def test_pool_params_already_in_the_url_are_kept():
+    url = f"{_URL}?connection_limit=20&pool_timeout=3&sslmode=require"
+    assert _with_pool_params(url, 5, 10) == url
+    assert _with_pool_params(f"{_URL}?connection_limit=20", 5, 10) == (
+        f"{_URL}?connection_limit=20&pool_timeout=10"
+    )
+    assert _with_pool_params(_URL, 5, 10) == f"{_URL}?connection_limit=5&pool_timeout=10"
+
+
+async def test_unhealthy_database_is_a_503(monkeypatch):
+    async def health():
+        return {"status": "unhealthy", "error": "connection refused"}
+
+    monkeypatch.setattr(PrismaClient, "health", health)
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get("/health/db")
+    assert response.status_code == 503
+    assert response.json()["status"] == "unhealthy"
@@ -0,0 +1,176 @@
+"""Index regression check for the statements the expense services send.
+
+Needs DATABASE_URL pointing at a migrated database (`make db-migrate`).
+200,000 synthetic rows are seeded in a transaction that is rolled back, and
+the list, search, dashboard and snapshot paths run against them through the
+services themselves, with the planner left to its own costs. Every client
+call is checked against pg_stat_xact_user_tables for a sequential scan of
+expenses, so the plans judged are the ones Postgres ran with the real
+parameters, including for the find_many/count SQL written by the Prisma
+engine, which never reaches Python.
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.config import get_settings
+from app.database.prisma_client import PrismaClient
+from app.services.dashboard_service import DashboardService
+from app.services.expense_service import ExpenseService
+from app.services.expense_snapshot import ExpenseSnapshot
+
+pytestmark = pytest.mark.skipif(
+    not get_settings().database_url, reason="needs DATABASE_URL"
+)
+
+_ROWS = 200_000
+
+# One title in a hundred carries a searchable phrase, as in a real ledger.
+_SEED_SQL = """
+INSERT INTO expenses (id, title, amount, category, status, description, "date", updated_at)
+SELECT
+    'plan-' || i,
+    CASE i % 100
+        WHEN 0 THEN 'Lunch with team #' || i
+        WHEN 1 THEN 'Taxi to airport #' || i
+        WHEN 2 THEN 'AI course #' || i
+        WHEN 3 THEN 'Hotel in Rome #' || i
+        ELSE 'Expense ' || md5(i::text)
+    END,
+    i % 1000,
+    (ARRAY['Food', 'Travel', 'Rent', 'Utilities', 'Shopping', 'Health', 'Other'])[1 + i % 7],
+    (ARRAY['pending', 'completed', 'cancelled'])[1 + i % 3],
+    CASE WHEN i % 2 = 0 THEN 'note ' || i END,
+    timestamp '2024-01-01' + (i % 730) * interval '1 day',
+    timestamp '2024-01-01' + i * interval '1 minute'
+FROM generate_series(1, $1::int) AS i
+"""
+
+# Deleted behind the snapshot's back, so its refresh resyncs that month.
+_DELETE_SQL = "DELETE FROM expenses WHERE id = 'plan-731'"
+
+# Sequential scans of expenses so far in this transaction, by any statement.
+_SEQ_SCANS_SQL = (
+    "SELECT seq_scan::int AS n FROM pg_stat_xact_user_tables WHERE relname = 'expenses'"
+)
+
+
+class _Rollback(Exception):
+    pass
+
+
+class _Actions:
+    """``client.expense`` for the recorder."""
+
+    def __init__(self, recorder: "_Recorder") -> None:
+        self._recorder = recorder
+
+    def __getattr__(self, name: str):
+        method = getattr(self._recorder.client.expense, name)
+
+        async def call(**kwargs):
+            return await self._recorder.observe(f"expense.{name}", kwargs, method(**kwargs))
+
+        return call
+
+
+class _Recorder:
+    """The transaction client handed to the services. Each call is noted with
+    whether it scanned expenses sequentially; this sees the plans Postgres
+    actually ran, including for the SQL the Prisma engine writes."""
+
+    def __init__(self, client) -> None:
+        self.client = client
+        self.calls: list[tuple[str, object, bool]] = []
+
+    @property
+    def expense(self) -> _Actions:
+        return _Actions(self)
+
+    async def query_raw(self, sql: str, *args, model=None):
+        return await self.observe(sql, list(args), self.client.query_raw(sql, *args, model=model))
+
+    async def query_first(self, sql: str, *args, model=None):
+        return await self.observe(
+            sql, list(args), self.client.query_first(sql, *args, model=model)
+        )
+
+    async def observe(self, statement: str, args, pending):
+        before = await self._seq_scans()
+        result = await pending
+        self.calls.append((statement, args, await self._seq_scans() > before))
+        return result
+
+    async def _seq_scans(self) -> int:
+        row = await self.client.query_first(_SEQ_SCANS_SQL)
+        return row["n"] if row else 0
+
+
+async def _exercise(tx) -> None:
+    """The list, search, dashboard and snapshot paths, called as the routers do."""
+    for kwargs in (
+        {},
+        {"sort_by": "createdAt"},
+        {"sort_by": "updatedAt", "page": 3},
+        {"category": "Food"},
+        {"status": "pending"},
+        {"search": "lunch"},
+        {"search": "ai"},
+        {"search": "rome", "category": "Travel", "sort_by": "relevance"},
+        {"fields": "id,title,amount,category,status,date", "page": 3},
+    ):
+        await ExpenseService.list(**kwargs)
+    for kwargs in (
+        {},
+        {"category": "Food", "include_total": True},
+        {"search": "taxi"},
+        {"status": "pending", "fields": "id,title,amount,date"},
+    ):
+        first = await ExpenseService.list_by_cursor(**kwargs)
+        await ExpenseService.list_by_cursor(cursor=first["pagination"]["nextCursor"], **kwargs)
+    await DashboardService._compute(datetime(2025, 1, 1), datetime(2025, 3, 11))
+
+    snapshot = ExpenseSnapshot()
+    await snapshot.reload()
+    await tx.execute_raw(_DELETE_SQL)
+    await snapshot.refresh()
+
+
+def _exempt(statement: str) -> bool:
+    """Offset-page totals count the whole table or one of a handful of
+    categories/statuses; reading that share of it, a sequential scan is a
+    fair plan."""
+    return statement == "expense.count"
+
+
+async def test_expense_statements_use_indexes(monkeypatch):
+    await PrismaClient.connect()
+    try:
+        async with PrismaClient.get_client().tx(timeout=timedelta(minutes=5)) as tx:
+            await tx.execute_raw(_SEED_SQL, _ROWS)
+            await tx.execute_raw("ANALYZE expenses")
+            recorder = _Recorder(tx)
+            with monkeypatch.context() as m:
+                m.setattr(PrismaClient, "get_client", lambda: recorder)
+                m.setattr(PrismaClient, "get_read_client", lambda shared=False: recorder)
+                await _exercise(tx)
+
+            scans = []
+            for statement, args, scanned in recorder.calls:
+                if not scanned or _exempt(statement):
+                    continue
+                if statement.startswith("expense."):
+                    scans.append(f"{statement}({args})")
+                else:
+                    rows = await tx.query_raw(f"EXPLAIN {statement}", *args)
+                    plan = "\n".join(row["QUERY PLAN"] for row in rows)
+                    scans.append(f"{statement.strip()}\n{args}\n{plan}")
+            raise _Rollback
+    except _Rollback:
+        pass
+    finally:
+        await PrismaClient.disconnect()
+
+    assert len(recorder.calls) >= 20
+    assert not scans, "\n\n".join(scans)
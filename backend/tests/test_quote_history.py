@@ -0,0 +1,107 @@
+import math
+import statistics
+
+import pytest
+
+from app.services.quote_history import (
+    EMA_SPAN,
+    RSI_WINDOW,
+    SMA_WINDOW,
+    VOLATILITY_WINDOW,
+    QuoteHistory,
+)
+
+
+def _feed(history: QuoteHistory, symbol: str, prices: list[float], start: float = 0.0) -> None:
+    for n, price in enumerate(prices):
+        history.record([{"symbol": symbol, "price": price}], at=start + n)
+
+
+def _expected(prices: list[float]) -> dict:
+    """The indicators of ``prices`` (oldest first), one price at a time."""
+    alpha = 2.0 / (EMA_SPAN + 1)
+    ema = prices[0]
+    for price in prices[1:]:
+        ema = alpha * price + (1 - alpha) * ema
+    deltas = [b - a for a, b in zip(prices[-RSI_WINDOW - 1:], prices[-RSI_WINDOW:])]
+    gains = sum(d for d in deltas if d > 0) / RSI_WINDOW
+    losses = sum(-d for d in deltas if d < 0) / RSI_WINDOW
+    tail = prices[-VOLATILITY_WINDOW - 1:]
+    returns = [math.log(b / a) for a, b in zip(tail, tail[1:])]
+    return {
+        "sma": sum(prices[-SMA_WINDOW:]) / SMA_WINDOW,
+        "ema": ema,
+        "rsi": 100.0 if losses == 0 else 100.0 - 100.0 / (1.0 + gains / losses),
+        "volatility": statistics.stdev(returns),
+    }
+
+
+def test_linear_series_by_hand():
+    history = QuoteHistory(["A"], capacity=32)
+    _feed(history, "A", [float(p) for p in range(1, 26)])
+    indicators = history.series("A")["indicators"]
+    # Mean of 6..25; no down moves, so RSI saturates.
+    assert indicators["sma"] == 15.5
+    assert indicators["rsi"] == 100.0
+    # EMA seeded at 1 and stepped 24 times: 25 - (1 - alpha) * (1 - (1 - alpha)^24) / alpha.
+    alpha = 2 / 21
+    assert indicators["ema"] == pytest.approx(25 - (1 - alpha) * (1 - (1 - alpha) ** 24) / alpha)
+
+
+def test_indicators_match_a_hand_computed_series():
+    prices = [100 + (n % 5) * 2 - (n % 3) * 1.5 for n in range(27)]
+    history = QuoteHistory(["A"], capacity=64)
+    _feed(history, "A", prices)
+    indicators = history.series("A")["indicators"]
+    for name, value in _expected(prices).items():
+        assert indicators[name] == pytest.approx(value, abs=1e-6), name
+
+
+def test_too_little_history_has_no_indicators():
+    history = QuoteHistory(["A"], capacity=64)
+    _feed(history, "A", [10.0 + n for n in range(RSI_WINDOW + 1)])
+    indicators = history.series("A")["indicators"]
+    assert indicators["sma"] is None
+    assert indicators["ema"] is None
+    assert indicators["volatility"] is None
+    assert indicators["rsi"] == 100.0
+
+
+def test_buffer_wraps_at_capacity():
+    history = QuoteHistory(["A"], capacity=5)
+    _feed(history, "A", [1.0, 2.0, 3.0, 4.0, 5.0, 6.0, 7.0, 8.0], start=100.0)
+    series = history.series("A")
+    assert [p["price"] for p in series["points"]] == [4.0, 5.0, 6.0, 7.0, 8.0]
+    assert [p["t"] for p in series["points"]] == [103.0, 104.0, 105.0, 106.0, 107.0]
+
+
+def test_indicators_after_wraparound_use_only_stored_prices():
+    prices = [50 + (n % 7) - (n % 4) * 0.5 for n in range(40)]
+    history = QuoteHistory(["A", "B"], capacity=24)
+    _feed(history, "A", prices)
+    # B never wraps: its matrix row is left-padded rather than rotated.
+    _feed(history, "B", prices[-22:])
+    a, b = history.series("A")["indicators"], history.series("B")["indicators"]
+    for name, value in _expected(prices[-24:]).items():
+        assert a[name] == pytest.approx(value, abs=1e-6), name
+    for name, value in _expected(prices[-22:]).items():
+        assert b[name] == pytest.approx(value, abs=1e-6), name
+
+
+def test_limit_returns_the_newest_points():
+    history = QuoteHistory(["A", "B"], capacity=4)
+    _feed(history, "A", [1.0, 2.0, 3.0, 4.0, 5.0, 6.0])
+    assert [p["price"] for p in history.series("A", limit=2)["points"]] == [5.0, 6.0]
+    assert [p["price"] for p in history.series("A", limit=100)["points"]] == [3.0, 4.0, 5.0, 6.0]
+    _feed(history, "B", [7.0, 8.0])
+    assert [p["price"] for p in history.series("B", limit=100)["points"]] == [7.0, 8.0]
+    assert history.series("B")["points"] == history.series("B", limit=3)["points"]
+
+
+def test_recording_refreshes_indicators_and_ignores_unknown_symbols():
+    history = QuoteHistory(["A"], capacity=32)
+    _feed(history, "A", [1.0] * SMA_WINDOW)
+    assert history.series("A")["indicators"]["sma"] == 1.0
+    history.record([{"symbol": "A", "price": 21.0}, {"symbol": "ZZZ", "price": 5.0}], at=99.0)
+    assert history.series("A")["indicators"]["sma"] == 2.0
+    assert "ZZZ" not in history
@@ -0,0 +1,33 @@
+import asyncio
+
+from app.config import get_settings
+from app.services import quote_stream
+from app.services.quote_stream import QuoteBroadcaster
+
+
+async def test_run_polls_only_while_subscribed(monkeypatch):
+    calls = 0
+
+    async def get_stocks() -> dict:
+        nonlocal calls
+        calls += 1
+        return {"source": "test", "data": [{"symbol": "AAPL", "price": calls}]}
+
+    monkeypatch.setattr(quote_stream.StockService, "get_stocks", get_stocks)
+    monkeypatch.setattr(get_settings(), "stock_stream_refresh_seconds", 0)
+    broadcaster = QuoteBroadcaster()
+    task = asyncio.create_task(broadcaster.run())
+    try:
+        await asyncio.sleep(0.01)
+        assert calls == 0
+
+        subscriber = broadcaster.subscribe()
+        assert await subscriber.next(timeout=1) == [{"symbol": "AAPL", "price": 1}]
+
+        broadcaster.unsubscribe(subscriber)
+        await asyncio.sleep(0.01)
+        idle_calls = calls
+        await asyncio.sleep(0.01)
+        assert calls == idle_calls
+    finally:
+        task.cancel()
@@ -0,0 +1,54 @@
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.database import prisma_client
+from app.database.prisma_client import PrismaClient
+from app.middlewares.read_your_writes import STICKY_HEADER, ReadYourWritesMiddleware
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(PrismaClient, "_read_instance", object())
+    app = FastAPI()
+    app.add_middleware(ReadYourWritesMiddleware)
+
+    @app.post("/expenses")
+    async def write():
+        PrismaClient.note_write()
+        return {}
+
+    @app.post("/advisor")
+    async def no_write():
+        return {}
+
+    @app.get("/expenses")
+    async def read():
+        return {"pinned": prisma_client._pin_primary.get()}
+
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+
+async def test_only_expense_writes_make_reads_sticky(client):
+    async with client:
+        response = await client.post("/advisor")
+        assert STICKY_HEADER not in response.headers
+        assert "set-cookie" not in response.headers
+        assert (await client.get("/expenses")).json() == {"pinned": False}
+
+        response = await client.post("/expenses")
+        assert int(response.headers[STICKY_HEADER]) >= 1
+        assert (await client.get("/expenses")).json() == {"pinned": True}
+
+
+async def test_echoed_header_pins_reads(client):
+    async with client:
+        response = await client.get("/expenses", headers={STICKY_HEADER: "1"})
+        assert response.json() == {"pinned": True}
+
+
+async def test_a_write_does_not_pin_other_clients_behind_the_same_address(client):
+    async with client:
+        await client.post("/expenses")
+        client.cookies.clear()
+        assert (await client.get("/expenses")).json() == {"pinned": False}
@@ -0,0 +1,83 @@
+import logging
+
+import pytest
+
+from app.middlewares.request_context import (
+    TRACE_ID_HEADER,
+    RequestContextMiddleware,
+    get_trace_id,
+)
+
+_LOGGER = "app.middlewares.request_context"
+
+
+async def _call(app, headers=()) -> list[dict]:
+    sent: list[dict] = []
+
+    async def receive() -> dict:
+        return {"type": "http.request", "body": b""}
+
+    async def send(message: dict) -> None:
+        sent.append(message)
+
+    scope = {"type": "http", "method": "GET", "path": "/health", "headers": list(headers)}
+    await RequestContextMiddleware(app)(scope, receive, send)
+    return sent
+
+
+def _app(seen: list, status: int = 200):
+    async def app(scope, receive, send):
+        seen.append((get_trace_id(), scope["state"]["trace_id"]))
+        await send({"type": "http.response.start", "status": status, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    return app
+
+
+def _request_logs(caplog) -> list[logging.LogRecord]:
+    return [r for r in caplog.records if r.name == _LOGGER]
+
+
+async def test_incoming_trace_id_is_echoed_and_set_on_the_context(caplog):
+    caplog.set_level(logging.DEBUG, logger=_LOGGER)
+    seen: list = []
+    sent = await _call(_app(seen, status=201), [(b"x-trace-id", b"abc-123")])
+
+    assert seen == [("abc-123", "abc-123")]
+    assert (TRACE_ID_HEADER.encode(), b"abc-123") in sent[0]["headers"]
+    assert sent[1]["body"] == b"ok"
+    assert get_trace_id() is None
+    [record] = _request_logs(caplog)
+    assert record.trace_id == "abc-123"
+    assert record.args[:3] == ("GET", "/health", 201)
+    assert record.args[3] >= 0
+
+
+async def test_missing_trace_id_is_generated():
+    seen: list = []
+    sent = await _call(_app(seen))
+
+    [(trace_id, state_id)] = seen
+    assert trace_id and trace_id == state_id
+    assert (TRACE_ID_HEADER.encode(), trace_id.encode()) in sent[0]["headers"]
+
+
+async def test_failed_request_is_logged_once_as_500(caplog):
+    caplog.set_level(logging.DEBUG, logger=_LOGGER)
+
+    async def app(scope, receive, send):
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        await _call(app, [(b"x-trace-id", b"t-1")])
+
+    [record] = _request_logs(caplog)
+    assert record.args[2] == 500
+    assert record.trace_id == "t-1"
+    assert get_trace_id() is None
+
+
+async def test_nothing_is_logged_above_debug(caplog):
+    caplog.set_level(logging.INFO, logger=_LOGGER)
+    await _call(_app([]))
+    assert _request_logs(caplog) == []
@@ -0,0 +1,37 @@
+import json
+from datetime import datetime
+
+from app.utils.serializers import EXPENSE_FIELDS, compile_plan, row_to_expense
+
+_ROW = {
+    "id": "e1",
+    "title": "Lunch",
+    "amount": 12.5,
+    "category": "Food",
+    "status": "pending",
+    "description": None,
+    "date": datetime(2024, 3, 1, 12, 30),
+    "created_at": "2024-03-01T12:30:00.000001",
+    "updated_at": datetime(2024, 3, 2),
+}
+
+
+class _Model:
+    def __init__(self, row: dict) -> None:
+        self.__dict__.update(row)
+
+
+def test_plan_matches_row_to_expense():
+    expected = row_to_expense({**_ROW, "created_at": datetime.fromisoformat(_ROW["created_at"])})
+    for plan, row in (
+        (compile_plan(EXPENSE_FIELDS), _Model(_ROW)),
+        (compile_plan(EXPENSE_FIELDS, mapping=True), _ROW),
+    ):
+        out = plan(row)
+        assert out == expected
+        assert list(out) == [key for _, key, _ in EXPENSE_FIELDS]
+
+
+def test_projected_plan_keeps_only_its_fields():
+    plan = compile_plan([("id", "id", False), ("date", "date", True)], mapping=True)
+    assert json.dumps(plan(_ROW)) == '{"id": "e1", "date": "2024-03-01T12:30:00"}'
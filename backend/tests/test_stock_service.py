@@ -0,0 +1,150 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.config import get_settings
+from app.services import stock_service
+from app.services.stock_service import StockService
+from app.utils import stocks
+from app.utils.cache import AsyncTTLCache
+from app.utils.circuit_breaker import CircuitBreaker
+from app.utils.stocks import get_symbol_registry
+
+
+def _quote_handler(failing: set[str], omitted: set[str]):
+    """Yahoo stand-in: 500 for any chunk naming a symbol in ``failing``; symbols
+    in ``omitted`` are silently left out of their chunk's answer."""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        symbols = request.url.params["symbols"].split(",")
+        if failing & set(symbols):
+            return httpx.Response(500)
+        result = [
+            {"symbol": s, "regularMarketPrice": 100.0, "regularMarketChangePercent": 1.0}
+            for s in symbols
+            if s not in omitted
+        ]
+        return httpx.Response(200, json={"quoteResponse": {"result": result}})
+
+    return handler
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "stock_feed", "yahoo")
+    monkeypatch.setattr(settings, "stock_quote_chunk_size", 5)
+    monkeypatch.setattr(settings, "stock_quote_hedge_seconds", 0)
+    monkeypatch.setattr(StockService, "_last_live", {})
+    monkeypatch.setattr(stock_service, "_breaker", CircuitBreaker(failure_threshold=3))
+
+    def serve(failing: set[str] = frozenset(), omitted: set[str] = frozenset()) -> None:
+        handler = _quote_handler(set(failing), set(omitted))
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        monkeypatch.setattr(stocks, "_http_client", client)
+
+    return serve
+
+
+async def test_complete_board_is_live(upstream):
+    upstream()
+    data, source = await StockService._fetch_stocks()
+    registry = get_symbol_registry()
+    assert source == "yahoo"
+    assert [row["symbol"] for row in data] == registry.symbols
+    assert stock_service._breaker.failures == 0
+
+
+async def test_partial_board_is_filled_and_degraded(upstream):
+    registry = get_symbol_registry()
+    first, second = registry.stocks[0], registry.stocks[-1]
+    upstream()
+    await StockService._fetch_stocks()
+
+    # Only the chunk holding the last symbol fails now.
+    upstream({second["yahoo_symbol"]})
+    last = StockService._last_live
+    last[second["symbol"]] = {**last[second["symbol"]], "price": 42.0}
+    data, source = await StockService._fetch_stocks()
+
+    assert source == "partial"
+    assert [row["symbol"] for row in data] == registry.symbols
+    assert data[-1]["price"] == 42.0
+    assert data[0] == last[first["symbol"]]
+    assert stock_service._breaker.failures == 1
+
+
+async def test_partial_board_without_history_uses_simulator(upstream):
+    registry = get_symbol_registry()
+    upstream({registry.stocks[0]["yahoo_symbol"]})
+    data, source = await StockService._fetch_stocks()
+
+    assert source == "partial"
+    assert [row["symbol"] for row in data] == registry.symbols
+    assert data[0]["price"] != 100.0
+    assert registry.stocks[0]["symbol"] not in StockService._last_live
+
+
+async def test_repeated_partial_boards_open_the_breaker(upstream):
+    upstream({get_symbol_registry().stocks[0]["yahoo_symbol"]})
+    for _ in range(3):
+        await StockService._fetch_stocks()
+    assert stock_service._breaker.state == CircuitBreaker.OPEN
+    _, source = await StockService._fetch_stocks()
+    assert source == "cached"
+
+
+async def test_symbol_left_out_of_a_complete_board_keeps_its_last_quote(upstream):
+    registry = get_symbol_registry()
+    dropped = registry.stocks[1]
+    upstream()
+    await StockService._fetch_stocks()
+    last = StockService._last_live
+    last[dropped["symbol"]] = {**last[dropped["symbol"]], "price": 42.0}
+
+    upstream(omitted={dropped["yahoo_symbol"]})
+    data, source = await StockService._fetch_stocks()
+
+    assert source == "yahoo"
+    assert [row["symbol"] for row in data] == registry.symbols
+    assert data[1]["price"] == 42.0
+    assert StockService._last_live[dropped["symbol"]]["price"] == 42.0
+
+
+async def test_cancelled_fetch_is_not_a_breaker_failure(upstream, monkeypatch):
+    async def cancelled():
+        raise asyncio.CancelledError
+
+    monkeypatch.setattr(StockService, "_fetch_live", cancelled)
+    with pytest.raises(asyncio.CancelledError):
+        await StockService._fetch_stocks()
+    assert stock_service._breaker.failures == 0
+
+
+@pytest.mark.parametrize(
+    ("symbols", "sector", "expected"),
+    [
+        (None, None, None),
+        (["INFY", "TCS", "NOPE"], None, ["INFY", "TCS"]),
+        (None, "it", "IT"),
+        (["INFY", "HDFCBANK", "TCS"], "IT", ["INFY", "TCS"]),
+        (["HDFCBANK"], "IT", []),
+    ],
+)
+async def test_board_filters(upstream, monkeypatch, symbols, sector, expected):
+    monkeypatch.setattr(stock_service, "_quotes_cache", AsyncTTLCache(maxsize=1, ttl=60))
+    upstream()
+    registry = get_symbol_registry()
+    if expected is None:
+        expected = registry.symbols
+    elif isinstance(expected, str):
+        expected = [s["symbol"] for s in registry.stocks if s["sector"] == expected]
+
+    result = await StockService.get_stocks(symbols=symbols, sector=sector)
+    assert [row["symbol"] for row in result["data"]] == expected
+    assert result["source"] == "yahoo"
+
+    page = await StockService.get_stocks(symbols=symbols, sector=sector, page=2, limit=1)
+    assert [row["symbol"] for row in page["data"]] == expected[1:2]
+    assert page["pagination"]["total"] == len(expected)
@@ -0,0 +1,133 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.config import get_settings
+from app.utils import stocks
+from app.utils.stocks import SymbolRegistry, fetch_nse_quotes
+
+_SYMBOLS = [f"SYN{i:05d}.NS" for i in range(12)]
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    """Yahoo stand-in in chunks of 4; ``serve`` maps a symbol to what the chunk
+    naming it does: ``"error"`` (500), ``"hang"`` (never answers in time) or
+    ``"slow-once"`` (hangs on the first request only, so a hedge can win)."""
+    settings = get_settings()
+    monkeypatch.setattr(settings, "stock_quote_chunk_size", 4)
+    monkeypatch.setattr(settings, "stock_quote_concurrency", 4)
+    monkeypatch.setattr(settings, "stock_quote_hedge_seconds", 0)
+    monkeypatch.setattr(settings, "stock_quote_budget_seconds", 0.3)
+    requests: list[list[str]] = []
+
+    def serve(behaviour: dict[str, str] | None = None) -> list[list[str]]:
+        behaviour = dict(behaviour or {})
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            symbols = request.url.params["symbols"].split(",")
+            requests.append(symbols)
+            actions = {behaviour[s] for s in symbols if s in behaviour}
+            if "error" in actions:
+                return httpx.Response(500)
+            if "hang" in actions:
+                await asyncio.sleep(5)
+            if "slow-once" in actions:
+                for s in symbols:
+                    behaviour.pop(s, None)
+                await asyncio.sleep(5)
+            result = [{"symbol": s, "regularMarketPrice": 100.0} for s in symbols]
+            return httpx.Response(200, json={"quoteResponse": {"result": result}})
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        monkeypatch.setattr(stocks, "_http_client", client)
+        return requests
+
+    return serve
+
+
+async def test_all_chunks_answer(upstream):
+    requests = upstream()
+    quotes, missing = await fetch_nse_quotes(_SYMBOLS)
+    assert sorted(len(r) for r in requests) == [4, 4, 4]
+    assert [q["symbol"] for q in quotes] == _SYMBOLS
+    assert missing == []
+
+
+async def test_failing_chunk_is_missing_while_the_others_succeed(upstream):
+    upstream({_SYMBOLS[5]: "error"})
+    quotes, missing = await fetch_nse_quotes(_SYMBOLS)
+    assert [q["symbol"] for q in quotes] == _SYMBOLS[:4] + _SYMBOLS[8:]
+    assert missing == _SYMBOLS[4:8]
+
+
+async def test_chunk_past_the_budget_is_abandoned(upstream):
+    upstream({_SYMBOLS[-1]: "hang"})
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    quotes, missing = await fetch_nse_quotes(_SYMBOLS)
+    assert loop.time() - started < 1
+    assert [q["symbol"] for q in quotes] == _SYMBOLS[:8]
+    assert missing == _SYMBOLS[8:]
+
+
+async def test_malformed_answer_counts_as_missing(upstream, monkeypatch):
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json={"quoteResponse": {"result": None}})
+
+    upstream()
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(stocks, "_http_client", client)
+    quotes, missing = await fetch_nse_quotes(_SYMBOLS[:4])
+    assert quotes == []
+    assert missing == _SYMBOLS[:4]
+
+
+async def test_hedged_request_answers_a_slow_chunk(upstream, monkeypatch):
+    monkeypatch.setattr(get_settings(), "stock_quote_hedge_seconds", 0.05)
+    requests = upstream({_SYMBOLS[0]: "slow-once"})
+    quotes, missing = await fetch_nse_quotes(_SYMBOLS)
+    assert [q["symbol"] for q in quotes] == _SYMBOLS
+    assert missing == []
+    assert requests.count(_SYMBOLS[:4]) == 2
+
+
+def test_chunks_respect_the_symbol_count_and_url_length():
+    assert stocks._chunks(_SYMBOLS, 5) == [_SYMBOLS[:5], _SYMBOLS[5:10], _SYMBOLS[10:]]
+    long = [f"{'X' * 100}{i}.NS" for i in range(40)]
+    chunks = stocks._chunks(long, 50)
+    assert sum(chunks, []) == long
+    assert all(len(",".join(c)) <= stocks._MAX_SYMBOLS_CHARS for c in chunks)
+    assert stocks._chunks([], 5) == []
+
+
+@pytest.fixture
+def registry():
+    return SymbolRegistry.synthetic(14, seed=1)
+
+
+def _symbols(entries: list[dict]) -> list[str]:
+    return [e["symbol"] for e in entries]
+
+
+def test_select_without_filters_is_the_whole_registry(registry):
+    assert registry.select() == registry.stocks
+
+
+def test_select_symbols_keeps_request_order_and_skips_unknown(registry):
+    picked = registry.select(["SYN00009", "NOPE", "SYN00002"])
+    assert _symbols(picked) == ["SYN00009", "SYN00002"]
+
+
+def test_select_sector_is_case_insensitive(registry):
+    assert _symbols(registry.select(sector="banking")) == ["SYN00000", "SYN00007"]
+    assert registry.select(sector="Banking") == registry.select(sector="BANKING")
+    assert registry.select(sector="Mining") == []
+
+
+def test_select_symbols_within_a_sector(registry):
+    picked = registry.select(["SYN00008", "SYN00007", "SYN00001"], sector="it")
+    assert _symbols(picked) == ["SYN00008", "SYN00001"]
+    assert registry.select(["SYN00002"], sector="IT") == []
+    assert registry.select([], sector="IT") == []
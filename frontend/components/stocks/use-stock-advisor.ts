@@ -16,7 +16,7 @@ export function useStockAdvisor(stocks: StockData[]) {
     setIsStreaming(true);
     try {
       const stream = await advisorStream({
-        stocks,
+        symbols: stocks.map((s) => s.symbol),
         budget,
         riskLevel,
         messages: [{ role: "user", content: text }],
@@ -28,11 +28,12 @@ export function useStockAdvisor(stocks: StockData[]) {
       const reader = stream.getReader();
       const decoder = new TextDecoder();
       let full = "";
+      let partial = "";
       while (true) {
         const { done, value } = await reader.read();
         if (done) break;
-        const chunk = decoder.decode(value, { stream: true });
-        const lines = chunk.split("\n");
+        const lines = (partial + decoder.decode(value, { stream: true })).split("\n");
+        partial = lines.pop() ?? "";
         for (const line of lines) {
           if (line.startsWith("data: ")) {
             const payload = line.slice(6);
@@ -8,6 +8,24 @@ export const api = axios.create({
   timeout: 30000,
 });
 
+// After an expense write the backend answers with X-Read-Your-Writes: <seconds>;
+// echoing it keeps this client's reads on the primary database until the read
+// replica has caught up (cookies are not sent cross-origin).
+let readYourWritesUntil = 0;
+
+api.interceptors.request.use((config) => {
+  if (Date.now() < readYourWritesUntil) {
+    config.headers.set("X-Read-Your-Writes", "1");
+  }
+  return config;
+});
+
+api.interceptors.response.use((response) => {
+  const seconds = Number(response.headers["x-read-your-writes"]);
+  if (seconds > 0) readYourWritesUntil = Date.now() + seconds * 1000;
+  return response;
+});
+
 export function getApiUrl(): string {
   return baseURL;
 }
@@ -21,6 +39,7 @@ export const expensesApi = {
     search?: string;
     sortBy?: string;
     sortOrder?: string;
+    fields?: string;
   }) =>
     api.get<{ data: unknown[]; pagination: { page: number; limit: number; total: number; totalPages: number } }>(
       "/api/expenses",
@@ -54,7 +73,14 @@ export const stocksApi = {
 };
 
 export async function advisorStream(
-  body: { stocks: unknown[]; budget?: string; riskLevel?: string; messages?: unknown[] }
+  body: {
+    symbols?: string[];
+    snapshotId?: string;
+    stocks?: unknown[];
+    budget?: string;
+    riskLevel?: string;
+    messages?: unknown[];
+  }
 ): Promise<ReadableStream<Uint8Array> | null> {
   const url = `${getApiUrl()}/api/stocks/advisor`;
   const res = await fetch(url, {
@@ -2,7 +2,7 @@
 
 import { useQuery, useMutation, useQueryClient, keepPreviousData } from "@tanstack/react-query";
 import { expensesApi, dashboardApi, stocksApi } from "./api";
-import type { Expense, PaginatedResponse, DashboardData, StockData } from "./types";
+import type { Expense, ExpenseRow, PaginatedResponse, DashboardData, StockData } from "./types";
 
 export const expenseKeys = {
   all: ["expenses"] as const,
@@ -10,6 +10,9 @@ export const expenseKeys = {
   detail: (id: string) => ["expenses", "detail", id] as const,
 };
 
+// Columns the expense table renders; the list returns only these (ExpenseRow).
+const EXPENSE_ROW_FIELDS = "id,title,amount,category,status,date";
+
 export function useExpensesList(params: {
   page?: number;
   limit?: number;
@@ -22,8 +25,8 @@ export function useExpensesList(params: {
   return useQuery({
     queryKey: expenseKeys.list(params),
     queryFn: async () => {
-      const { data } = await expensesApi.list(params);
-      return data as PaginatedResponse<Expense>;
+      const { data } = await expensesApi.list({ ...params, fields: EXPENSE_ROW_FIELDS });
+      return data as PaginatedResponse<ExpenseRow>;
     },
     placeholderData: keepPreviousData,
   });
@@ -10,6 +10,9 @@ export interface Expense {
   updatedAt: string;
 }
 
+/** Row of the expense list in its default (table) projection. */
+export type ExpenseRow = Pick<Expense, "id" | "title" | "amount" | "category" | "status" | "date">;
+
 export interface ExpenseFormData {
   title: string;
   amount: number;